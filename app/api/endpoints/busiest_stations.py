@@ -1,23 +1,53 @@
 # app/api/endpoints/busiest_stations.py
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, func
 
 # Project Modules
-from app.db.db_main import get_db
-from app.services.etl.predict_overcrowding import predict_crowding
+from app.db.db_main import get_session
+from app.crud.leaderboard_crud import get_leaderboard
+from app.db.views import OPERATOR_PUNCTUALITY, STATION_CROWDING
+from app.services.etl.predict_overcrowding import crowding_records, crowding_window, predict_crowding
 from app.core.logging_config import configure_logging
 
 logger = configure_logging()
 
-TABLE_NAME = "arrivals_tracking" 
-
 router = APIRouter()
 
 @router.get("/busiest-stations")
 
 @router.get("/busiest_stations", tags=["Crowding Prediction"])
-async def get_busiest_stations(db_session: AsyncSession = Depends(get_db)):
-    """Returns predicted busiest stations based on real-time train arrivals."""
-    crowding_df = await predict_crowding(db_session)
-    return crowding_df.to_dict(orient="records")
+async def get_busiest_stations(
+    limit: int = Query(20, ge=1, le=500),
+    db_session: AsyncSession = Depends(get_session)
+):
+    """Returns the busiest stations, as ranked at the last pipeline run."""
+    leaderboard = await get_leaderboard(db_session, STATION_CROWDING.name, limit)
+    return {"refreshed_at": leaderboard["refreshed_at"], "stations": leaderboard["rows"]}
+
+@router.get("/operator_punctuality", tags=["Crowding Prediction"])
+async def get_operator_punctuality(
+    limit: int = Query(20, ge=1, le=500),
+    db_session: AsyncSession = Depends(get_session)
+):
+    """Returns operators ranked by on-time ratio, as of the last pipeline run."""
+    leaderboard = await get_leaderboard(db_session, OPERATOR_PUNCTUALITY.name, limit)
+    return {"refreshed_at": leaderboard["refreshed_at"], "operators": leaderboard["rows"]}
+
+@router.get("/crowding", tags=["Crowding Prediction"])
+async def get_crowding(
+    start: Optional[datetime] = Query(None, description="Window start"),
+    end: Optional[datetime] = Query(None, description="Window end (default: now)"),
+    hours: Optional[int] = Query(None, ge=1, le=24 * 31, description="Window length when start or end is omitted"),
+    stations: Optional[str] = Query(None, description="Comma-separated station CRS codes (default: all)"),
+    db_session: AsyncSession = Depends(get_session)
+):
+    """Returns live crowding per station over a time window, busiest first."""
+    try:
+        start, end = crowding_window(start, end, hours)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    station_list = [crs.strip() for crs in stations.split(",") if crs.strip()] if stations else None
+    crowding_df = await predict_crowding(db_session, start, end, station_list)
+    return {"from": start, "to": end, "stations": crowding_records(crowding_df)}
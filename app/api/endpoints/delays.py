@@ -0,0 +1,42 @@
+# app/api/endpoints/delays.py
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Project Modules
+from app.db.db_main import get_session
+from app.crud.delay_crud import DELAY_COLUMNS, ArrivalFilters, fetch_delays, parse_bbox
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+router = APIRouter()
+
+# Defaults of a /delays request, shared with the EXPLAIN check in app.db.query_plans
+DEFAULT_HOURS = 24
+DEFAULT_PAGE_SIZE = 1000
+
+@router.get("", tags=["Delays"])
+async def get_delays(
+    start: Optional[datetime] = Query(None, description="First scheduled arrival"),
+    end: Optional[datetime] = Query(None, description="End of the window (default: now)"),
+    hours: int = Query(DEFAULT_HOURS, ge=1, le=24 * 31, description="Window length when start or end is omitted"),
+    operator: Optional[str] = Query(None, description="Only this operator"),
+    station: Optional[str] = Query(None, max_length=3, description="Origin or destination CRS code"),
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat"),
+    columns: Optional[str] = Query(None, description=f"Comma-separated subset of {', '.join(DELAY_COLUMNS)}"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=10000, description="Arrivals per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db_session: AsyncSession = Depends(get_session)
+):
+    """Returns one page of arrivals as columns, in scheduled order, with the cursor of the next page."""
+    try:
+        filters = ArrivalFilters.window(
+            start, end, hours, operator=operator, station=station, bbox=parse_bbox(bbox)
+        )
+        column_list = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+        batch = await fetch_delays(db_session, filters, columns=column_list, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"count": len(batch), "next_cursor": batch.next_cursor, "columns": batch.column_lists()}
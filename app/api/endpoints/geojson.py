@@ -0,0 +1,52 @@
+# app/api/endpoints/geojson.py
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+# Project Modules
+from app.db.db_main import get_db
+from app.crud.delay_crud import ArrivalFilters, parse_bbox
+from app.crud.geo_crud import GEOMETRIES, stream_features
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+router = APIRouter()
+
+async def _feature_collection(filters: ArrivalFilters, geometry: str, limit: Optional[int]) -> AsyncIterator[str]:
+    """Writes a FeatureCollection chunk by chunk as rows arrive from the cursor."""
+    # The session lives inside the generator so it stays open until the last chunk is sent
+    async with get_db() as db_session:
+        yield '{"type":"FeatureCollection","features":['
+        separator = ""
+        async for features in stream_features(db_session, filters, geometry, limit):
+            yield separator + ",".join(features)
+            separator = ","
+        yield "]}"
+
+@router.get("/arrivals.geojson", tags=["Geo"])
+async def get_arrivals_geojson(
+    start: Optional[datetime] = Query(None, description="First scheduled arrival"),
+    end: Optional[datetime] = Query(None, description="End of the window (default: now)"),
+    hours: int = Query(24, ge=1, le=24 * 31, description="Window length when start or end is omitted"),
+    operator: Optional[str] = Query(None, description="Only this operator"),
+    station: Optional[str] = Query(None, max_length=3, description="Origin or destination CRS code"),
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat"),
+    geometry: str = Query("destination", description=f"One of {', '.join(GEOMETRIES)}"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of features"),
+):
+    """Streams arrivals as a GeoJSON FeatureCollection."""
+    try:
+        filters = ArrivalFilters.window(
+            start, end, hours, operator=operator, station=station, bbox=parse_bbox(bbox)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if geometry not in GEOMETRIES:
+        raise HTTPException(status_code=400, detail=f"geometry must be one of {', '.join(GEOMETRIES)}")
+
+    return StreamingResponse(
+        _feature_collection(filters, geometry, limit),
+        media_type="application/geo+json"
+    )
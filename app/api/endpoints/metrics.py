@@ -0,0 +1,12 @@
+# app/api/endpoints/metrics.py
+from fastapi import APIRouter
+
+# Project Modules
+from app.core.executor import cpu_executor
+
+router = APIRouter()
+
+@router.get("/executor", tags=["Metrics"])
+async def get_executor_metrics():
+    """Returns queue depth and throughput of the executor running map renders and other CPU-bound work."""
+    return cpu_executor.stats()
@@ -0,0 +1,35 @@
+# app/api/endpoints/station_stats.py
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Project Modules
+from app.db.db_main import get_session
+from app.crud.rollup_crud import get_hourly_stats, histogram_labels, summarise_hourly_stats
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+router = APIRouter()
+
+@router.get("/stations/{station}/hourly")
+async def get_station_hourly_stats(
+    station: str,
+    hours: int = Query(24, ge=1, le=24 * 31, description="Hours back from the end of the window"),
+    end: Optional[datetime] = Query(None, description="End of the window (default: now)"),
+    operator: Optional[str] = Query(None, description="Only this operator"),
+    db_session: AsyncSession = Depends(get_session)
+):
+    """Returns hourly delay statistics of a station from the pre-aggregated rollup."""
+    end = end or datetime.now()
+    start = end - timedelta(hours=hours)
+    rows = await get_hourly_stats(db_session, station.upper(), start, end, operator)
+    return {
+        "station": station.upper(),
+        "from": start,
+        "to": end,
+        "histogram_bins": histogram_labels(),
+        "summary": summarise_hourly_stats(rows),
+        "hours": rows,
+    }
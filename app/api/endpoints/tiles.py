@@ -0,0 +1,48 @@
+# app/api/endpoints/tiles.py
+import hashlib
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Project Modules
+from app.db.db_main import get_session
+from app.crud.tile_crud import get_tile, valid_tile
+from app.db.partitions import is_retained, list_partitions
+from app.services.tile_cache import cache_max_age, tile_cache
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+router = APIRouter()
+
+@router.get("/{z}/{x}/{y}.mvt", tags=["Tiles"])
+async def get_delay_tile(
+    z: int,
+    x: int,
+    y: int,
+    run_date: Optional[date] = Query(None, description="Run date of the arrivals (default: today)"),
+    if_none_match: Optional[str] = Header(None),
+    db_session: AsyncSession = Depends(get_session)
+):
+    """Returns a Mapbox Vector Tile with delay points and routes of one run date."""
+    if not valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail=f"No tile {z}/{x}/{y}")
+    run_date = run_date or date.today()
+
+    tile = tile_cache.get(run_date, z, x, y)
+    if tile is None:
+        # Only run dates the table retains are rendered, so made-up dates never reach the cache
+        if not is_retained(run_date, await list_partitions(db_session)):
+            raise HTTPException(status_code=404, detail=f"No arrivals retained for run date {run_date}")
+        generation = tile_cache.generation(run_date)
+        tile = await get_tile(db_session, z, x, y, run_date)
+        tile_cache.put(run_date, z, x, y, tile, generation)
+
+    etag = f'"{hashlib.md5(tile).hexdigest()}"'
+    headers = {"Cache-Control": f"public, max-age={cache_max_age(run_date)}", "ETag": etag}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE, headers=headers)
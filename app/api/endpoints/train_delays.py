@@ -1,18 +1,23 @@
 # app/api/endpoints/train_delays.py
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import HTMLResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Annotated, Optional, List, Dict, Any
+from pydantic import BaseModel, Field
 
-from app.db.db_main import get_db
+from app.core.executor import ExecutorBusyError
+from app.db.db_main import get_session
 from app.services.etl.map import TrainDelayMap
-from app.services.etl.mapping.data_fetcher import fetch_delay_data
+from app.crud.delay_crud import ArrivalFilters, fetch_delays
+from app.services.forecasting import forecast_batch, forecast_stations
+from app.services.map_cache import map_cache
 
-from app.core.logging_config import setup_logging
+from app.core.logging_config import configure_logging
 
-logger = setup_logging()
+logger = configure_logging()
 
 router = APIRouter()
 
@@ -20,65 +25,20 @@ async def predict_station_busyness(
     db: AsyncSession,
     station: str,
     look_ahead_hours: int = 1
-) -> Dict[str, Any]:
+) -> Optional[Dict[str, Any]]:
     """
-    Predicts station busyness based on scheduled arrivals and current delays.
+    Predicts station busyness for the coming hours from its hour-of-week profile.
     
     Args:
-        db: Database session
+        db: Database session (unused; profiles are fitted by the pipeline)
         station: Station CRS code
         look_ahead_hours: Hours to look ahead for prediction
         
     Returns:
-        Dictionary containing prediction details
+        Dictionary containing prediction details, or None if the station has no history
     """
     try:
-        # Fetch scheduled arrivals
-        query = """
-            WITH upcoming_arrivals AS (
-                SELECT 
-                    destination_crs,
-                    scheduled_arrival,
-                    delay_minutes,
-                    COUNT(*) as train_count,
-                    AVG(delay_minutes) as avg_delay
-                FROM arrivals_tracking
-                WHERE destination_crs = :station
-                AND scheduled_arrival BETWEEN NOW() 
-                    AND NOW() + INTERVAL :hours HOUR
-                GROUP BY destination_crs, scheduled_arrival, delay_minutes
-            )
-            SELECT 
-                COUNT(*) as total_trains,
-                AVG(train_count) as avg_trains_per_hour,
-                AVG(CASE WHEN delay_minutes > 10 THEN 1 ELSE 0 END) as delayed_ratio,
-                AVG(avg_delay) as average_delay
-            FROM upcoming_arrivals;
-        """
-        
-        result = await db.execute(
-            text(query),
-            {"station": station, "hours": look_ahead_hours}
-        )
-        stats = dict(result.fetchone())
-        
-        # Calculate busyness score (example algorithm)
-        busyness_score = (
-            stats['avg_trains_per_hour'] * 
-            (1 + stats['delayed_ratio']) * 
-            (1 + stats['average_delay']/60)
-        )
-        
-        return {
-            "station": station,
-            "prediction_window": f"Next {look_ahead_hours} hour(s)",
-            "expected_trains": stats['total_trains'],
-            "average_delay": stats['average_delay'],
-            "busyness_score": busyness_score,
-            "busyness_level": "High" if busyness_score > 7 
-                            else "Medium" if busyness_score > 4 
-                            else "Low"
-        }
+        return forecast_stations([station], datetime.now(), look_ahead_hours)[station.upper()]
         
     except Exception as e:
         logger.error("Failed to predict station busyness: %s", str(e))
@@ -86,37 +46,47 @@ async def predict_station_busyness(
 
 @router.get("/train_delays_map", response_class=HTMLResponse, tags=["Train Delays"])
 async def get_train_delays_map(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session),
     hours: int = Query(1, ge=1, le=24),
-    station: Optional[str] = Query(None, max_length=3)
+    station: Optional[str] = Query(None, max_length=3),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Generates an HTML map showing train delays.
     
+    Rendered pages are cached per (hours, station) until the next upload,
+    and revalidated by browsers with their ETag.
+    
     Args:
         db: Database session
         hours: Hours of historical data to show
         station: Optional station filter
+        if_none_match: ETag of the page the client already has
     """
     try:
-        # Fetch data from PostGIS
-        delay_data = await fetch_delay_data(db, hours, station)
-        
-        if not delay_data:
-            return HTMLResponse(
-                content="<h2>No train data available for the specified criteria</h2>",
-                status_code=404)
-        """
-        Generates a map using TrainDelayMap .
-        """
         map_generator = TrainDelayMap()
-        map_html_path = await map_generator.generate_map(db, hours) 
-            
-        # Read generated HTML
-        with open(map_html_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        return HTMLResponse(content=html_content, status_code=200)
+        key = map_cache.key(hours, station, map_generator.render_mode)
+        cached = map_cache.get(key)
+
+        if cached is None:
+            generation = map_cache.generation()
+            html_content = await map_generator.render_html(db, hours, station)
+            if html_content is None:
+                return HTMLResponse(
+                    content="<h2>No train data available for the specified criteria</h2>",
+                    status_code=404)
+            cached = map_cache.put(key, html_content, generation)
 
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+        if if_none_match == cached.etag:
+            return Response(status_code=304, headers=headers)
+        return HTMLResponse(content=cached.html, status_code=200, headers=headers)
+
+    except ExecutorBusyError as e:
+        logger.warning(f"Map rendering is saturated: {e}")
+        return HTMLResponse(content="<h2>Map rendering is busy, please retry shortly</h2>",
+            status_code=503, headers={"Retry-After": "5"}
+        )
     except Exception as e:
         logger.error(f"Failed to generate map: {e}")
         return HTMLResponse(content="<h2>Internal Server Error</h2>",
@@ -126,7 +96,7 @@ async def get_train_delays_map(
 @router.get("/station_busyness/{station}", tags=["Station Predictions"])
 async def get_station_busyness(
     station: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session),
     look_ahead_hours: int = Query(1, ge=1, le=24)
 ):
     """
@@ -143,6 +113,11 @@ async def get_station_busyness(
             station.upper(), 
             look_ahead_hours
         )
+        if prediction is None:
+            return JSONResponse(
+                content={"error": f"No arrival history for station {station.upper()}"},
+                status_code=404
+            )
         return JSONResponse(content=prediction)
         
     except Exception as e:
@@ -152,10 +127,35 @@ async def get_station_busyness(
             status_code=500
         )
 
+class BatchBusynessRequest(BaseModel):
+    """Stations and look-ahead windows of a batch busyness request."""
+    stations: List[str] = Field(..., min_length=1, max_length=1000, description="Station CRS codes")
+    look_ahead_hours: List[Annotated[int, Field(ge=1, le=24)]] = Field(
+        [1], min_length=1, max_length=24, description="Windows in hours, each 1 to 24")
+    start: Optional[datetime] = Field(None, description="Window start (default: now)")
+
+@router.post("/station_busyness", tags=["Station Predictions"])
+async def get_station_busyness_batch(request: BatchBusynessRequest):
+    """
+    Predicts busyness of many stations for several windows in one call.
+    
+    Args:
+        request: Station CRS codes, look-ahead windows and an optional start
+    """
+    try:
+        return JSONResponse(content=forecast_batch(request.stations, request.look_ahead_hours, request.start))
+        
+    except Exception as e:
+        logger.error("Error predicting batch station busyness: %s", str(e))
+        return JSONResponse(
+            content={"error": "Failed to predict station busyness"},
+            status_code=500
+        )
+
 @router.get("/station_status/{station}", tags=["Station Status"])
 async def get_station_status(
     station: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_session),
     hours: int = Query(1, ge=1, le=24)
 ):
     """
@@ -168,12 +168,13 @@ async def get_station_status(
     """
     try:
         # Fetch both current delays and future predictions
-        delay_data = await fetch_delay_data(db, hours, station.upper())
+        filters = ArrivalFilters.window(hours=hours, station=station)
+        delay_data = await fetch_delays(db, filters, descending=True)
         prediction = await predict_station_busyness(db, station.upper())
         
         current_status = {
             "station": station.upper(),
-            "current_delays": delay_data,
+            "current_delays": jsonable_encoder(delay_data.to_records()),
             "prediction": prediction,
             "timestamp": datetime.now().isoformat()
         }
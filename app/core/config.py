@@ -2,7 +2,7 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, ConfigDict
-from typing import Optional
+from typing import Optional, List
  
 class Settings(BaseSettings):
     """
@@ -14,6 +14,8 @@ class Settings(BaseSettings):
         db_max_overflow: The maximum number of connections to allow in the pool.
         db_echo_log: Whether to enable SQL query logging.
         db_pool_recycle: The number of seconds after which inactive connections are recycled.
+        db_upload_method: How arrivals are loaded: "copy" (binary COPY via a staging table) or "insert".
+        db_upload_batch_size: Rows per upsert batch when loading arrivals.
 
     Test database settings:
         test_database_url: Connection string for the test database.
@@ -27,12 +29,84 @@ class Settings(BaseSettings):
         db_enable_migration: Whether to enable database migrations.
         db_verify_setup: Whether to verify the database setup after initialisation.
 
+    Partitioning settings:
+        partition_interval: Range of run dates per arrivals_tracking partition ("month" or "week").
+        partition_precreate: Number of future partitions created ahead by the initialiser.
+        partition_retention_days: Days of run dates kept in arrivals_tracking (0 = keep everything).
+        partition_retention_action: What happens to expired partitions ("detach" or "drop").
+
+    Leaderboard settings:
+        leaderboard_window_days: Days of arrivals, up to the newest one, ranked by the leaderboard views.
+        leaderboard_refresh_concurrently: Refresh the views without blocking readers.
+        crowding_window_hours: Default length of the window live crowding predictions cover.
+
+    Forecasting settings:
+        forecast_model_path: File holding the fitted hour-of-week station profiles.
+
+    Executor settings:
+        executor_kind: "thread" or "process" pool for CPU-bound work such as map rendering.
+        executor_workers: Workers of that pool (0 uses up to 4, bounded by the CPU count).
+        executor_max_queue: Tasks that may wait for a worker before new ones are refused.
+
+    Map settings:
+        map_render_mode: "stations" draws one marker per station with aggregated delays, "trains" two per service.
+        map_cluster: Cluster station markers where they are dense.
+        map_max_trains: Most recent arrivals drawn on a map.
+        map_cache_entries: Rendered maps kept in memory per API process (0 disables caching).
+        map_cache_disk: Also keep rendered maps on disk, shared by processes and restarts.
+        map_cache_dir: Directory of the on-disk map cache and of its invalidation stamp.
+        map_archive_dir: Directory the pipeline archives its timestamped maps in.
+        map_archive_max_files: Archived maps kept; the oldest are deleted first.
+        map_archive_max_bytes: Total size archived maps may take up.
+
+    Vector tile settings:
+        tile_cache_dir: Directory holding rendered vector tiles, one subdirectory per run date.
+        tile_cache_max_bytes: Size above which least recently used cached tiles are evicted.
+        tile_extent: Tile coordinate extent passed to ST_AsMVT.
+        tile_buffer: Extent units of geometry kept around each tile edge.
+        tile_cluster_max_zoom: Zoom levels below this merge nearby delay points into one.
+        tile_route_min_zoom: First zoom level with the origin -> destination routes layer.
+        tile_max_age: Cache-Control max-age in seconds for tiles of run dates that no longer change.
+        tile_recent_max_age: Cache-Control max-age in seconds for tiles of run dates still being re-fetched.
+
     PostGIS settings:
         postgis_srid: The SRID (Spatial Reference System Identifier) to use for PostGIS.
 
     Data extraction settings:
         station: The default station code for data extraction.
+        stations: Station codes extracted in a single pipeline run (a network region).
         days: The default number of days to extract data for.
+        extract_concurrency: Maximum number of station-day requests in flight at once.
+        extract_progress_interval: Number of completed station-days between progress reports.
+        extract_incremental: Only fetch station-days after each station's watermark.
+        extract_refetch_days: Most recent days (today, yesterday, ...) always re-fetched for late actuals.
+
+    Data cleaning settings:
+        clean_vectorised: Clean services with the columnar implementation instead of row by row.
+
+    Intermediate storage settings:
+        intermediate_format: Storage format between pipeline stages ("parquet" or "csv").
+        intermediate_dir: Directory holding the per-stage datasets.
+        intermediate_export_csv: Also export each stage to its legacy CSV file.
+
+    RTT client settings:
+        rtt_connection_limit: Maximum number of open connections held by the RTT client.
+        rtt_connection_limit_per_host: Maximum number of open connections per host (0 = no limit).
+        rtt_keepalive_timeout: Seconds an idle keep-alive connection is kept open.
+        rtt_dns_cache_ttl: Seconds resolved DNS entries are cached for.
+        rtt_request_timeout: Total timeout in seconds for a single RTT API request.
+        rtt_rate_limit: Sustained RTT API requests per second allowed per host.
+        rtt_rate_burst: Number of RTT API requests allowed in a burst per host.
+        rtt_retry_attempts: Total attempts per RTT request, including the first (at least 1).
+        rtt_retry_base_delay: Backoff ceiling in seconds for the first retry (doubles each retry).
+        rtt_retry_max_delay: Maximum wait in seconds between retries, including Retry-After.
+        rtt_circuit_failure_threshold: Consecutive failures that open the RTT circuit breaker.
+        rtt_circuit_reset_timeout: Seconds the circuit stays open before a trial request.
+        rtt_cache_enabled: Whether RTT responses are cached on disk.
+        rtt_cache_dir: Directory holding cached RTT responses.
+        rtt_cache_today_ttl: Seconds a response for a day still inside the re-fetch window stays valid.
+        rtt_cache_max_bytes: Size above which least recently used cache entries are evicted.
+        rtt_offline_replay: Serve RTT responses only from the cache, never from the API.
 
     Environment variables:
         RTT_USERNAME: Username for the Real Time Trains API.
@@ -48,6 +122,8 @@ class Settings(BaseSettings):
     db_max_overflow: int = 10
     db_echo_log: bool = False
     db_pool_recycle: int = 3600 
+    db_upload_method: str = "copy"
+    db_upload_batch_size: int = 5000
 
     # Test database settings
     test_database_url: PostgresDsn
@@ -61,17 +137,87 @@ class Settings(BaseSettings):
     db_enable_migration: bool = True
     db_verify_setup: bool = True
 
+    # Partitioning settings
+    partition_interval: str = "month"
+    partition_precreate: int = 3
+    partition_retention_days: int = 0
+    partition_retention_action: str = "detach"
+
+    # Leaderboard settings
+    leaderboard_window_days: int = 7
+    leaderboard_refresh_concurrently: bool = True
+    crowding_window_hours: int = 24
+
+    # Forecasting settings
+    forecast_model_path: str = "data/models/busyness_profiles.npz"
+
+    # Executor settings
+    executor_kind: str = "thread"
+    executor_workers: int = 0
+    executor_max_queue: int = 16
+
+    # Map settings
+    map_render_mode: str = "stations"
+    map_cluster: bool = True
+    map_max_trains: int = 5000
+    map_cache_entries: int = 32
+    map_cache_disk: bool = False
+    map_cache_dir: str = "data/maps/cache"
+    map_archive_dir: str = "data/maps"
+    map_archive_max_files: int = 48
+    map_archive_max_bytes: int = 200 * 1024 * 1024
+
+    # Vector tile settings
+    tile_cache_dir: str = "data/tiles"
+    tile_cache_max_bytes: int = 200 * 1024 ** 2
+    tile_extent: int = 4096
+    tile_buffer: int = 64
+    tile_cluster_max_zoom: int = 10
+    tile_route_min_zoom: int = 6
+    tile_max_age: int = 86400
+    tile_recent_max_age: int = 60
+
     # PostGIS settings
     postgis_srid: int = 4326 
     station: str = "FPK"  # Default 
+    stations: List[str] = ["FPK"]
     days: int = 7
+    extract_concurrency: int = 8
+    extract_progress_interval: int = 50
+    extract_incremental: bool = True
+    extract_refetch_days: int = 2
 
     # Environment variables 
     RTT_USERNAME: str 
     RTT_PASSWORD: str 
     RTT_ENDPOINT: str 
 
-  
+    # Data cleaning settings
+    clean_vectorised: bool = True
+
+    # Intermediate storage settings
+    intermediate_format: str = "parquet"
+    intermediate_dir: str = "data/outputs/intermediate"
+    intermediate_export_csv: bool = False
+
+    # RTT client settings
+    rtt_connection_limit: int = 20
+    rtt_connection_limit_per_host: int = 10
+    rtt_keepalive_timeout: int = 30
+    rtt_dns_cache_ttl: int = 300
+    rtt_request_timeout: int = 30
+    rtt_rate_limit: float = 5.0
+    rtt_rate_burst: int = 10
+    rtt_retry_attempts: int = 4
+    rtt_retry_base_delay: float = 0.5
+    rtt_retry_max_delay: float = 30.0
+    rtt_circuit_failure_threshold: int = 5
+    rtt_circuit_reset_timeout: float = 60.0
+    rtt_cache_enabled: bool = True
+    rtt_cache_dir: str = "data/outputs/raw_data"
+    rtt_cache_today_ttl: int = 300
+    rtt_cache_max_bytes: int = 500 * 1024 ** 2
+    rtt_offline_replay: bool = False
 
     # Derived configuration
     @property 
@@ -0,0 +1,150 @@
+# app/core/executor.py
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+T = TypeVar("T")
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class ExecutorBusyError(Exception):
+    """Raised when a task is refused because the executor queue is full."""
+
+    def __init__(self, name: str, queued: int):
+        super().__init__(f"Executor '{name}' is busy with {queued} queued tasks")
+        self.name = name
+        self.queued = queued
+
+
+class BoundedExecutor:
+    """
+    Runs blocking, CPU-bound work (map rendering, pandas, file writes) off the event loop.
+
+    At most ``max_workers`` tasks run at once and at most ``max_queue`` more
+    wait for a worker; anything beyond that is refused with
+    ``ExecutorBusyError`` instead of piling up behind slow renders. With the
+    ``process`` kind, callables and their arguments must be picklable, i.e.
+    module-level functions and plain data.
+
+    The pool is created lazily, so importing this module starts no workers.
+    """
+
+    def __init__(self, name: str = "cpu", kind: Optional[str] = None,
+                 max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.name = name
+        self.kind = (kind or settings.executor_kind).lower()
+        if self.kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unsupported executor kind: {self.kind}")
+        workers = settings.executor_workers if max_workers is None else max_workers
+        self.max_workers = workers if workers > 0 else min(4, os.cpu_count() or 1)
+        self.max_queue = settings.executor_max_queue if max_queue is None else max_queue
+
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix=f"{self.name}-executor")
+            logger.info("🧵 Started %s executor '%s' with %d workers", self.kind, self.name, self.max_workers)
+        return self._pool
+
+    def _admit(self) -> None:
+        with self._lock:
+            queued = max(0, self._in_flight - self.max_workers)
+            if self._in_flight >= self.max_workers and queued >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorBusyError(self.name, queued)
+            self._in_flight += 1
+            self._submitted += 1
+            self._peak_queued = max(self._peak_queued, self._in_flight - self.max_workers)
+
+    def _release(self, failed: bool, elapsed: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._busy_seconds += elapsed
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Runs ``func(*args, **kwargs)`` in the pool and waits for its result.
+
+        Args:
+            func (Callable[..., T]): Blocking callable
+            *args (Any): Positional arguments
+            **kwargs (Any): Keyword arguments
+
+        Returns:
+            T: Whatever ``func`` returns; its exceptions are re-raised here
+
+        Raises:
+            ExecutorBusyError: If all workers are busy and the queue is full
+        """
+        self._admit()
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), functools.partial(func, *args, **kwargs)
+            )
+            failed = False
+            return result
+        finally:
+            self._release(failed, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns queue-depth and throughput counters.
+
+        ``queued`` is the number of tasks waiting for a worker right now, and
+        ``busy_seconds`` the summed wall time of finished tasks, queueing
+        included.
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": min(self._in_flight, self.max_workers),
+                "queued": max(0, self._in_flight - self.max_workers),
+                "peak_queued": self._peak_queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "busy_seconds": round(self._busy_seconds, 3),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the workers; the next ``run`` starts a new pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+            logger.info("🛑 Stopped executor '%s'", self.name)
+
+
+cpu_executor = BoundedExecutor()
@@ -0,0 +1,269 @@
+# app/crud/delay_crud.py
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+TABLE_NAME = "arrivals_tracking"
+
+# Column name -> (SQL expression, NumPy dtype). Nullable integers are read as float64 with NaN.
+DELAY_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "id": ("id", "int64"),
+    "run_date": ("run_date", "datetime64[D]"),
+    "service_id": ("service_id", "object"),
+    "operator": ("operator", "object"),
+    "origin": ("origin", "object"),
+    "origin_crs": ("origin_crs", "object"),
+    "origin_longitude": ("ST_X(origin_geom::geometry)", "float64"),
+    "origin_latitude": ("ST_Y(origin_geom::geometry)", "float64"),
+    "destination": ("destination", "object"),
+    "destination_crs": ("destination_crs", "object"),
+    "destination_longitude": ("ST_X(destination_geom::geometry)", "float64"),
+    "destination_latitude": ("ST_Y(destination_geom::geometry)", "float64"),
+    "scheduled_arrival": ("scheduled_arrival", "datetime64[us]"),
+    "actual_arrival": ("actual_arrival", "datetime64[us]"),
+    "delay_minutes": ("delay_minutes", "float64"),
+    "is_passenger_train": ("is_passenger_train", "bool"),
+}
+
+# Keyset pagination walks (scheduled_arrival, id), so both are always selected
+KEY_COLUMNS = ("scheduled_arrival", "id")
+CURSOR_SEPARATOR = "~"
+
+BBox = Tuple[float, float, float, float]
+
+def parse_bbox(value: Optional[str]) -> Optional[BBox]:
+    """
+    Parses a "min_lon,min_lat,max_lon,max_lat" bounding box.
+
+    Args:
+        value (Optional[str]): Comma-separated WGS84 bounds
+
+    Returns:
+        Optional[BBox]: The bounds, or None if no box was given
+
+    Raises:
+        ValueError: If the box is malformed or empty
+    """
+    if not value:
+        return None
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lon >= max_lon or min_lat >= max_lat:
+        raise ValueError("bbox minimums must be below its maximums")
+    return min_lon, min_lat, max_lon, max_lat
+
+@dataclass
+class ArrivalFilters:
+    """
+    Filters shared by every arrival query.
+
+    Attributes:
+        start (datetime): First scheduled arrival included
+        end (datetime): Scheduled arrivals before this time are included
+        operator (Optional[str]): Only this operator
+        station (Optional[str]): Only arrivals whose origin or destination CRS is this station
+        bbox (Optional[BBox]): Only arrivals whose origin or destination lies in this box
+        passenger_only (bool): Only passenger trains
+    """
+    start: datetime
+    end: datetime
+    operator: Optional[str] = None
+    station: Optional[str] = None
+    bbox: Optional[BBox] = None
+    passenger_only: bool = True
+
+    @classmethod
+    def window(cls, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               hours: int = 24, **kwargs: Any) -> "ArrivalFilters":
+        """Builds filters over [start, end), defaulting to the ``hours`` before now."""
+        end = end or (start + timedelta(hours=hours) if start else datetime.now())
+        start = start or end - timedelta(hours=hours)
+        if start >= end:
+            raise ValueError(f"Window start {start} is not before its end {end}")
+        return cls(start=start, end=end, **kwargs)
+
+    def where_clause(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Renders the filters as a WHERE clause over arrivals_tracking.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: SQL condition and its bind parameters
+        """
+        conditions = [
+            # run_date bounds let the planner prune partitions; arrivals after midnight keep the previous run date
+            "run_date BETWEEN :first_run_date AND :last_run_date",
+            "scheduled_arrival >= :start AND scheduled_arrival < :end",
+        ]
+        params: Dict[str, Any] = {
+            "first_run_date": (self.start - timedelta(days=1)).date(),
+            "last_run_date": self.end.date(),
+            "start": self.start,
+            "end": self.end,
+        }
+        if self.passenger_only:
+            conditions.append("is_passenger_train = TRUE")
+        if self.operator:
+            conditions.append("operator = :operator")
+            params["operator"] = self.operator
+        if self.station:
+            conditions.append("(origin_crs = :station OR destination_crs = :station)")
+            params["station"] = self.station.upper()
+        if self.bbox:
+            conditions.append(
+                "(origin_geom && ST_MakeEnvelope(:min_lon, :min_lat, :max_lon, :max_lat, :srid) "
+                "OR destination_geom && ST_MakeEnvelope(:min_lon, :min_lat, :max_lon, :max_lat, :srid))"
+            )
+            params.update(dict(zip(("min_lon", "min_lat", "max_lon", "max_lat"), self.bbox)))
+            params["srid"] = settings.postgis_srid
+        return " AND ".join(conditions), params
+
+def encode_cursor(scheduled_arrival: Any, row_id: int) -> str:
+    """Builds the opaque page cursor pointing just past the given row."""
+    return f"{pd.Timestamp(scheduled_arrival).isoformat()}{CURSOR_SEPARATOR}{int(row_id)}"
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Splits a page cursor into the (scheduled_arrival, id) key it points past.
+
+    Raises:
+        ValueError: If the cursor was not made by encode_cursor
+    """
+    scheduled, separator, row_id = cursor.rpartition(CURSOR_SEPARATOR)
+    if not separator:
+        raise ValueError(f"Malformed cursor: {cursor}")
+    return datetime.fromisoformat(scheduled), int(row_id)
+
+@dataclass
+class DelayBatch:
+    """
+    One page of arrivals, stored column by column.
+
+    Attributes:
+        columns (Dict[str, np.ndarray]): One array per selected column, in DELAY_COLUMNS dtypes
+        next_cursor (Optional[str]): Cursor of the following page, None on the last page
+    """
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    next_cursor: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the page as a DataFrame sharing the column arrays."""
+        return pd.DataFrame(self.columns, copy=False)
+
+    def column_lists(self) -> Dict[str, List[Any]]:
+        """Returns the columns as Python lists, with None for missing values, for JSON output."""
+        lists = {}
+        for name, values in self.columns.items():
+            if values.dtype.kind == "f":
+                lists[name] = np.where(np.isnan(values), None, values).tolist()
+            elif values.dtype.kind == "M":
+                lists[name] = values.astype(object).tolist()  # NaT becomes None
+            else:
+                lists[name] = values.tolist()
+        return lists
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Returns one dict per row; only for consumers that genuinely work row by row."""
+        lists = self.column_lists()
+        return [dict(zip(lists, values)) for values in zip(*lists.values())]
+
+def delay_query(filters: ArrivalFilters, columns: Optional[Sequence[str]] = None,
+                limit: Optional[int] = None, cursor: Optional[str] = None,
+                descending: bool = False, table: str = TABLE_NAME) -> Tuple[str, Dict[str, Any], List[str]]:
+    """
+    Builds the keyset-paginated query over arrivals.
+
+    Rows are ordered by (scheduled_arrival, id), so a page continues exactly
+    where the previous one stopped, at the cost of one index probe, however
+    deep into the results it is.
+
+    Args:
+        filters (ArrivalFilters): Rows to include
+        columns (Optional[Sequence[str]]): DELAY_COLUMNS to select (default: all)
+        limit (Optional[int]): Rows per page (default: no limit)
+        cursor (Optional[str]): next_cursor of the previous page
+        descending (bool): Newest arrivals first
+        table (str): Table to read
+
+    Returns:
+        Tuple[str, Dict[str, Any], List[str]]: SQL, bind parameters and selected column names
+    """
+    names = list(columns or DELAY_COLUMNS)
+    unknown = [name for name in names if name not in DELAY_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown delay columns: {unknown}")
+    names += [name for name in KEY_COLUMNS if name not in names]
+
+    where, params = filters.where_clause()
+    if cursor:
+        params["after_arrival"], params["after_id"] = decode_cursor(cursor)
+        where += f" AND (scheduled_arrival, id) {'<' if descending else '>'} (:after_arrival, :after_id)"
+    direction = "DESC" if descending else "ASC"
+    select = ",\n            ".join(f"{DELAY_COLUMNS[name][0]} AS {name}" for name in names)
+    sql = f"""
+        SELECT
+            {select}
+        FROM {table}
+        WHERE {where}
+        ORDER BY scheduled_arrival {direction}, id {direction}
+    """
+    if limit:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    return sql, params, names
+
+def to_columns(rows: Sequence[Sequence[Any]], names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Transposes result tuples into one typed array per column.
+
+    Args:
+        rows (Sequence[Sequence[Any]]): Result rows, in ``names`` order
+        names (Sequence[str]): DELAY_COLUMNS of the rows
+
+    Returns:
+        Dict[str, np.ndarray]: Arrays in the DELAY_COLUMNS dtypes
+    """
+    values = list(zip(*rows)) if rows else [()] * len(names)
+    return {
+        name: np.array(column, dtype=DELAY_COLUMNS[name][1])
+        for name, column in zip(names, values)
+    }
+
+async def fetch_delays(db_session: AsyncSession, filters: ArrivalFilters,
+                       columns: Optional[Sequence[str]] = None, limit: Optional[int] = None,
+                       cursor: Optional[str] = None, descending: bool = False,
+                       table: str = TABLE_NAME) -> DelayBatch:
+    """
+    Fetches one page of arrivals as columns.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        filters (ArrivalFilters): Rows to include.
+        columns (Optional[Sequence[str]]): DELAY_COLUMNS to select (default: all).
+        limit (Optional[int]): Rows per page (default: no limit).
+        cursor (Optional[str]): next_cursor of the previous page.
+        descending (bool): Newest arrivals first.
+        table (str): Table to read.
+
+    Returns:
+        DelayBatch: The page; next_cursor is set when a full page was returned.
+    """
+    sql, params, names = delay_query(filters, columns, limit, cursor, descending, table)
+    result = await db_session.execute(text(sql), params)
+    batch = DelayBatch(columns=to_columns(result.all(), names))
+
+    if limit and len(batch) == limit:
+        batch.next_cursor = encode_cursor(batch.columns["scheduled_arrival"][-1], batch.columns["id"][-1])
+    logger.info("✅ Fetched %d arrivals", len(batch))
+    return batch
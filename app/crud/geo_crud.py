@@ -0,0 +1,89 @@
+# app/crud/geo_crud.py
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.core.logging_config import configure_logging
+from app.crud.delay_crud import ArrivalFilters
+
+logger = configure_logging()
+TABLE_NAME = "arrivals_tracking"
+
+# Geometry of a feature: either station point, or the straight origin -> destination route
+GEOMETRIES = {
+    "origin": "origin_geom",
+    "destination": "destination_geom",
+    "route": "ST_MakeLine(origin_geom, destination_geom)",
+}
+
+def feature_query(filters: ArrivalFilters, geometry: str = "destination",
+                  limit: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Builds a query returning one serialised GeoJSON Feature per arrival.
+
+    Features are serialised by PostgreSQL, so rows pass through Python as
+    ready-made JSON text.
+
+    Args:
+        filters (ArrivalFilters): Rows to include
+        geometry (str): "origin", "destination" or "route"
+        limit (Optional[int]): Maximum number of features
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: SQL and bind parameters
+    """
+    if geometry not in GEOMETRIES:
+        raise ValueError(f"Unsupported geometry: {geometry}")
+    geom = GEOMETRIES[geometry]
+    where, params = filters.where_clause()
+    sql = f"""
+        SELECT json_build_object(
+            'type', 'Feature',
+            'id', id,
+            'geometry', ST_AsGeoJSON({geom}, 6)::json,
+            'properties', json_build_object(
+                'run_date', run_date,
+                'service_id', service_id,
+                'operator', operator,
+                'origin', origin,
+                'origin_crs', origin_crs,
+                'destination', destination,
+                'destination_crs', destination_crs,
+                'scheduled_arrival', scheduled_arrival,
+                'actual_arrival', actual_arrival,
+                'delay_minutes', delay_minutes,
+                'is_passenger_train', is_passenger_train
+            )
+        )::text AS feature
+        FROM {TABLE_NAME}
+        WHERE origin_geom IS NOT NULL AND destination_geom IS NOT NULL AND {where}
+        ORDER BY scheduled_arrival
+    """
+    if limit:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    return sql, params
+
+async def stream_features(db_session: AsyncSession, filters: ArrivalFilters, geometry: str = "destination",
+                          limit: Optional[int] = None, chunk_size: int = 1000) -> AsyncIterator[List[str]]:
+    """
+    Streams serialised GeoJSON features from a server-side cursor.
+
+    Only ``chunk_size`` rows are held in memory at a time.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        filters (ArrivalFilters): Rows to include.
+        geometry (str): "origin", "destination" or "route".
+        limit (Optional[int]): Maximum number of features.
+        chunk_size (int): Rows fetched from the cursor per round trip.
+
+    Yields:
+        List[str]: Feature JSON strings, up to ``chunk_size`` at a time.
+    """
+    sql, params = feature_query(filters, geometry, limit)
+    result = await db_session.stream(text(sql).execution_options(yield_per=chunk_size), params)
+    total = 0
+    async for rows in result.partitions(chunk_size):
+        total += len(rows)
+        yield [row[0] for row in rows]
+    logger.info("🗺️ Streamed %d GeoJSON features", total)
@@ -0,0 +1,39 @@
+# app/crud/leaderboard_crud.py
+from typing import Any, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.core.logging_config import configure_logging
+from app.db.views import MATERIALIZED_VIEWS, REFRESH_LOG_TABLE
+
+logger = configure_logging()
+
+async def get_leaderboard(db_session: AsyncSession, view_name: str, limit: int = 20) -> Dict[str, Any]:
+    """
+    Reads the top rows of a leaderboard materialised view.
+
+    The view is ordered by its precomputed rank, so the cost depends on
+    ``limit`` and not on the number of arrivals stored.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        view_name (str): One of MATERIALIZED_VIEWS.
+        limit (int): Number of rows to return.
+
+    Returns:
+        Dict[str, Any]: ``refreshed_at`` (None if never refreshed) and the ranked ``rows``.
+    """
+    if view_name not in MATERIALIZED_VIEWS:
+        raise ValueError(f"Unknown leaderboard view: {view_name}")
+
+    refreshed = await db_session.execute(
+        text(f"SELECT refreshed_at FROM {REFRESH_LOG_TABLE} WHERE view_name = :name"),
+        {"name": view_name}
+    )
+    result = await db_session.execute(
+        text(f"SELECT * FROM {view_name} ORDER BY rank LIMIT :limit"),
+        {"limit": limit}
+    )
+    return {
+        "refreshed_at": refreshed.scalar(),
+        "rows": [dict(row._mapping) for row in result],
+    }
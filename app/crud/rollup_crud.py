@@ -0,0 +1,276 @@
+# app/crud/rollup_crud.py
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy import text
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+TABLE_NAME = "station_hourly_stats"
+SOURCE_TABLE = "arrivals_tracking"
+
+# Histogram bin edges in delay minutes: (-inf, 0), [0, 5), [5, 10), ..., [60, inf)
+DELAY_HISTOGRAM_EDGES = [0, 5, 10, 15, 30, 60]
+DELAYED_THRESHOLD = 10
+HISTOGRAM_COLUMNS = [f"bin_{i}" for i in range(len(DELAY_HISTOGRAM_EDGES) + 1)]
+
+Executor = Union[AsyncConnection, AsyncSession]
+
+# Rollup rows of one station, served by the (station_crs, operator, hour_bucket) primary key
+HOURLY_STATS_QUERY = f"""
+    SELECT station_crs, operator, hour_bucket, train_count, delay_sum,
+           delay_mean, delayed_count, delay_histogram
+    FROM {TABLE_NAME}
+    WHERE station_crs = :station
+      AND hour_bucket >= :start AND hour_bucket < :end
+      AND (CAST(:operator AS TEXT) IS NULL OR operator = :operator)
+    ORDER BY hour_bucket, operator
+"""
+
+def histogram_labels() -> List[str]:
+    """Returns a readable label per histogram bin, e.g. "<0", "0-4", ..., "60+"."""
+    labels = [f"<{DELAY_HISTOGRAM_EDGES[0]}"]
+    for low, high in zip(DELAY_HISTOGRAM_EDGES, DELAY_HISTOGRAM_EDGES[1:]):
+        labels.append(f"{low}-{high - 1}")
+    labels.append(f"{DELAY_HISTOGRAM_EDGES[-1]}+")
+    return labels
+
+def known_delay_count_sql(column: str = "delay_histogram") -> str:
+    """
+    Returns SQL adding up a rollup row's histogram bins: its arrivals with a known delay.
+
+    Average delays divide delay_sum by this count, not by train_count, so
+    arrivals without a delay do not pull the average towards zero.
+    """
+    return " + ".join(f"{column}[{i + 1}]" for i in range(len(DELAY_HISTOGRAM_EDGES) + 1))
+
+def _histogram_sql() -> str:
+    bins = [f"COUNT(*) FILTER (WHERE a.delay_minutes < {DELAY_HISTOGRAM_EDGES[0]})"]
+    for low, high in zip(DELAY_HISTOGRAM_EDGES, DELAY_HISTOGRAM_EDGES[1:]):
+        bins.append(f"COUNT(*) FILTER (WHERE a.delay_minutes >= {low} AND a.delay_minutes < {high})")
+    bins.append(f"COUNT(*) FILTER (WHERE a.delay_minutes >= {DELAY_HISTOGRAM_EDGES[-1]})")
+    return f"ARRAY[{', '.join(bins)}]::INTEGER[]"
+
+def _upsert_sql(source: str, where: str, group_by: str) -> str:
+    """Builds the aggregate-and-upsert statement shared by refresh and rebuild."""
+    return f"""
+        INSERT INTO {TABLE_NAME} (
+            station_crs, operator, hour_bucket, train_count, delay_sum,
+            delay_mean, delayed_count, delay_histogram, updated_at
+        )
+        SELECT
+            a.destination_crs,
+            a.operator,
+            date_trunc('hour', a.scheduled_arrival),
+            COUNT(*),
+            COALESCE(SUM(a.delay_minutes), 0),
+            AVG(a.delay_minutes),
+            COUNT(*) FILTER (WHERE a.delay_minutes > {DELAYED_THRESHOLD}),
+            {_histogram_sql()},
+            NOW()
+        FROM {source}
+        WHERE a.destination_crs IS NOT NULL AND a.operator IS NOT NULL {where}
+        GROUP BY {group_by}
+        ON CONFLICT (station_crs, operator, hour_bucket) DO UPDATE
+        SET train_count = EXCLUDED.train_count,
+            delay_sum = EXCLUDED.delay_sum,
+            delay_mean = EXCLUDED.delay_mean,
+            delayed_count = EXCLUDED.delayed_count,
+            delay_histogram = EXCLUDED.delay_histogram,
+            updated_at = NOW()
+    """
+
+def affected_buckets(df: pd.DataFrame) -> Tuple[List[str], List[str], List[datetime]]:
+    """
+    Lists the (station, operator, hour) buckets touched by a batch of arrivals.
+
+    Args:
+        df (pd.DataFrame): Arrivals with destination_crs, operator and a timestamp scheduled_arrival
+
+    Returns:
+        Tuple[List[str], List[str], List[datetime]]: Parallel lists of stations, operators and hour buckets
+    """
+    keys = pd.DataFrame({
+        "station_crs": df["destination_crs"],
+        "operator": df["operator"],
+        "hour_bucket": pd.to_datetime(df["scheduled_arrival"]).dt.floor("h"),
+    }).dropna().drop_duplicates()
+    return (
+        keys["station_crs"].tolist(),
+        keys["operator"].tolist(),
+        [ts.to_pydatetime() for ts in keys["hour_bucket"]],
+    )
+
+async def refresh_hourly_stats(executor: Executor, df: pd.DataFrame) -> int:
+    """
+    Recomputes the rollup for the buckets touched by freshly loaded arrivals.
+
+    Buckets are recomputed from arrivals_tracking rather than adjusted by
+    deltas, so upserted (changed) arrivals are counted exactly once. Call it
+    in the same transaction as the load.
+
+    Args:
+        executor (Executor): Connection or session to use.
+        df (pd.DataFrame): Arrivals that were just loaded.
+
+    Returns:
+        int: Number of buckets written.
+    """
+    stations, operators, hours = affected_buckets(df)
+    if not stations:
+        return 0
+
+    source = f"""
+        unnest(CAST(:stations AS TEXT[]), CAST(:operators AS TEXT[]), CAST(:hours AS TIMESTAMP[]))
+            AS k(station_crs, operator, hour_bucket)
+        JOIN {SOURCE_TABLE} a
+          ON a.destination_crs = k.station_crs
+         AND a.operator = k.operator
+         AND a.scheduled_arrival >= k.hour_bucket
+         AND a.scheduled_arrival < k.hour_bucket + INTERVAL '1 hour'
+    """
+    result = await executor.execute(
+        text(_upsert_sql(source, "", "a.destination_crs, a.operator, date_trunc('hour', a.scheduled_arrival)")),
+        {"stations": stations, "operators": operators, "hours": hours}
+    )
+    logger.info("📈 Refreshed %d hourly station buckets", result.rowcount)
+    return result.rowcount
+
+async def rebuild_hourly_stats(executor: Executor, since: Optional[date] = None) -> int:
+    """
+    Recomputes the rollup from arrivals_tracking, e.g. after a backfill or migration.
+
+    Args:
+        executor (Executor): Connection or session to use.
+        since (Optional[date]): Only rebuild buckets from this run date on (default: everything).
+
+    Returns:
+        int: Number of buckets written.
+    """
+    where = "AND a.run_date >= :since" if since else ""
+    result = await executor.execute(
+        text(_upsert_sql(f"{SOURCE_TABLE} a", where, "a.destination_crs, a.operator, date_trunc('hour', a.scheduled_arrival)")),
+        {"since": since} if since else {}
+    )
+    logger.info("📈 Rebuilt %d hourly station buckets", result.rowcount)
+    return result.rowcount
+
+async def get_hourly_stats(
+    db_session: AsyncSession,
+    station: str,
+    start: datetime,
+    end: datetime,
+    operator: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Reads the hourly rollup of a station.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        station (str): Station CRS code.
+        start (datetime): First hour bucket to include.
+        end (datetime): Hour buckets before this time are included.
+        operator (Optional[str]): Only this operator.
+
+    Returns:
+        List[Dict[str, Any]]: One row per operator and hour, oldest first.
+    """
+    result = await db_session.execute(
+        text(HOURLY_STATS_QUERY),
+        {"station": station, "start": start, "end": end, "operator": operator}
+    )
+    return [dict(row._mapping) for row in result]
+
+async def get_rollup_frame(
+    executor: Executor,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    stations: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Loads rollup buckets as columns, summed over operators, for model fitting.
+
+    Args:
+        executor (Executor): Connection or session to use.
+        start (Optional[datetime]): First hour bucket to include (default: the oldest).
+        end (Optional[datetime]): Hour buckets before this time are included (default: all).
+        stations (Optional[List[str]]): Only these stations (default: all).
+
+    Returns:
+        pd.DataFrame: station_crs, hour_bucket, train_count, delay_sum, delayed_count
+            and one ``bin_<i>`` column per histogram bin.
+    """
+    bins = ", ".join(
+        f"SUM(delay_histogram[{i + 1}])::BIGINT AS {column}" for i, column in enumerate(HISTOGRAM_COLUMNS)
+    )
+    result = await executor.execute(
+        text(f"""
+            SELECT station_crs, hour_bucket,
+                   SUM(train_count)::BIGINT AS train_count,
+                   SUM(delay_sum)::BIGINT AS delay_sum,
+                   SUM(delayed_count)::BIGINT AS delayed_count,
+                   {bins}
+            FROM {TABLE_NAME}
+            WHERE (CAST(:start AS TIMESTAMP) IS NULL OR hour_bucket >= :start)
+              AND (CAST(:end AS TIMESTAMP) IS NULL OR hour_bucket < :end)
+              AND (CAST(:stations AS TEXT[]) IS NULL OR station_crs = ANY(CAST(:stations AS TEXT[])))
+            GROUP BY station_crs, hour_bucket
+        """),
+        {"start": start, "end": end, "stations": stations}
+    )
+    columns = ["station_crs", "hour_bucket", "train_count", "delay_sum", "delayed_count", *HISTOGRAM_COLUMNS]
+    return pd.DataFrame(result.fetchall(), columns=columns)
+
+async def get_rollup_version(executor: Executor) -> Optional[datetime]:
+    """Returns when the rollup was last written to, or None if it is empty."""
+    result = await executor.execute(text(f"SELECT MAX(updated_at) FROM {TABLE_NAME}"))
+    return result.scalar()
+
+async def get_revised_stations(executor: Executor, before: datetime, since: datetime) -> List[str]:
+    """
+    Lists stations whose buckets before ``before`` were rewritten after ``since``.
+
+    Used to find backfilled or newly added history that lands behind an
+    incremental consumer's watermark.
+
+    Args:
+        executor (Executor): Connection or session to use.
+        before (datetime): Only buckets earlier than this hour count.
+        since (datetime): Only writes after this time count.
+
+    Returns:
+        List[str]: Station CRS codes, sorted.
+    """
+    result = await executor.execute(
+        text(f"""
+            SELECT DISTINCT station_crs FROM {TABLE_NAME}
+            WHERE hour_bucket < :before AND updated_at > :since
+            ORDER BY station_crs
+        """),
+        {"before": before, "since": since}
+    )
+    return [row[0] for row in result]
+
+def summarise_hourly_stats(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combines rollup rows (e.g. all operators over a window) into one summary.
+
+    Args:
+        rows (List[Dict[str, Any]]): Rows as returned by get_hourly_stats.
+
+    Returns:
+        Dict[str, Any]: Total trains, mean delay, delayed ratio and combined histogram.
+    """
+    bins = len(DELAY_HISTOGRAM_EDGES) + 1
+    train_count = sum(row["train_count"] for row in rows)
+    delay_sum = sum(row["delay_sum"] for row in rows)
+    delayed_count = sum(row["delayed_count"] for row in rows)
+    histogram = [sum(row["delay_histogram"][i] for row in rows) for i in range(bins)]
+    known_delays = sum(histogram)  # Same denominator as known_delay_count_sql
+    return {
+        "train_count": train_count,
+        "average_delay": delay_sum / known_delays if known_delays else None,
+        "delayed_ratio": delayed_count / train_count if train_count else None,
+        "delay_histogram": dict(zip(histogram_labels(), histogram)),
+    }
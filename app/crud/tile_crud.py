@@ -0,0 +1,130 @@
+# app/crud/tile_crud.py
+from datetime import date
+from typing import Any, Dict, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+TABLE_NAME = "arrivals_tracking"
+
+WEB_MERCATOR_WIDTH = 40075016.68557849  # Metres spanned by zoom level 0
+CLUSTER_CELLS = 16  # Clusters per tile edge below tile_cluster_max_zoom
+MAX_ZOOM = 22
+
+# Upper bound (inclusive) of each delay band in minutes; the last band is open-ended
+DELAY_BANDS = [("on_time", 1), ("minor", 5), ("moderate", 15), ("severe", None)]
+
+def delay_band_sql(column: str = "delay_minutes") -> str:
+    """Renders a CASE expression mapping delays to their DELAY_BANDS name."""
+    cases = " ".join(
+        f"WHEN {column} <= {limit} THEN '{name}'" for name, limit in DELAY_BANDS if limit is not None
+    )
+    return f"CASE WHEN {column} IS NULL THEN 'unknown' {cases} ELSE '{DELAY_BANDS[-1][0]}' END"
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    """Whether (z, x, y) addresses an existing XYZ tile."""
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+def cluster_cell_size(z: int) -> float:
+    """Grid size in metres used to merge delay points at zoom ``z``; 0 disables clustering."""
+    if z >= settings.tile_cluster_max_zoom:
+        return 0.0
+    return WEB_MERCATOR_WIDTH / 2 ** z / CLUSTER_CELLS
+
+def tile_query(z: int, x: int, y: int, run_date: date) -> Tuple[str, Dict[str, Any]]:
+    """
+    Builds the query rendering one Mapbox Vector Tile of a run date's arrivals.
+
+    The ``delays`` layer holds one point per destination station (or per
+    grid cell at low zoom) and delay band, with train counts and delays. From
+    tile_route_min_zoom on, a ``routes`` layer holds one line per
+    origin -> destination pair and delay band, for routes starting or ending
+    in the tile.
+
+    Args:
+        z (int): Zoom level
+        x (int): Tile column
+        y (int): Tile row
+        run_date (date): Run date of the arrivals
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: SQL returning the tile as bytea, and its bind parameters
+    """
+    cell = cluster_cell_size(z)
+    point = "ST_Transform(a.destination_geom, 3857)"
+    cluster_key = f"ST_SnapToGrid({point}, :cell)" if cell else "a.destination_crs"
+    margin = settings.tile_buffer / settings.tile_extent
+
+    sql = f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS tile,
+                   ST_Transform(ST_TileEnvelope(:z, :x, :y, margin => :margin), 4326) AS query_box
+        ),
+        points AS (
+            SELECT
+                ST_AsMVTGeom(ST_Centroid(ST_Collect({point})), b.tile, :extent, :buffer, true) AS geom,
+                {delay_band_sql('a.delay_minutes')} AS delay_band,
+                COUNT(*) AS train_count,
+                ROUND(AVG(a.delay_minutes)::NUMERIC, 1)::DOUBLE PRECISION AS avg_delay,
+                MAX(a.delay_minutes) AS max_delay,
+                COUNT(DISTINCT a.destination_crs) AS station_count,
+                MIN(a.destination_crs) AS station_crs,
+                MIN(a.destination) AS station
+            FROM {TABLE_NAME} a, bounds b
+            WHERE a.run_date = :run_date
+              AND a.destination_geom && b.query_box
+            GROUP BY b.tile, {cluster_key}, 2
+        )
+        SELECT COALESCE((SELECT ST_AsMVT(p, 'delays', :extent, 'geom') FROM points p WHERE p.geom IS NOT NULL), ''::BYTEA)
+    """
+    if z >= settings.tile_route_min_zoom:
+        sql += f"""
+            || COALESCE((
+                SELECT ST_AsMVT(r, 'routes', :extent, 'geom') FROM (
+                    SELECT
+                        ST_AsMVTGeom(
+                            ST_Transform(ST_MakeLine(ST_Centroid(ST_Collect(a.origin_geom)),
+                                                     ST_Centroid(ST_Collect(a.destination_geom))), 3857),
+                            b.tile, :extent, :buffer, true
+                        ) AS geom,
+                        a.origin_crs,
+                        a.destination_crs,
+                        {delay_band_sql('a.delay_minutes')} AS delay_band,
+                        COUNT(*) AS train_count,
+                        ROUND(AVG(a.delay_minutes)::NUMERIC, 1)::DOUBLE PRECISION AS avg_delay
+                    FROM {TABLE_NAME} a, bounds b
+                    WHERE a.run_date = :run_date
+                      AND a.origin_geom IS NOT NULL AND a.destination_geom IS NOT NULL
+                      -- Served by the GiST indices on both ends; routes merely crossing the tile are left out
+                      AND (a.origin_geom && b.query_box OR a.destination_geom && b.query_box)
+                    GROUP BY b.tile, a.origin_crs, a.destination_crs, 4
+                ) r WHERE r.geom IS NOT NULL
+            ), ''::BYTEA)
+        """
+    params = {
+        "z": z, "x": x, "y": y, "run_date": run_date, "margin": margin,
+        "extent": settings.tile_extent, "buffer": settings.tile_buffer,
+    }
+    if cell:
+        params["cell"] = cell
+    return sql, params
+
+async def get_tile(db_session: AsyncSession, z: int, x: int, y: int, run_date: date) -> bytes:
+    """
+    Renders one vector tile of a run date's arrivals.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        z (int): Zoom level.
+        x (int): Tile column.
+        y (int): Tile row.
+        run_date (date): Run date of the arrivals.
+
+    Returns:
+        bytes: Encoded tile; empty when no arrivals fall in it.
+    """
+    sql, params = tile_query(z, x, y, run_date)
+    result = await db_session.execute(text(sql), params)
+    return bytes(result.scalar() or b"")
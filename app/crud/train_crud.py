@@ -1,20 +1,200 @@
 # app/crud/train_crud.py
+import time
 import pandas as pd
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 from app.core.logging_config import configure_logging
+from app.core.config import settings
+from app.db.partitions import ensure_partitions
+from app.crud.rollup_crud import refresh_hourly_stats
+from app.services.ingest_events import notify_ingest
 
 logger = configure_logging()
 TABLE_NAME = "arrivals_tracking"
 
-async def upload_to_db(df_merged: pd.DataFrame, db_seession: AsyncSession) -> Optional[Exception]:
+# Scalar columns loaded into arrivals_tracking; the geometries are built from the coordinates
+ARRIVAL_COLUMNS = [
+    ("run_date", "DATE"),
+    ("service_id", "VARCHAR(10)"),
+    ("operator", "VARCHAR(50)"),
+    ("origin", "VARCHAR(50)"),
+    ("origin_crs", "VARCHAR(6)"),
+    ("origin_latitude", "DOUBLE PRECISION"),
+    ("origin_longitude", "DOUBLE PRECISION"),
+    ("destination", "VARCHAR(50)"),
+    ("destination_crs", "VARCHAR(6)"),
+    ("destination_latitude", "DOUBLE PRECISION"),
+    ("destination_longitude", "DOUBLE PRECISION"),
+    ("scheduled_arrival", "TIMESTAMP"),
+    ("actual_arrival", "TIMESTAMP"),
+    ("is_actual", "BOOLEAN"),
+    ("delay_minutes", "INTEGER"),
+    ("is_passenger_train", "BOOLEAN"),
+    ("was_scheduled_to_stop", "BOOLEAN"),
+    ("stop_status", "VARCHAR(20)"),
+]
+COLUMN_NAMES = [name for name, _ in ARRIVAL_COLUMNS]
+STAGING_TABLE = "arrivals_staging"
+
+# Natural key of an arrival (uq_arrivals_tracking_natural_key) and the columns a re-load may change
+NATURAL_KEY = ["run_date", "service_id", "destination_crs", "scheduled_arrival"]
+MUTABLE_COLUMNS = ["actual_arrival", "is_actual", "delay_minutes"]
+
+def _on_conflict_clause() -> str:
+    """Updates an existing arrival only when its actual arrival or delay changed."""
+    assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in MUTABLE_COLUMNS)
+    current = ", ".join(f"{TABLE_NAME}.{column}" for column in MUTABLE_COLUMNS)
+    incoming = ", ".join(f"EXCLUDED.{column}" for column in MUTABLE_COLUMNS)
+    return f"""
+        ON CONFLICT ({", ".join(NATURAL_KEY)}) DO UPDATE
+        SET {assignments}, updated_at = NOW()
+        WHERE ({current}) IS DISTINCT FROM ({incoming})
+    """
+
+def arrival_records(df: pd.DataFrame) -> List[Tuple[Any, ...]]:
+    """
+    Converts arrivals to tuples of plain Python values in ARRIVAL_COLUMNS order.
+
+    Args:
+        df (pd.DataFrame): Merged arrivals with timestamp arrival columns.
+
+    Returns:
+        List[Tuple[Any, ...]]: One tuple per row, with None for missing values.
+    """
+    columns = []
+    for name in COLUMN_NAMES:
+        column = df[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            values = [value.to_pydatetime() if not pd.isna(value) else None for value in column]
+        else:
+            # tolist() turns NumPy scalars into int/float/bool, which the binary COPY encoders expect
+            values = column.astype(object).where(column.notna(), None).tolist()
+        columns.append(values)
+    return list(zip(*columns))
+
+def _batches(records: List[Any], batch_size: int):
+    for start in range(0, len(records), batch_size):
+        yield records[start:start + batch_size]
+
+# PostgreSQL accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMETERS = 32767
+
+def insert_statement(row_count: int) -> str:
+    """
+    Builds one multi-row INSERT ... ON CONFLICT for ``row_count`` arrivals.
+
+    Row ``i`` binds its values as ``:<column>_<i>``; geometries are built
+    from the bound coordinates. Every inserted or changed row returns 1, so
+    the number of returned rows is the number of rows written.
+
+    Args:
+        row_count (int): Number of VALUES tuples.
+
+    Returns:
+        str: The SQL statement.
+    """
+    def row(i: int) -> str:
+        values = [f":{name}_{i}" for name in COLUMN_NAMES]
+        for role in ("origin", "destination"):
+            values.append(f"ST_SetSRID(ST_MakePoint(:{role}_longitude_{i}, :{role}_latitude_{i}), 4326)")
+        return f"({', '.join(values)})"
+
+    return f"""
+        INSERT INTO {TABLE_NAME} ({", ".join(COLUMN_NAMES)}, origin_geom, destination_geom)
+        VALUES {", ".join(row(i) for i in range(row_count))}
+        {_on_conflict_clause()}
+        RETURNING 1
+    """
+
+async def insert_arrivals(db_session: AsyncSession, df: pd.DataFrame,
+                          batch_size: Optional[int] = None) -> int:
+    """
+    Upserts arrivals with one parameterised multi-row INSERT ... ON CONFLICT per batch.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        df (pd.DataFrame): Merged arrivals with timestamp arrival columns.
+        batch_size (Optional[int]): Rows per statement (default: settings.db_upload_batch_size),
+            capped so a statement stays within PostgreSQL's bind parameter limit.
+
+    Returns:
+        int: Number of rows inserted or changed, counted from the rows the statements return.
+    """
+    batch_size = min(batch_size or settings.db_upload_batch_size, MAX_BIND_PARAMETERS // len(COLUMN_NAMES))
+
+    # Bulk upsert records batch by batch
+    written = 0
+    for batch in _batches(arrival_records(df), batch_size):
+        params = {
+            f"{name}_{i}": value
+            for i, record in enumerate(batch)
+            for name, value in zip(COLUMN_NAMES, record)
+        }
+        result = await db_session.execute(text(insert_statement(len(batch))), params)
+        written += len(result.all())
+    return written
+
+async def copy_arrivals(db_session: AsyncSession, df: pd.DataFrame,
+                        batch_size: Optional[int] = None) -> int:
+    """
+    Bulk upserts arrivals with binary COPY through a staging table.
+
+    Each batch is streamed into a temporary staging table (temporary tables
+    are not WAL-logged) with asyncpg's ``copy_records_to_table`` and moved
+    into arrivals_tracking by a single INSERT ... SELECT ... ON CONFLICT that
+    builds both geometries set-wise. Must run inside a transaction.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        df (pd.DataFrame): Merged arrivals with timestamp arrival columns.
+        batch_size (Optional[int]): Rows per COPY and upsert (default: settings.db_upload_batch_size).
+
+    Returns:
+        int: Number of rows inserted or changed.
+    """
+    column_list = ", ".join(COLUMN_NAMES)
+    await db_session.execute(text(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+            {", ".join(f"{name} {pg_type}" for name, pg_type in ARRIVAL_COLUMNS)}
+        ) ON COMMIT DROP
+    """))
+    upsert_sql = text(f"""
+        INSERT INTO {TABLE_NAME} ({column_list}, origin_geom, destination_geom)
+        SELECT {column_list},
+               ST_SetSRID(ST_MakePoint(origin_longitude, origin_latitude), 4326),
+               ST_SetSRID(ST_MakePoint(destination_longitude, destination_latitude), 4326)
+        FROM {STAGING_TABLE}
+        {_on_conflict_clause()}
+    """)
+
+    # COPY goes through the driver connection that backs this session's transaction
+    connection = await db_session.connection()
+    raw_connection = await connection.get_raw_connection()
+
+    written = 0
+    for batch in _batches(arrival_records(df), batch_size or settings.db_upload_batch_size):
+        await db_session.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+        await raw_connection.driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=batch, columns=COLUMN_NAMES
+        )
+        result = await db_session.execute(upsert_sql)
+        written += max(result.rowcount, 0)
+    return written
+
+async def upload_to_db(df_merged: pd.DataFrame, db_seession: AsyncSession,
+                       method: Optional[str] = None) -> Optional[Exception]:
     """
     Upload cleaned train data to PostgreSQL, including PostGIS geometry fields.
 
+    The upload is idempotent: arrivals already stored (same natural key) are
+    only rewritten when their actual arrival or delay changed.
+
     Args:
         df_merged (pd.DataFrame): Cleaned train data with latitude and longitude values.
         db_session (AsynceSession): The asyncronouc database session to use.
+        method (Optional[str]): "copy" for the binary COPY loader or "insert" for a
+            parameterised INSERT (default: settings.db_upload_method).
 
     Returns:
         Optional[Exception]: Returns an exception instance if upload fails, otherwise None.
@@ -24,16 +204,17 @@ async def upload_to_db(df_merged: pd.DataFrame, db_seession: AsyncSession) -> Op
         return None  # Early exit without raising an exception
 
     try:
-        # Convert 'scheduled_arrival' and 'actual_arrival' to proper TIMESTAMP format
-        logger.info("🔄 Converting 'scheduled_arrival' and 'actual_arrival' to TIMESTAMP format.")
-        df_merged["scheduled_arrival"] = pd.to_datetime(
-            df_merged["run_date"].astype(str) + " " + df_merged["scheduled_arrival"],
-            errors='coerce'  # Converts invalid parsing to NaT
-        )
-        df_merged["actual_arrival"] = pd.to_datetime(
-            df_merged["run_date"].astype(str) + " " + df_merged["actual_arrival"],
-            errors='coerce'
-        )
+        # Typed intermediates already carry timestamps; only HH:MM strings need parsing
+        if not pd.api.types.is_datetime64_any_dtype(df_merged["scheduled_arrival"]):
+            logger.info("🔄 Converting 'scheduled_arrival' and 'actual_arrival' to TIMESTAMP format.")
+            df_merged["scheduled_arrival"] = pd.to_datetime(
+                df_merged["run_date"].astype(str) + " " + df_merged["scheduled_arrival"],
+                errors='coerce'  # Converts invalid parsing to NaT
+            )
+            df_merged["actual_arrival"] = pd.to_datetime(
+                df_merged["run_date"].astype(str) + " " + df_merged["actual_arrival"],
+                errors='coerce'
+            )
 
         # Optional: Drop rows with invalid datetime conversions
         initial_count = len(df_merged)
@@ -42,40 +223,42 @@ async def upload_to_db(df_merged: pd.DataFrame, db_seession: AsyncSession) -> Op
         if final_count < initial_count:
             logger.warning(f"⚠️ Dropped {initial_count - final_count} records due to invalid datetime conversions.")
 
+        # A statement cannot upsert the same key twice; keep the latest report of each arrival
+        before_dedupe = len(df_merged)
+        df_merged = df_merged.drop_duplicates(subset=NATURAL_KEY, keep="last")
+        if len(df_merged) < before_dedupe:
+            logger.warning("⚠️ Dropped %d duplicate arrivals from the upload.", before_dedupe - len(df_merged))
+
+        method = (method or settings.db_upload_method).lower()
+        logger.info(f"🔢 Preparing to upload {len(df_merged)} records to PostgreSQL ({method}).")
+        started = time.perf_counter()
+
+        run_dates = pd.to_datetime(df_merged["run_date"]).dt.date.unique()
         async with db_seession.begin():
-            # Define the SQL statement with PostGIS geometry
-            insert_sql = text(f"""
-                INSERT INTO {TABLE_NAME} 
-                (
-                    run_date, service_id, operator, origin, origin_crs, origin_latitude, origin_longitude, origin_geom, 
-                    destination, destination_crs, destination_latitude, destination_longitude, destination_geom, 
-                    scheduled_arrival, actual_arrival, is_actual, delay_minutes, is_passenger_train, 
-                    was_scheduled_to_stop, stop_status
-                )
-                VALUES 
-                (
-                    :run_date, :service_id, :operator, :origin, :origin_crs, :origin_latitude, :origin_longitude, 
-                    ST_SetSRID(ST_MakePoint(:origin_longitude, :origin_latitude), 4326),
-                    :destination, :destination_crs, :destination_latitude, :destination_longitude, 
-                    ST_SetSRID(ST_MakePoint(:destination_longitude, :destination_latitude), 4326),
-                    :scheduled_arrival, :actual_arrival, :is_actual, :delay_minutes, :is_passenger_train, 
-                    :was_scheduled_to_stop, :stop_status
-                )
-            """)
-
-            # Convert DataFrame to list of dictionaries
-            records = df_merged.to_dict(orient="records")
-            logger.info(f"🔢 Preparing to upload {len(records)} records to PostgreSQL.")
-
-            # Bulk insert records
-            await db_seession.execute(insert_sql, records)
-            
-            logger.info("✅ Data successfully uploaded to PostgreSQL with PostGIS!")
+            # A run date in a new month (or week) gets its partition on demand
+            await ensure_partitions(db_seession, run_dates)
+            if method == "copy":
+                uploaded = await copy_arrivals(db_seession, df_merged)
+            else:
+                uploaded = await insert_arrivals(db_seession, df_merged)
+            # Keep the hourly rollup in step with the rows just written
+            await refresh_hourly_stats(db_seession, df_merged)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "✅ Data successfully uploaded to PostgreSQL with PostGIS! %d rows in %.2fs (%.0f rows/s), "
+            "%d new or changed, %d unchanged",
+            len(df_merged), elapsed, len(df_merged) / elapsed if elapsed > 0 else float(len(df_merged)),
+            uploaded, len(df_merged) - uploaded
+        )
+        # Caches of derived output (tiles, maps) drop what these run dates made stale. Fired after
+        # every committed upload: the changed-row count is a log figure, not a staleness signal
+        notify_ingest(run_dates)
 
     except Exception as e:
         logger.error("❌ Database upload failed: %s", e)
         try:
-            await db_session.rollback()
+            await db_seession.rollback()
             logger.info("🔄 Rolled back the transaction due to the error.")
         except Exception as rollback_error:
             logger.error("❌ Failed to rollback the transaction: %s", rollback_error)
@@ -0,0 +1,59 @@
+# app/crud/watermark_crud.py
+from datetime import date
+from typing import Dict, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+TABLE_NAME = "extraction_watermarks"
+
+async def get_watermarks(db_session: AsyncSession, stations: Sequence[str]) -> Dict[str, date]:
+    """
+    Loads the extraction watermark of each station.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        stations (Sequence[str]): Station CRS codes.
+
+    Returns:
+        Dict[str, date]: Last fully ingested date per station; stations never ingested are absent.
+    """
+    result = await db_session.execute(
+        text(f"""
+            SELECT station_crs, last_complete_date
+            FROM {TABLE_NAME}
+            WHERE station_crs = ANY(:stations)
+        """),
+        {"stations": list(stations)}
+    )
+    watermarks = {row.station_crs: row.last_complete_date for row in result}
+    logger.info("💧 Loaded watermarks for %d of %d stations", len(watermarks), len(stations))
+    return watermarks
+
+async def save_watermarks(db_session: AsyncSession, watermarks: Dict[str, date]) -> None:
+    """
+    Moves station watermarks forward. A watermark never moves backwards.
+
+    Args:
+        db_session (AsyncSession): The asynchronous database session to use.
+        watermarks (Dict[str, date]): New last fully ingested date per station.
+    """
+    if not watermarks:
+        return
+
+    await db_session.execute(
+        text(f"""
+            INSERT INTO {TABLE_NAME} (station_crs, last_complete_date, updated_at)
+            VALUES (:station_crs, :last_complete_date, NOW())
+            ON CONFLICT (station_crs) DO UPDATE
+            SET last_complete_date = GREATEST({TABLE_NAME}.last_complete_date, EXCLUDED.last_complete_date),
+                updated_at = NOW()
+        """),
+        [
+            {"station_crs": station, "last_complete_date": last_complete_date}
+            for station, last_complete_date in watermarks.items()
+        ]
+    )
+    logger.info("💧 Advanced watermarks: %s",
+                {station: d.isoformat() for station, d in watermarks.items()})
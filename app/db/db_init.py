@@ -1,5 +1,6 @@
 # app/db/db_init.py
 import asyncio
+import json
 from typing import Optional
 import sys
 from sqlalchemy.ext.asyncio import AsyncConnection
@@ -8,11 +9,15 @@ from alembic.config import Config
 from alembic import command
 
 from app.db.db_main import engine
-from app.models.db_models import Base
-from app.core.logging_config import setup_logging
+from app.models.db_models import Base, query_indices
+from app.db.partitions import ensure_partitions, precreate_partitions
+from app.db.query_plans import endpoint_query_checks, parent_indexes, plan_indexes
+from app.crud.rollup_crud import rebuild_hourly_stats
+from app.db.views import create_materialized_views
+from app.core.logging_config import configure_logging
 from app.core.config import settings
 
-logger = setup_logging()
+logger = configure_logging()
 
 class AsyncDatabaseInitialiser:
     """Handles database initialisation and schema management."""
@@ -61,6 +66,53 @@ class AsyncDatabaseInitialiser:
             logger.error("❌ Failed to create spatial indices: %s", str(e))
             raise
 
+    async def _create_query_indices(self, connection: AsyncConnection) -> None:
+        """
+        Creates the indices serving the API and map query shapes.
+
+        Args:
+            connection: Active database connection
+        """
+        try:
+            for index_name, table, definition in query_indices:
+                await connection.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} {definition};"
+                ))
+            logger.info("✅ %d query indices created successfully", len(query_indices))
+        except Exception as e:
+            logger.error("❌ Failed to create query indices: %s", str(e))
+            raise
+
+    async def _verify_query_plans(self, connection: AsyncConnection) -> bool:
+        """
+        Checks with EXPLAIN that every endpoint query uses the index built for it.
+
+        The queries come from the endpoints' own builders and are planned with
+        the planner's normal costs, so a check fails when PostgreSQL prefers a
+        sequential scan or a different index. On a nearly empty table that is
+        expected; the check is meaningful once the table holds real data.
+
+        Args:
+            connection: Active database connection
+
+        Returns:
+            bool: True if every query uses its expected index
+        """
+        all_indexed = True
+        for check in endpoint_query_checks():
+            result = await connection.execute(text(f"EXPLAIN (FORMAT JSON) {check.sql}"), check.params)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            used = plan_indexes(plan[0]["Plan"])
+            if check.index in await parent_indexes(connection, used):
+                logger.info("✅ %s uses %s", check.name, check.index)
+            else:
+                logger.warning("⚠️ %s does not use %s (indices used: %s)",
+                               check.name, check.index, ", ".join(sorted(used)) or "none")
+                all_indexed = False
+        return all_indexed
+
     async def _create_geometry_update_triggers(self, connection: AsyncConnection) -> None:
         """
         Sets up custom database functions and triggers.
@@ -69,19 +121,29 @@ class AsyncDatabaseInitialiser:
             connection: Active database connection
         """
         try:
-            # Example: Create a function to automatically update geometry columns
+            # Fill geometry columns from the coordinates. Loaders that already
+            # supply the geometry (the bulk loader builds it set-wise) skip the
+            # per-row recomputation; updates only rebuild it when coordinates move.
             await connection.execute(text("""
                 CREATE OR REPLACE FUNCTION update_geom_columns()
                 RETURNS TRIGGER AS $$
                 BEGIN
-                    NEW.origin_geom = ST_SetSRID(
-                        ST_MakePoint(NEW.origin_longitude, NEW.origin_latitude),
-                        4326
-                    );
-                    NEW.destination_geom = ST_SetSRID(
-                        ST_MakePoint(NEW.destination_longitude, NEW.destination_latitude),
-                        4326
-                    );
+                    IF NEW.origin_geom IS NULL
+                       OR (TG_OP = 'UPDATE' AND (NEW.origin_longitude, NEW.origin_latitude)
+                           IS DISTINCT FROM (OLD.origin_longitude, OLD.origin_latitude)) THEN
+                        NEW.origin_geom = ST_SetSRID(
+                            ST_MakePoint(NEW.origin_longitude, NEW.origin_latitude),
+                            4326
+                        );
+                    END IF;
+                    IF NEW.destination_geom IS NULL
+                       OR (TG_OP = 'UPDATE' AND (NEW.destination_longitude, NEW.destination_latitude)
+                           IS DISTINCT FROM (OLD.destination_longitude, OLD.destination_latitude)) THEN
+                        NEW.destination_geom = ST_SetSRID(
+                            ST_MakePoint(NEW.destination_longitude, NEW.destination_latitude),
+                            4326
+                        );
+                    END IF;
                     RETURN NEW;
                 END;
                 $$ LANGUAGE plpgsql;
@@ -101,6 +163,117 @@ class AsyncDatabaseInitialiser:
             logger.error("❌ Failed to setup database functions: %s", str(e))
             raise
 
+    async def _ensure_natural_key(self, connection: AsyncConnection) -> None:
+        """
+        Adds the arrivals natural key to tables created before it existed.
+
+        Duplicate arrivals left by earlier non-idempotent loads are removed
+        first, keeping the most recently inserted row of each key.
+
+        Args:
+            connection: Active database connection
+        """
+        try:
+            result = await connection.execute(text("""
+                SELECT 1 FROM pg_constraint
+                WHERE conname = 'uq_arrivals_tracking_natural_key'
+            """))
+            if result.scalar() is not None:
+                return
+
+            result = await connection.execute(text("""
+                DELETE FROM arrivals_tracking older
+                USING arrivals_tracking newer
+                WHERE older.run_date = newer.run_date
+                  AND older.service_id = newer.service_id
+                  AND older.destination_crs = newer.destination_crs
+                  AND older.scheduled_arrival = newer.scheduled_arrival
+                  AND older.id < newer.id;
+            """))
+            logger.info("🧹 Removed %d duplicate arrivals", result.rowcount)
+
+            await connection.execute(text("""
+                ALTER TABLE arrivals_tracking
+                ADD CONSTRAINT uq_arrivals_tracking_natural_key
+                UNIQUE (run_date, service_id, destination_crs, scheduled_arrival);
+            """))
+            logger.info("✅ Natural key constraint added to arrivals_tracking")
+        except Exception as e:
+            logger.error("❌ Failed to add the arrivals natural key: %s", str(e))
+            raise
+
+    async def _detach_legacy_table(self, connection: AsyncConnection) -> Optional[str]:
+        """
+        Moves an unpartitioned arrivals_tracking out of the way.
+
+        The table, its indexes and its id sequence are renamed with a
+        ``_legacy`` suffix so the partitioned table can be created under the
+        original names.
+
+        Args:
+            connection: Active database connection
+
+        Returns:
+            Optional[str]: Name of the legacy table, or None if there was nothing to move
+        """
+        result = await connection.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('arrivals_tracking')"))
+        if result.scalar() != "r":
+            return None
+
+        legacy = "arrivals_tracking_legacy"
+        logger.warning("⚠️ arrivals_tracking is not partitioned; migrating it")
+        indexes = await connection.execute(text("""
+            SELECT indexname FROM pg_indexes WHERE tablename = 'arrivals_tracking'
+        """))
+        for (index_name,) in indexes.fetchall():
+            await connection.execute(text(f"ALTER INDEX {index_name} RENAME TO {index_name}_legacy"))
+        await connection.execute(text(f"ALTER TABLE arrivals_tracking RENAME TO {legacy}"))
+        await connection.execute(text("ALTER SEQUENCE IF EXISTS arrivals_tracking_id_seq RENAME TO arrivals_tracking_id_seq_legacy"))
+        return legacy
+
+    async def _migrate_legacy_rows(self, connection: AsyncConnection, legacy: str) -> None:
+        """
+        Copies rows from the legacy table into the partitioned one and drops it.
+
+        Duplicate arrivals are collapsed on the natural key, keeping the newest row.
+
+        Args:
+            connection: Active database connection
+            legacy: Name of the legacy table
+        """
+        result = await connection.execute(text(f"SELECT DISTINCT run_date FROM {legacy}"))
+        await ensure_partitions(connection, [row[0] for row in result])
+
+        columns = ", ".join(
+            column.name for column in Base.metadata.tables["arrivals_tracking"].columns
+        )
+        result = await connection.execute(text(f"""
+            INSERT INTO arrivals_tracking ({columns})
+            SELECT DISTINCT ON (run_date, service_id, destination_crs, scheduled_arrival) {columns}
+            FROM {legacy}
+            ORDER BY run_date, service_id, destination_crs, scheduled_arrival, id DESC
+        """))
+        await connection.execute(text("""
+            SELECT setval(pg_get_serial_sequence('arrivals_tracking', 'id'),
+                          COALESCE((SELECT MAX(id) FROM arrivals_tracking), 0) + 1, false)
+        """))
+        await connection.execute(text(f"DROP TABLE {legacy}"))
+        logger.info("✅ Migrated %d arrivals into the partitioned table", result.rowcount)
+
+    async def _backfill_hourly_stats(self, connection: AsyncConnection) -> None:
+        """
+        Builds the hourly station rollup from existing arrivals when it is empty.
+
+        Args:
+            connection: Active database connection
+        """
+        result = await connection.execute(text("""
+            SELECT NOT EXISTS (SELECT 1 FROM station_hourly_stats)
+               AND EXISTS (SELECT 1 FROM arrivals_tracking)
+        """))
+        if result.scalar():
+            await rebuild_hourly_stats(connection)
+
     def _run_migrations(self) -> None:
         """
         Runs database migrations using Alembic.
@@ -129,14 +302,34 @@ class AsyncDatabaseInitialiser:
                     logger.warning("⚠️ Dropping existing tables...")
                     await conn.run_sync(Base.metadata.drop_all)
                 
+                # An existing heap table is replaced by the partitioned one
+                legacy = await self._detach_legacy_table(conn)
+
                 # Create tables
                 await conn.run_sync(Base.metadata.create_all)
+
+                # Partitions for the current and upcoming months (or weeks)
+                await precreate_partitions(conn)
+                if legacy:
+                    await self._migrate_legacy_rows(conn, legacy)
+
+                # Make arrival loads idempotent on existing tables too
+                await self._ensure_natural_key(conn)
+
+                # Loads keep the rollup current; seed it for arrivals stored before it existed
+                await self._backfill_hourly_stats(conn)
+
+                # Leaderboards served by the prediction endpoints
+                await create_materialized_views(conn)
                 
                 # Enable PostGIS
                 await self._enable_postgis_extensions(conn)
                 
                 # Create spatial indices
                 await self._create_geometry_indices(conn)
+
+                # Create indices for the API query shapes
+                await self._create_query_indices(conn)
                 
                 # Setup functions and triggers
                 await self._create_geometry_update_triggers(conn)
@@ -182,8 +375,9 @@ class AsyncDatabaseInitialiser:
                 """))
                 triggers = result.fetchall()
                 logger.info("✅ Found %d triggers", len(triggers))
-                
-                return True
+
+                # Check that the endpoint queries are served by indices
+                return await self._verify_query_plans(conn)
         except Exception as e:
             logger.error("❌ Database verification failed: %s", str(e))
             return False
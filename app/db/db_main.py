@@ -129,4 +129,17 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 async def close_database_connections() -> None:
     """Closes database connections."""
-    await db_manager.close()
\ No newline at end of file
+    await db_manager.close()
+
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yields a database session for use with ``Depends``.
+
+    ``get_db`` is an async context manager, which FastAPI cannot inject
+    directly; this wraps it as a plain generator dependency.
+
+    Yields:
+        AsyncSession: Database session
+    """
+    async with get_db() as session:
+        yield session
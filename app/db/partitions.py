@@ -0,0 +1,267 @@
+# app/db/partitions.py
+import re
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.sql import text
+# Project modules
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+PARENT_TABLE = "arrivals_tracking"
+INTERVALS = ("month", "week")
+
+Executor = Union[AsyncConnection, AsyncSession]
+DateRange = Tuple[date, date]
+
+_BOUND_PATTERN = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+def _interval(interval: Optional[str]) -> str:
+    interval = (interval or settings.partition_interval).lower()
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported partition interval: {interval}")
+    return interval
+
+def partition_range(day: date, interval: Optional[str] = None) -> DateRange:
+    """
+    Returns the [start, end) range of the partition holding ``day``.
+
+    Args:
+        day (date): Run date
+        interval (Optional[str]): "month" or "week" (default: settings.partition_interval)
+
+    Returns:
+        DateRange: First day of the partition and first day of the next one
+    """
+    if _interval(interval) == "week":
+        start = day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+        return start, start + timedelta(days=7)
+
+    start = day.replace(day=1)
+    end = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+    return start, end
+
+def next_range(current: DateRange, interval: Optional[str] = None) -> DateRange:
+    """Returns the partition range following ``current``."""
+    return partition_range(current[1], interval)
+
+def partition_name(start: date, interval: Optional[str] = None) -> str:
+    """
+    Names a partition after its first day, e.g. arrivals_tracking_2025_02 or arrivals_tracking_2025_w07.
+
+    Args:
+        start (date): First day of the partition
+        interval (Optional[str]): "month" or "week" (default: settings.partition_interval)
+    """
+    if _interval(interval) == "week":
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"{PARENT_TABLE}_{iso_year}_w{iso_week:02d}"
+    return f"{PARENT_TABLE}_{start:%Y_%m}"
+
+def parse_partition_bound(expression: str) -> Optional[DateRange]:
+    """
+    Parses the bound expression PostgreSQL reports for a range partition.
+
+    Args:
+        expression (str): Output of pg_get_expr(relpartbound, oid)
+
+    Returns:
+        Optional[DateRange]: The [start, end) range, or None for a DEFAULT partition
+    """
+    match = _BOUND_PATTERN.search(expression or "")
+    if not match:
+        return None
+    return date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))
+
+def missing_ranges(days: Iterable[date], existing: Dict[str, DateRange],
+                   interval: Optional[str] = None) -> List[DateRange]:
+    """
+    Works out which partitions must be created so every day has one.
+
+    A day already covered by any existing partition (even one created with
+    another interval) needs nothing.
+
+    Args:
+        days (Iterable[date]): Run dates about to be stored
+        existing (Dict[str, DateRange]): Current partitions by name
+        interval (Optional[str]): Interval for new partitions
+
+    Returns:
+        List[DateRange]: Ranges to create, oldest first
+    """
+    needed = set()
+    for day in days:
+        if any(start <= day < end for start, end in existing.values()):
+            continue
+        needed.add(partition_range(day, interval))
+    return sorted(needed)
+
+def expired_partitions(existing: Dict[str, DateRange], cutoff: date) -> List[str]:
+    """
+    Returns partitions holding only run dates before ``cutoff``.
+
+    Args:
+        existing (Dict[str, DateRange]): Current partitions by name
+        cutoff (date): Oldest run date to keep
+
+    Returns:
+        List[str]: Partition names, oldest first
+    """
+    expired = [(bounds[0], name) for name, bounds in existing.items() if bounds[1] <= cutoff]
+    return [name for _, name in sorted(expired)]
+
+def is_retained(day: date, existing: Dict[str, DateRange], today: Optional[date] = None,
+                retention_days: Optional[int] = None) -> bool:
+    """
+    Whether arrivals of run date ``day`` can be stored in arrivals_tracking.
+
+    Args:
+        day (date): Run date to check
+        existing (Dict[str, DateRange]): Current partitions by name; empty for an unpartitioned table
+        today (Optional[date]): Reference date (default: today)
+        retention_days (Optional[int]): Days of run dates kept (default: settings.partition_retention_days)
+
+    Returns:
+        bool: False for future run dates, run dates past retention and run dates no partition holds
+    """
+    today = today or date.today()
+    retention_days = settings.partition_retention_days if retention_days is None else retention_days
+    if day > today:
+        return False
+    if retention_days > 0 and day < today - timedelta(days=retention_days):
+        return False
+    return not existing or any(start <= day < end for start, end in existing.values())
+
+async def is_partitioned(executor: Executor) -> bool:
+    """Whether arrivals_tracking exists as a partitioned table."""
+    result = await executor.execute(text("""
+        SELECT c.relkind FROM pg_class c
+        WHERE c.oid = to_regclass(:table)
+    """), {"table": PARENT_TABLE})
+    return result.scalar() == "p"
+
+async def list_partitions(executor: Executor) -> Dict[str, DateRange]:
+    """
+    Lists the range partitions attached to arrivals_tracking.
+
+    Args:
+        executor (Executor): Connection or session to use
+
+    Returns:
+        Dict[str, DateRange]: [start, end) range per partition name
+    """
+    result = await executor.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = :table
+    """), {"table": PARENT_TABLE})
+    partitions = {}
+    for name, bound in result:
+        bounds = parse_partition_bound(bound)
+        if bounds:
+            partitions[name] = bounds
+    return partitions
+
+async def create_partition(executor: Executor, bounds: DateRange, interval: Optional[str] = None) -> str:
+    """
+    Creates the partition for ``bounds`` if it does not exist yet.
+
+    Args:
+        executor (Executor): Connection or session to use
+        bounds (DateRange): [start, end) range of the partition
+        interval (Optional[str]): Interval the range was computed with (used for the name)
+
+    Returns:
+        str: Partition name
+    """
+    start, end = bounds
+    name = partition_name(start, interval)
+    await executor.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {name}
+        PARTITION OF {PARENT_TABLE}
+        FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+    """))
+    logger.info("🧱 Created partition %s [%s, %s)", name, start, end)
+    return name
+
+async def ensure_partitions(executor: Executor, days: Iterable[date],
+                            interval: Optional[str] = None) -> List[str]:
+    """
+    Creates any partition missing for the given run dates.
+
+    Called by the loaders before inserting so a new month (or week) never
+    makes an ingest fail.
+
+    Args:
+        executor (Executor): Connection or session to use
+        days (Iterable[date]): Run dates about to be stored
+        interval (Optional[str]): Interval for new partitions (default: settings.partition_interval)
+
+    Returns:
+        List[str]: Names of the partitions created
+    """
+    ranges = missing_ranges(days, await list_partitions(executor), interval)
+    return [await create_partition(executor, bounds, interval) for bounds in ranges]
+
+async def precreate_partitions(executor: Executor, ahead: Optional[int] = None,
+                               interval: Optional[str] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Creates the current partition and the next ``ahead`` ones.
+
+    Args:
+        executor (Executor): Connection or session to use
+        ahead (Optional[int]): Future partitions to create (default: settings.partition_precreate)
+        interval (Optional[str]): Partition interval (default: settings.partition_interval)
+        today (Optional[date]): Reference date (default: today)
+
+    Returns:
+        List[str]: Names of the partitions created
+    """
+    ahead = settings.partition_precreate if ahead is None else ahead
+    bounds = partition_range(today or date.today(), interval)
+    days = [bounds[0]]
+    for _ in range(ahead):
+        bounds = next_range(bounds, interval)
+        days.append(bounds[0])
+    return await ensure_partitions(executor, days, interval)
+
+async def apply_retention(executor: Executor, retention_days: Optional[int] = None,
+                          action: Optional[str] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Detaches or drops partitions older than the retention period.
+
+    Removing a whole partition replaces a large DELETE with a metadata-only
+    operation. Detached partitions stay in the database as standalone tables
+    so they can be archived.
+
+    Args:
+        executor (Executor): Connection or session to use
+        retention_days (Optional[int]): Days of run dates to keep; 0 keeps everything
+            (default: settings.partition_retention_days)
+        action (Optional[str]): "detach" or "drop" (default: settings.partition_retention_action)
+        today (Optional[date]): Reference date (default: today)
+
+    Returns:
+        List[str]: Names of the partitions detached or dropped
+    """
+    retention_days = settings.partition_retention_days if retention_days is None else retention_days
+    action = (action or settings.partition_retention_action).lower()
+    if action not in ("detach", "drop"):
+        raise ValueError(f"Unsupported retention action: {action}")
+    if retention_days <= 0:
+        return []
+
+    cutoff = (today or date.today()) - timedelta(days=retention_days)
+    expired = expired_partitions(await list_partitions(executor), cutoff)
+    for name in expired:
+        if action == "drop":
+            await executor.execute(text(f"DROP TABLE {name}"))
+        else:
+            await executor.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        logger.info("🗑️ %s partition %s (run dates before %s)",
+                    "Dropped" if action == "drop" else "Detached", name, cutoff)
+    return expired
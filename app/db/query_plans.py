@@ -0,0 +1,103 @@
+# app/db/query_plans.py
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.sql import text
+# Project modules
+from app.api.endpoints.delays import DEFAULT_HOURS, DEFAULT_PAGE_SIZE
+from app.core.config import settings
+from app.crud.delay_crud import ArrivalFilters, delay_query
+from app.crud.rollup_crud import HOURLY_STATS_QUERY
+from app.services.etl.predict_overcrowding import CROWDING_QUERY, crowding_params
+
+Executor = Union[AsyncConnection, AsyncSession]
+
+INDEX_NODE_TYPES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+# Station used to bind the station-filtered checks; any CRS code plans the same way
+SAMPLE_STATION = "KGX"
+
+@dataclass(frozen=True)
+class QueryPlanCheck:
+    """
+    An endpoint query and the index its plan is expected to use.
+
+    Attributes:
+        name (str): Endpoint or job the query belongs to
+        sql (str): The query, exactly as its builder renders it
+        params (Dict[str, Any]): Bind parameters for a representative call
+        index (str): Index the plan must use, by its name on the partitioned parent
+    """
+    name: str
+    sql: str
+    params: Dict[str, Any]
+    index: str
+
+def endpoint_query_checks(now: Optional[datetime] = None) -> List[QueryPlanCheck]:
+    """
+    Builds the plan checks from the same builders the endpoints call.
+
+    Args:
+        now (Optional[datetime]): End of the checked windows (default: now)
+
+    Returns:
+        List[QueryPlanCheck]: One check per query shape
+    """
+    now = now or datetime.now()
+    crowding_start = now - timedelta(hours=settings.crowding_window_hours)
+
+    # /delays with its defaults: the first keyset page of the window, in scheduled order
+    page_sql, page_params, _ = delay_query(ArrivalFilters.window(end=now, hours=DEFAULT_HOURS),
+                                           limit=DEFAULT_PAGE_SIZE)
+    # Map data (fetch_delay_data): every passenger arrival since the cutoff, newest first
+    map_filters = ArrivalFilters.window(start=now - timedelta(hours=24), end=now + timedelta(days=1))
+    map_sql, map_params, _ = delay_query(map_filters, descending=True)
+
+    return [
+        QueryPlanCheck("fetch_delays", page_sql, page_params, "idx_arrivals_passenger_keyset"),
+        QueryPlanCheck("fetch_delay_data", map_sql, map_params, "idx_arrivals_scheduled_brin"),
+        QueryPlanCheck("predict_crowding", CROWDING_QUERY,
+                       crowding_params(crowding_start, now), "idx_arrivals_scheduled_brin"),
+        QueryPlanCheck("predict_crowding_stations", CROWDING_QUERY,
+                       crowding_params(crowding_start, now, [SAMPLE_STATION]),
+                       "idx_arrivals_destination_scheduled"),
+        QueryPlanCheck("get_hourly_stats", HOURLY_STATS_QUERY,
+                       {"station": SAMPLE_STATION, "start": now - timedelta(days=7), "end": now, "operator": None},
+                       "station_hourly_stats_pkey"),
+    ]
+
+def plan_indexes(plan: Dict[str, Any]) -> Set[str]:
+    """Collects the names of the indices used anywhere in an EXPLAIN plan tree."""
+    used = set()
+    if plan.get("Node Type") in INDEX_NODE_TYPES and "Index Name" in plan:
+        used.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        used |= plan_indexes(child)
+    return used
+
+async def parent_indexes(executor: Executor, names: Iterable[str]) -> Set[str]:
+    """
+    Maps partition indices to the partitioned indices they are attached to.
+
+    EXPLAIN names the index of each scanned partition, not the index created
+    on arrivals_tracking, so both names are returned.
+
+    Args:
+        executor (Executor): Connection or session to query the catalogue through
+        names (Iterable[str]): Index names found in a plan
+
+    Returns:
+        Set[str]: The names themselves and the names of their parent indices
+    """
+    names = set(names)
+    if not names:
+        return names
+    result = await executor.execute(text("""
+        SELECT parent.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE child.relkind IN ('i', 'I') AND child.relname = ANY(:names)
+    """), {"names": sorted(names)})
+    return names | set(result.scalars())
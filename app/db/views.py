@@ -0,0 +1,142 @@
+# app/db/views.py
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.sql import text
+# Project modules
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.crud.rollup_crud import known_delay_count_sql
+
+logger = configure_logging()
+
+REFRESH_LOG_TABLE = "materialized_view_refreshes"
+
+Executor = Union[AsyncConnection, AsyncSession]
+
+@dataclass(frozen=True)
+class MaterializedView:
+    """
+    Definition of a leaderboard materialised view.
+
+    Attributes:
+        name (str): View name
+        unique_key (List[str]): Columns of the unique index REFRESH ... CONCURRENTLY requires
+        query (str): SELECT the view is built from; ``{window_days}`` is filled in at creation
+    """
+    name: str
+    unique_key: List[str]
+    query: str
+
+    def create_sql(self, window_days: int) -> str:
+        return f"CREATE MATERIALIZED VIEW IF NOT EXISTS {self.name} AS {self.query.format(window_days=int(window_days))}"
+
+    def index_sql(self) -> str:
+        return (f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{self.name} "
+                f"ON {self.name} ({', '.join(self.unique_key)})")
+
+# Both views read the hourly rollup, so a refresh scans stations x operators x hours, not arrivals
+_WINDOW = """
+    SELECT * FROM station_hourly_stats
+    WHERE hour_bucket > (SELECT MAX(hour_bucket) FROM station_hourly_stats) - INTERVAL '{window_days} days'
+"""
+
+STATION_CROWDING = MaterializedView(
+    name="station_crowding_mv",
+    unique_key=["station_crs"],
+    query=f"""
+        WITH recent AS ({_WINDOW})
+        SELECT
+            station_crs,
+            SUM(train_count)::INTEGER AS arrival_count,
+            SUM(delay_sum)::DOUBLE PRECISION / NULLIF(SUM({known_delay_count_sql()}), 0) AS avg_delay,
+            SUM(delayed_count)::INTEGER AS delayed_count,
+            SUM(delayed_count)::DOUBLE PRECISION / NULLIF(SUM(train_count), 0) AS delayed_ratio,
+            COUNT(DISTINCT operator)::INTEGER AS operator_count,
+            RANK() OVER (ORDER BY SUM(train_count) DESC) AS rank
+        FROM recent
+        GROUP BY station_crs
+    """
+)
+
+OPERATOR_PUNCTUALITY = MaterializedView(
+    name="operator_punctuality_mv",
+    unique_key=["operator"],
+    query=f"""
+        WITH recent AS ({_WINDOW})
+        SELECT
+            operator,
+            SUM(train_count)::INTEGER AS train_count,
+            SUM(delay_sum)::DOUBLE PRECISION / NULLIF(SUM({known_delay_count_sql()}), 0) AS avg_delay,
+            SUM(delayed_count)::INTEGER AS delayed_count,
+            1 - SUM(delayed_count)::DOUBLE PRECISION / NULLIF(SUM(train_count), 0) AS on_time_ratio,
+            RANK() OVER (
+                ORDER BY 1 - SUM(delayed_count)::DOUBLE PRECISION / NULLIF(SUM(train_count), 0) DESC,
+                         SUM(train_count) DESC
+            ) AS rank
+        FROM recent
+        GROUP BY operator
+    """
+)
+
+MATERIALIZED_VIEWS: Dict[str, MaterializedView] = {
+    view.name: view for view in (STATION_CROWDING, OPERATOR_PUNCTUALITY)
+}
+
+async def create_materialized_views(executor: Executor, window_days: Optional[int] = None,
+                                    replace: bool = False) -> None:
+    """
+    Creates the leaderboard views and their unique indexes if they do not exist.
+
+    The window is fixed when a view is created; pass ``replace`` after changing
+    settings.leaderboard_window_days.
+
+    Args:
+        executor (Executor): Connection or session to use
+        window_days (Optional[int]): Days ranked (default: settings.leaderboard_window_days)
+        replace (bool): Drop and recreate existing views
+    """
+    window_days = settings.leaderboard_window_days if window_days is None else window_days
+    for view in MATERIALIZED_VIEWS.values():
+        if replace:
+            await executor.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view.name}"))
+        await executor.execute(text(view.create_sql(window_days)))
+        await executor.execute(text(view.index_sql()))
+
+async def refresh_materialized_views(executor: Executor,
+                                     concurrently: Optional[bool] = None) -> Dict[str, float]:
+    """
+    Refreshes every leaderboard view and records when it happened.
+
+    A concurrent refresh lets the API keep reading the previous contents
+    while the new ones are computed.
+
+    Args:
+        executor (Executor): Connection or session to use
+        concurrently (Optional[bool]): Use REFRESH ... CONCURRENTLY
+            (default: settings.leaderboard_refresh_concurrently)
+
+    Returns:
+        Dict[str, float]: Refresh duration in milliseconds per view
+    """
+    concurrently = settings.leaderboard_refresh_concurrently if concurrently is None else concurrently
+    await create_materialized_views(executor)
+
+    durations = {}
+    for name in MATERIALIZED_VIEWS:
+        started = time.perf_counter()
+        await executor.execute(text(
+            f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{name}"
+        ))
+        durations[name] = (time.perf_counter() - started) * 1000
+        await executor.execute(text(f"""
+            INSERT INTO {REFRESH_LOG_TABLE} (view_name, refreshed_at, duration_ms, row_count)
+            SELECT :name, NOW(), :duration_ms, COUNT(*) FROM {name}
+            ON CONFLICT (view_name) DO UPDATE
+            SET refreshed_at = EXCLUDED.refreshed_at,
+                duration_ms = EXCLUDED.duration_ms,
+                row_count = EXCLUDED.row_count
+        """), {"name": name, "duration_ms": durations[name]})
+        logger.info("🔃 Refreshed %s in %.0f ms", name, durations[name])
+    return durations
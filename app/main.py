@@ -8,18 +8,37 @@ from app.core.config import settings
 # Project modules for the data pipeline
 from app.api.endpoints.train_delays import router as train_delays_router
 from app.api.endpoints.busiest_stations import router as busiest_stations_router 
+from app.api.endpoints.station_stats import router as station_stats_router
+from app.api.endpoints.geojson import router as geojson_router
+from app.api.endpoints.tiles import router as tiles_router
+from app.api.endpoints.metrics import router as metrics_router
+from app.api.endpoints.delays import router as delays_router
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.db_main import get_db 
+from app.db.db_main import get_db, close_database_connections
+from app.services.trains_main import rtt_client
+from app.core.executor import cpu_executor
 
 # Set up logging 
 logger = configure_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Opens shared clients on startup and releases them on shutdown."""
+    await rtt_client.open()
+    try:
+        yield
+    finally:
+        await rtt_client.close()
+        await close_database_connections()
+        cpu_executor.shutdown(wait=False)
+
 # Initialise FastAPI app
 app = FastAPI(
     title="Train Delays API",
     description="API for tracking and visualising train delays.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Include Routers
@@ -29,6 +48,11 @@ app.include_router(
     prefix="/predictions", 
     tags=["Station Predictions"]
 )
+app.include_router(station_stats_router, prefix="/stats", tags=["Station Statistics"])
+app.include_router(geojson_router, prefix="/geo", tags=["Geo"])
+app.include_router(tiles_router, prefix="/tiles", tags=["Tiles"])
+app.include_router(delays_router, prefix="/delays", tags=["Delays"])
+app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
 
 
 # ✅ Run FastAPI server (if executed directly)
@@ -3,7 +3,8 @@
 from typing import Optional
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Date, Float, Boolean, TIMESTAMP
+from sqlalchemy import Column, Integer, BigInteger, String, Date, Float, Boolean, TIMESTAMP, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 from geoalchemy2 import Geometry
@@ -41,14 +42,26 @@ class TrainTracking(Base):
         is_passenger_train (bool): Whether the train carries passengers
         was_scheduled_to_stop (bool): Whether the train was scheduled to stop
         stop_status (str): Current stop status
+
+    A service's arrival is identified by (run_date, service_id,
+    destination_crs, scheduled_arrival); re-loading it updates the row.
+    The table is range-partitioned by run_date (see app.db.partitions), so
+    run_date is part of the primary key.
     """
     __tablename__ = "arrivals_tracking"
+    __table_args__ = (
+        UniqueConstraint(
+            "run_date", "service_id", "destination_crs", "scheduled_arrival",
+            name="uq_arrivals_tracking_natural_key"
+        ),
+        {"postgresql_partition_by": "RANGE (run_date)"},
+    )
 
     # Primary key
     id = Column(Integer, primary_key=True, autoincrement=True)
 
     # Date fields
-    run_date = Column(Date, nullable=False, index=True) # for historical analysis
+    run_date = Column(Date, primary_key=True, nullable=False, index=True) # for historical analysis and partitioning
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, onupdate=func.now())
 
@@ -92,6 +105,88 @@ class TrainTracking(Base):
         )
 
 
+class ExtractionWatermark(Base):
+    """
+    Per-station extraction state used for incremental pipeline runs.
+
+    Attributes:
+        station_crs (str): Station CRS code the arrivals were extracted for
+        last_complete_date (date): Latest date whose arrivals are fully ingested
+        updated_at (datetime): When the watermark last moved
+    """
+    __tablename__ = "extraction_watermarks"
+
+    station_crs = Column(String(6), primary_key=True)
+    last_complete_date = Column(Date, nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        return (
+            f"ExtractionWatermark(station_crs={self.station_crs}, "
+            f"last_complete_date={self.last_complete_date})"
+        )
+
+
+class StationHourlyStats(Base):
+    """
+    Hourly delay rollup of arrivals_tracking, maintained by the ingest path.
+
+    Attributes:
+        station_crs (str): CRS code of the station the trains arrive at (destination_crs)
+        operator (str): Train operating company
+        hour_bucket (datetime): Scheduled arrival truncated to the hour
+        train_count (int): Number of arrivals
+        delay_sum (int): Sum of delay minutes
+        delay_mean (float): Mean delay in minutes
+        delayed_count (int): Arrivals more than 10 minutes late
+        delay_histogram (List[int]): Arrival counts per DELAY_HISTOGRAM_EDGES bin
+        updated_at (datetime): When the bucket was last recomputed
+    """
+    __tablename__ = "station_hourly_stats"
+
+    station_crs = Column(String(6), primary_key=True)
+    operator = Column(String(50), primary_key=True)
+    hour_bucket = Column(TIMESTAMP, primary_key=True)
+    train_count = Column(Integer, nullable=False)
+    delay_sum = Column(BigInteger, nullable=False)
+    delay_mean = Column(Float)
+    delayed_count = Column(Integer, nullable=False)
+    delay_histogram = Column(ARRAY(Integer), nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        return (
+            f"StationHourlyStats(station_crs={self.station_crs}, "
+            f"operator={self.operator}, "
+            f"hour_bucket={self.hour_bucket}, "
+            f"train_count={self.train_count})"
+        )
+
+
+class MaterializedViewRefresh(Base):
+    """
+    When each leaderboard materialised view was last refreshed.
+
+    Attributes:
+        view_name (str): Name of the materialised view
+        refreshed_at (datetime): When the last refresh finished
+        duration_ms (float): How long the refresh took
+        row_count (int): Rows in the view after the refresh
+    """
+    __tablename__ = "materialized_view_refreshes"
+
+    view_name = Column(String(63), primary_key=True)
+    refreshed_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    duration_ms = Column(Float)
+    row_count = Column(Integer)
+
+    def __repr__(self) -> str:
+        return (
+            f"MaterializedViewRefresh(view_name={self.view_name}, "
+            f"refreshed_at={self.refreshed_at})"
+        )
+
+
 # Pydantic model for API responses and validation
 class TrainTrackingSchema(BaseModel):
     """
@@ -131,6 +226,22 @@ indices = [
     ('idx_train_tracking_destination_geom', 'arrivals_tracking', ['destination_geom'], 'gist'),
 ]
 
+# Indices shaped after the API and map queries: (name, table, definition after ON <table>)
+query_indices = [
+    # Arrivals are loaded roughly in time order, so a tiny BRIN covers time-range scans
+    ('idx_arrivals_scheduled_brin', 'arrivals_tracking',
+     'USING BRIN (scheduled_arrival) WITH (pages_per_range = 32)'),
+    # Station lookups over a time window, answering AVG(delay_minutes) from the index
+    ('idx_arrivals_destination_scheduled', 'arrivals_tracking',
+     '(destination_crs, scheduled_arrival) INCLUDE (delay_minutes)'),
+    # Passenger-only feeds: keyset pages over (scheduled_arrival, id) in either direction,
+    # and the most delayed arrivals
+    ('idx_arrivals_passenger_keyset', 'arrivals_tracking',
+     '(scheduled_arrival DESC, id DESC) WHERE is_passenger_train'),
+    ('idx_arrivals_passenger_delay', 'arrivals_tracking',
+     '(delay_minutes DESC) WHERE is_passenger_train'),
+]
+
 # Create PostGIS extension and indices
 def setup_postgis(engine):
     """
@@ -1,12 +1,15 @@
 # app/services/etl/clean.py
 from datetime import datetime, timedelta
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel
 # Project modules
 from app.core.logging_config import configure_logging
 from app.core.config import settings
+from app.services.etl.storage import IntermediateStore, with_arrival_timestamps
+from app.services.etl.validate import BatchValidator
 
 logger = configure_logging()
 # Define output directory using settings
@@ -27,6 +30,7 @@ class TrainService(BaseModel):
     destination: str = "UNKNOWN"
     was_scheduled_to_stop: bool = False
     stop_status: str = "UNKNOWN"
+    station: str = "UNKNOWN"
 
     class Config:
         arbitrary_types_allowed = True
@@ -101,6 +105,7 @@ def process_service(service: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         # Return cleaned record
         return {
             "run_date": run_date,
+            "station": validated_service.station,
             "service_id": validated_service.service_id,
             "operator": validated_service.operator,
             "is_passenger_train": validated_service.is_passenger_train,
@@ -118,25 +123,54 @@ def process_service(service: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         logger.error("❌ Error processing service: %s - %s", service.get("service_id", "UNKNOWN"), str(e))
         return None
 
-def process_data(raw_data: Dict[str, Any]) -> pd.DataFrame:
+# Column layout of the cleaned output and of the missing arrivals report
+CLEANED_COLUMNS = [
+    "run_date", "station", "service_id", "operator", "is_passenger_train", "scheduled_arrival",
+    "actual_arrival", "is_actual", "origin", "destination", "was_scheduled_to_stop",
+    "stop_status", "delay_minutes"
+]
+MISSING_COLUMNS = [
+    "run_date", "service_id", "operator", "scheduled_arrival", "origin", "destination",
+    "field", "reason"
+]
+
+# Patterns used by strptime for %Y-%m-%d and %H%M, so both paths accept the same strings
+RUN_DATE_PATTERN = r"^([0-9]{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12][0-9]|0[1-9]|[1-9]| [1-9])"
+HHMM_PATTERN = r"^(2[0-3]|[01][0-9]|[0-9])([0-5][0-9]|[0-9])"
+
+service_validator = BatchValidator(TrainService)
+
+def missing_arrival_record(service: Dict[str, Any], field: Optional[str] = None,
+                           reason: Optional[str] = None) -> Dict[str, Any]:
+    """Builds the missing arrivals report entry for a rejected raw service."""
+    return {
+        "run_date": service.get("run_date"),
+        "service_id": service.get("service_id"),
+        "operator": service.get("operator"),
+        "scheduled_arrival": service.get("scheduled_arrival"),
+        "origin": service.get("origin", "UNKNOWN"),
+        "destination": service.get("destination", "UNKNOWN"),
+        "field": field,
+        "reason": reason
+    }
+
+def clean_services_rowwise(services: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
-    Process and clean extracted train arrival data.
-    
+    Cleans services one at a time through process_service.
+
+    process_service only logs why a service was dropped, so the missing
+    arrivals report has no field or reason in this mode.
+
     Args:
-        raw_data (Dict[str, Any]): JSON data extracted from API
-        
+        services (List[Dict[str, Any]]): Raw services
+
     Returns:
-        pd.DataFrame: Cleaned train arrival data
+        Tuple[pd.DataFrame, pd.DataFrame]: Cleaned records and missing arrivals report
     """
-    logger.info("🚀 Starting data cleaning process...")
-    
     cleaned_delays: List[Dict[str, Any]] = []
     missing_actual_arrival: List[Dict[str, Any]] = []
-    
-    total_services = len(raw_data.get("services", []))
-    logger.info("📊 Processing %d train services...", total_services)
-    
-    for service in raw_data.get("services", []):
+
+    for service in services:
         cleaned_service = process_service(service)
         
         if cleaned_service:
@@ -144,48 +178,260 @@ def process_data(raw_data: Dict[str, Any]) -> pd.DataFrame:
         else:
             # Store services with missing actual arrival
             try:
-                missing_actual_arrival.append({
-                    "run_date": service.get("run_date"),
-                    "service_id": service.get("service_id"),
-                    "operator": service.get("operator"),
-                    "scheduled_arrival": service.get("scheduled_arrival"),
-                    "origin": service.get("origin", "UNKNOWN"),
-                    "destination": service.get("destination", "UNKNOWN")
-                })
+                missing_actual_arrival.append(missing_arrival_record(service))
             except Exception as e:
                 logger.error("❌ Error storing missing arrival record: %s", str(e))
+
+    df_cleaned = pd.DataFrame(cleaned_delays) if cleaned_delays else pd.DataFrame()
+    return df_cleaned, pd.DataFrame(missing_actual_arrival, columns=MISSING_COLUMNS)
+
+def _ascii_digits(values: pd.Series, width: int) -> np.ndarray:
+    """Returns the digits of fixed-width ASCII digit strings as an (n, width) integer array."""
+    raw = np.asarray(values.tolist(), dtype=f"S{width}")
+    return raw.view(np.uint8).reshape(-1, width).astype(np.int64) - ord("0")
+
+def _extract_parts(values: pd.Series, pattern: str, separators: int) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Applies a strptime style pattern, which must consume the whole string."""
+    parts = values.str.extract(pattern)
+    matched = parts.notna().all(axis=1).to_numpy()
+    lengths = sum(parts[column].str.len() for column in parts.columns) + separators
+    matched = matched & (lengths == values.str.len()).fillna(False).to_numpy(dtype=bool)
+    return parts, matched
+
+def _parse_run_dates(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses run dates column-wise.
+
+    Canonical YYYY-MM-DD strings are decoded straight from their bytes; any
+    other string goes through the strptime pattern.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: datetime64[D] dates and a mask of valid entries
+    """
+    text = values.astype(object)
+    n_rows = len(text)
+    year = np.full(n_rows, 1970, dtype=np.int64)
+    month = np.ones(n_rows, dtype=np.int64)
+    day = np.ones(n_rows, dtype=np.int64)
+    matched = np.zeros(n_rows, dtype=bool)
+
+    canonical = text.str.fullmatch(r"[0-9]{4}-[0-9]{2}-[0-9]{2}").fillna(False).to_numpy(dtype=bool)
+    if canonical.any():
+        digits = _ascii_digits(text[canonical], 10)
+        year[canonical] = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+        month[canonical] = digits[:, 5] * 10 + digits[:, 6]
+        day[canonical] = digits[:, 8] * 10 + digits[:, 9]
+        matched[canonical] = True
+
+    irregular = ~canonical & text.notna().to_numpy()
+    if irregular.any():
+        parts, ok = _extract_parts(text[irregular], RUN_DATE_PATTERN, 2)
+        index = np.flatnonzero(irregular)[ok]
+        year[index] = parts[0][ok].astype(int).to_numpy()
+        month[index] = parts[1][ok].astype(int).to_numpy()
+        day[index] = parts[2][ok].str.strip().astype(int).to_numpy()
+        matched[index] = True
+
+    # Reject days past the end of the month (and year 0, which datetime cannot hold)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[np.clip(month, 1, 12) - 1]
+    month_days = month_days + ((month == 2) & leap)
+    valid = matched & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days) & (year >= 1)
+
+    year, month, day = np.where(valid, year, 1970), np.where(valid, month, 1), np.where(valid, day, 1)
+    dates = (
+        (year - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+        + (month - 1).astype("timedelta64[M]")
+    ).astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    return dates, valid
+
+def _parse_hhmm(values: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parses HHMM times column-wise with integer arithmetic.
+
+    For four digit strings the hour/minute range check is equivalent to
+    strptime("%H%M"); shorter forms such as "800" go through the strptime pattern.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Hours, minutes and a mask of valid entries
+    """
+    text = values.astype(object)
+    n_rows = len(text)
+    hours = np.zeros(n_rows, dtype=np.int64)
+    minutes = np.zeros(n_rows, dtype=np.int64)
+    valid = np.zeros(n_rows, dtype=bool)
+
+    canonical = text.str.fullmatch(r"[0-9]{4}").fillna(False).to_numpy(dtype=bool)
+    if canonical.any():
+        digits = _ascii_digits(text[canonical], 4)
+        hours[canonical] = digits[:, 0] * 10 + digits[:, 1]
+        minutes[canonical] = digits[:, 2] * 10 + digits[:, 3]
+        valid[canonical] = (hours[canonical] < 24) & (minutes[canonical] < 60)
+
+    irregular = ~canonical & text.notna().to_numpy()
+    if irregular.any():
+        parts, ok = _extract_parts(text[irregular], HHMM_PATTERN, 0)
+        index = np.flatnonzero(irregular)[ok]
+        hours[index] = parts[0][ok].astype(int).to_numpy()
+        minutes[index] = parts[1][ok].astype(int).to_numpy()
+        valid[index] = True
+
+    return np.where(valid, hours, 0), np.where(valid, minutes, 0), valid
+
+# "HH:MM" for every minute of the day, indexed by hours * 60 + minutes
+HHMM_LABELS = np.array([f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60)], dtype=object)
+
+def _format_hhmm(hours: np.ndarray, minutes: np.ndarray) -> pd.Series:
+    """Formats hour and minute arrays as HH:MM strings."""
+    return pd.Series(HHMM_LABELS[hours * 60 + minutes]).astype(str)
+
+def clean_services_vectorised(services: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Cleans services column-wise and produces the same output as clean_services_rowwise.
+
+    Fields are validated in one pass per column by the batch validator, run
+    dates and HHMM times are parsed with vectorised integer arithmetic, the
+    midnight rollover is applied with boolean masks and delays are computed
+    in NumPy. Every rejected service is reported with the offending field and
+    a reason.
+
+    Args:
+        services (List[Dict[str, Any]]): Raw services
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Cleaned records and missing arrivals report
+    """
+    if not services:
+        return pd.DataFrame(), pd.DataFrame(columns=MISSING_COLUMNS)
+
+    raw = pd.DataFrame(services, dtype=object)
+    result = service_validator.validate(raw)
+    frame = result.frame
+    n_rows = len(frame)
+
+    fields = np.full(n_rows, None, dtype=object)
+    reasons = np.full(n_rows, None, dtype=object)
+    fields[result.rejections.index] = result.rejections["field"].to_numpy()
+    reasons[result.rejections.index] = result.rejections["reason"].to_numpy()
+
+    def reject(mask: np.ndarray, field: str, reason: str) -> None:
+        mask = mask & (reasons == None)  # noqa: E711
+        fields[mask] = field
+        reasons[mask] = reason
+
+    # Same order of checks as process_service
+    run_dates, date_ok = _parse_run_dates(frame["run_date"])
+    reject(~date_ok, "run_date", "invalid_date")
+
+    actual = frame["actual_arrival"]
+    reject((actual.isna() | (actual == "")).to_numpy(dtype=bool), "actual_arrival", "missing_actual_arrival")
+
+    scheduled_hour, scheduled_minute, scheduled_ok = _parse_hhmm(frame["scheduled_arrival"])
+    actual_hour, actual_minute, actual_ok = _parse_hhmm(actual)
+    reject(~scheduled_ok, "scheduled_arrival", "invalid_time")
+    reject(~actual_ok, "actual_arrival", "invalid_time")
+
+    valid = reasons == None  # noqa: E711
+
+    # Handle midnight crossing, then compute delays in whole minutes
+    rollover = (actual_hour < 5) & (scheduled_hour > 20)
+    delay_minutes = (
+        actual_hour * 60 + actual_minute + rollover * 24 * 60
+        - (scheduled_hour * 60 + scheduled_minute)
+    )
+
+    valid_rows = frame[valid].reset_index(drop=True)
+    if len(valid_rows):
+        df_cleaned = pd.DataFrame({
+            "run_date": run_dates[valid].astype(object),
+            "station": valid_rows["station"].astype(str),
+            "service_id": valid_rows["service_id"].astype(str),
+            "operator": valid_rows["operator"].astype(str),
+            "is_passenger_train": valid_rows["is_passenger_train"].astype(bool),
+            "scheduled_arrival": _format_hhmm(scheduled_hour[valid], scheduled_minute[valid]),
+            "actual_arrival": _format_hhmm(actual_hour[valid], actual_minute[valid]),
+            "is_actual": valid_rows["is_actual"].astype(bool),
+            "origin": valid_rows["origin"].astype(str),
+            "destination": valid_rows["destination"].astype(str),
+            "was_scheduled_to_stop": valid_rows["was_scheduled_to_stop"].astype(bool),
+            "stop_status": valid_rows["stop_status"].astype(str),
+            "delay_minutes": delay_minutes[valid].astype(np.int64),
+        })
+    else:
+        df_cleaned = pd.DataFrame()
+
+    # The report shows the raw values, as the row-wise path does
+    rejected = ~valid
+    report: Dict[str, List[Any]] = {}
+    for column in MISSING_COLUMNS[:6]:
+        values = raw[column][rejected] if column in raw else pd.Series(np.nan, index=raw.index[rejected], dtype=object)
+        default = "UNKNOWN" if column in ("origin", "destination") else None
+        # NaN marks a key that was absent from the raw service
+        absent = values.map(lambda value: isinstance(value, float) and value != value).to_numpy(dtype=bool)
+        report[column] = values.where(~absent, default).tolist()
+    report["field"] = fields[rejected].tolist()
+    report["reason"] = reasons[rejected].tolist()
+
+    return df_cleaned, pd.DataFrame(report, columns=MISSING_COLUMNS)
+
+def process_data(raw_data: Dict[str, Any], vectorised: Optional[bool] = None,
+                 store: Optional[IntermediateStore] = None) -> pd.DataFrame:
+    """
+    Process and clean extracted train arrival data.
+    
+    Args:
+        raw_data (Dict[str, Any]): JSON data extracted from API
+        vectorised (Optional[bool]): Use the columnar implementation instead of
+            the row-wise one (default: settings.clean_vectorised)
+        store (Optional[IntermediateStore]): Where the cleaned stage is stored
+            (default: an IntermediateStore built from settings)
+        
+    Returns:
+        pd.DataFrame: Cleaned train arrival data, with arrival timestamps
+    """
+    logger.info("🚀 Starting data cleaning process...")
+    if vectorised is None:
+        vectorised = settings.clean_vectorised
+    
+    services = raw_data.get("services", [])
+    total_services = len(services)
+    logger.info("📊 Processing %d train services (%s)...", total_services,
+                "vectorised" if vectorised else "row-wise")
+
+    if vectorised:
+        df_cleaned, df_missing = clean_services_vectorised(services)
+    else:
+        df_cleaned, df_missing = clean_services_rowwise(services)
+    df_cleaned = with_arrival_timestamps(df_cleaned)
     
-    # Create DataFrames and save to files
+    # Save DataFrames to files
     try:
-        if cleaned_delays:
-            df_cleaned = pd.DataFrame(cleaned_delays)
-            cleaned_path = os.path.join(OUTPUT_DIR, "cleaned_delays_data.csv")
-            df_cleaned.to_csv(cleaned_path, index=False)
-            logger.info("✅ Saved %d cleaned records to %s", len(cleaned_delays), cleaned_path)
+        if not df_cleaned.empty:
+            store = store or IntermediateStore()
+            cleaned_path = store.write(
+                "cleaned_delays", df_cleaned,
+                csv_path=os.path.join(OUTPUT_DIR, "cleaned_delays_data.csv")
+            )
+            logger.info("✅ Saved %d cleaned records to %s", len(df_cleaned), cleaned_path)
         else:
             logger.warning("⚠️ No valid records found for cleaning")
-            df_cleaned = pd.DataFrame()
             
-        if missing_actual_arrival:
-            df_missing = pd.DataFrame(missing_actual_arrival)
+        if not df_missing.empty:
             missing_path = os.path.join(OUTPUT_DIR, "missing_actual_arrivals.csv")
             df_missing.to_csv(missing_path, index=False)
             logger.info("ℹ️ Saved %d records with missing arrivals to %s", 
-                       len(missing_actual_arrival), missing_path)
+                       len(df_missing), missing_path)
             
         # Log summary statistics
         logger.info("📊 Processing Summary:")
         logger.info("   - Total services processed: %d", total_services)
-        logger.info("   - Valid records: %d", len(cleaned_delays))
-        logger.info("   - Missing arrivals: %d", len(missing_actual_arrival))
+        logger.info("   - Valid records: %d", len(df_cleaned))
+        logger.info("   - Missing arrivals: %d", len(df_missing))
+        if "reason" in df_missing and df_missing["reason"].notna().any():
+            for reason, count in df_missing["reason"].value_counts().items():
+                logger.info("     - %s: %d", reason, count)
         
     except Exception as e:
         logger.error("❌ Error saving processed data: %s", str(e))
-        if not cleaned_delays:
-            return pd.DataFrame()  # Return empty DataFrame on error
-    # To check a specific column:
-    print(df_cleaned['run_date'].dtype)
-    print(df_cleaned['scheduled_arrival'].dtype)
-    print(df_cleaned['actual_arrival'].dtype)
     
-    return df_cleaned
\ No newline at end of file
+    return df_cleaned
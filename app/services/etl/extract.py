@@ -1,31 +1,36 @@
 # app/services/etl/extract.py
-import os 
+import os
 import json
+import asyncio
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from datetime import date as date_type
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+from app.core.config import settings
 from app.core.logging_config import configure_logging
-from app.services.trains_main import get_train_arrivals
+from app.services.trains_main import NO_ARRIVALS_ERROR, get_train_arrivals
 
 logger = configure_logging()
 
-# Define output directory using settings
-OUTPUT_DIR = os.path.join("data", "outputs", "raw_data")
+# Define output directory using settings (raw RTT responses are cached here)
+OUTPUT_DIR = settings.rtt_cache_dir
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 async def extract_data_for_date(station: str, date: str) -> Optional[Dict[str, Any]]:
     """
     Extract raw train data for a specific date.
-    
+
     Args:
         station (str): Station code (e.g., "FPK" for Finsbury Park)
         date (str): Specific date to fetch data for
-        
+
     Returns:
         Optional[Dict[str, Any]]: Dictionary containing extracted train services or None if error.
     """
 
-    raw_data = await get_train_arrivals(station, date)  
-    
+    raw_data = await get_train_arrivals(station, date)
+
     if raw_data and "services" in raw_data:
         return raw_data
     else:
@@ -33,30 +38,435 @@ async def extract_data_for_date(station: str, date: str) -> Optional[Dict[str, A
         return None
 
 
-async def extract_and_save_arrivals_data(station: str, days: int = 7) -> Dict[str, Any]:
+def past_dates(days: int) -> List[str]:
+    """
+    Returns the last ``days`` dates as YYYY-MM-DD strings, newest first.
+
+    Args:
+        days (int): Number of past days (including today)
+
+    Returns:
+        List[str]: Date strings
+    """
+    today = datetime.today()
+    return [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+
+def plan_incremental_extraction(
+    stations: Sequence[str],
+    days: int,
+    watermarks: Dict[str, date_type],
+    refetch_days: Optional[int] = None
+) -> Dict[str, List[str]]:
+    """
+    Works out which station-days still need fetching.
+
+    A station's watermark is the last date that has been fully ingested.
+    Only dates after it (within the last ``days`` days) are planned, plus the
+    most recent ``refetch_days`` days, which are always fetched again to pick
+    up late actual arrivals.
+
+    Args:
+        stations (Sequence[str]): Station CRS codes
+        days (int): Maximum number of past days to consider
+        watermarks (Dict[str, date]): Last fully ingested date per station
+        refetch_days (Optional[int]): Recent days always re-fetched
+            (default: settings.extract_refetch_days)
+
+    Returns:
+        Dict[str, List[str]]: Dates (YYYY-MM-DD, newest first) to fetch per station
+    """
+    refetch_days = settings.extract_refetch_days if refetch_days is None else refetch_days
+    window = past_dates(days)
+
+    plan = {}
+    for station in stations:
+        watermark = watermarks.get(station)
+        plan[station] = [
+            date for i, date in enumerate(window)
+            if i < refetch_days or watermark is None or date > watermark.isoformat()
+        ]
+    return plan
+
+
+def advance_watermarks(
+    plan: Dict[str, List[str]],
+    failures: Sequence[Dict[str, Any]],
+    watermarks: Dict[str, date_type],
+    refetch_days: Optional[int] = None
+) -> Dict[str, date_type]:
+    """
+    Computes new watermarks after the planned station-days were ingested.
+
+    A station's watermark moves forward over consecutive successfully fetched
+    dates, stopping at the first fetch or HTTP failure and never entering the
+    re-fetch window, whose data may still change. A day without arrivals was
+    fetched fine and does not hold the watermark back.
+
+    Args:
+        plan (Dict[str, List[str]]): The plan that was extracted
+        failures (Sequence[Dict[str, Any]]): Failed station-days reported by the extractor
+        watermarks (Dict[str, date]): Watermarks before the run
+        refetch_days (Optional[int]): Recent days always re-fetched
+
+    Returns:
+        Dict[str, date]: Stations whose watermark moved, with the new value
+    """
+    refetch_days = settings.extract_refetch_days if refetch_days is None else refetch_days
+    # Newest date that can be considered final
+    final_before = (datetime.today() - timedelta(days=refetch_days)).strftime("%Y-%m-%d")
+    failed = {
+        (failure["station"], failure["date"])
+        for failure in failures
+        if failure.get("error") != NO_ARRIVALS_ERROR
+    }
+
+    advanced = {}
+    for station, dates in plan.items():
+        current = watermarks.get(station)
+        new_watermark = current
+        for date in sorted(date for date in dates if date <= final_before):
+            if (station, date) in failed:
+                break
+            new_watermark = datetime.strptime(date, "%Y-%m-%d").date()
+        if new_watermark is not None and new_watermark != current:
+            advanced[station] = new_watermark
+    return advanced
+
+
+async def _fetch_station_day(station: str, date: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Fetches one station-day, turning API errors into an error message.
+
+    Returns:
+        Tuple of (raw_data or None, error message or None)
+    """
+    try:
+        raw_data = await get_train_arrivals(station, date)
+    except Exception as e:
+        return None, str(e)
+
+    if raw_data and "services" in raw_data:
+        return raw_data, None
+    return None, (raw_data or {}).get("error", "No valid train data")
+
+
+async def _extract_station_day(
+    station: str,
+    date: str,
+    semaphore: asyncio.Semaphore
+) -> Tuple[str, str, Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Fetches one station-day behind the shared semaphore.
+
+    Returns:
+        Tuple of (station, date, raw_data or None, error message or None)
+    """
+    async with semaphore:
+        raw_data, error = await _fetch_station_day(station, date)
+    return station, date, raw_data, error
+
+
+async def extract_arrivals_concurrently(
+    stations: Sequence[str],
+    dates: Sequence[str],
+    max_concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Extract raw train data for every station and date concurrently.
+
+    All station-days are requested at once, bounded by a semaphore. Results
+    are merged in the order of ``dates`` (then ``stations``) regardless of the
+    order in which responses arrive, and a failed station-day is reported in
+    ``failures`` without affecting the rest of the batch.
+
+    Args:
+        stations (Sequence[str]): Station codes to extract
+        dates (Sequence[str]): Dates (YYYY-MM-DD) to extract
+        max_concurrency (Optional[int]): Maximum requests in flight
+            (default: settings.extract_concurrency)
+
+    Returns:
+        Dict[str, Any]: ``{"services": [...], "failures": [{"station", "date", "error"}]}``
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or settings.extract_concurrency)
+
+    # gather() preserves submission order, which keeps the merge deterministic
+    results = await asyncio.gather(*(
+        _extract_station_day(station, date, semaphore)
+        for date in dates
+        for station in stations
+    ))
+
+    arrivals_data: Dict[str, Any] = {"services": [], "failures": []}
+
+    for station, date, raw_data, error in results:
+        if raw_data:
+            arrivals_data["services"].extend(raw_data["services"])
+        else:
+            logger.error("❌ No valid train data found for %s on %s: %s", station, date, error)
+            arrivals_data["failures"].append({"station": station, "date": date, "error": error})
+
+    logger.info(
+        "📦 Extracted %d services from %d station-days (%d failed)",
+        len(arrivals_data["services"]), len(results), len(arrivals_data["failures"])
+    )
+    return arrivals_data
+
+
+async def extract_and_save_arrivals_data(
+    station: str,
+    days: int = 7,
+    concurrent: bool = True,
+    max_concurrency: Optional[int] = None
+) -> Dict[str, Any]:
     """
     Extract raw train data and save locally.
-    
+
     Args:
         station (str): Station code (e.g., "FPK" for Finsbury Park)
         days (int): Number of past days to extract (default: 7)
-        
+        concurrent (bool): Fetch all days at once instead of one after another
+        max_concurrency (Optional[int]): Maximum requests in flight in concurrent mode
+
     Returns:
         Dict[str, Any]: Dictionary containing extracted train services
     """
+    if concurrent:
+        return await extract_arrivals_concurrently([station], past_dates(days), max_concurrency)
+
     arrivals_data = {"services": []}  # Initialise empty container
 
-    for i in range(days):
-        # Calculate the date string for 'i' days ago
-        date = (datetime.today() - timedelta(days=i)).strftime("%Y-%m-%d") # Ensure date is a string
-        
+    for date in past_dates(days):
         raw_data = await extract_data_for_date(station, date)
-    
+
         if raw_data:
             # Append to full dataset
             arrivals_data["services"].extend(raw_data["services"])
-        else: 
+        else:
             logger.error("❌ No valid train data found for %s on %s", station, str(date))
-            
-    
-    return arrivals_data
\ No newline at end of file
+
+
+    return arrivals_data
+
+
+
+@dataclass(order=True)
+class ExtractionJob:
+    """A single station-day to extract; lower ``priority`` runs first."""
+    priority: int
+    sequence: int
+    station: str = field(compare=False)
+    date: str = field(compare=False)
+
+
+@dataclass
+class ExtractionReport:
+    """Progress and throughput of a multi-station extraction run."""
+    total_jobs: int
+    completed: int = 0
+    failed: int = 0
+    services: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def jobs_per_second(self) -> float:
+        done = self.completed + self.failed
+        return done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def services_per_second(self) -> float:
+        return self.services / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_jobs": self.total_jobs,
+            "completed": self.completed,
+            "failed": self.failed,
+            "services": self.services,
+            "elapsed_seconds": round(self.elapsed, 2),
+            "jobs_per_second": round(self.jobs_per_second, 2),
+            "services_per_second": round(self.services_per_second, 2),
+        }
+
+
+class MultiStationExtractor:
+    """
+    Extracts arrivals for many stations over many days.
+
+    Station-days are queued in a priority queue so that today's data is
+    fetched before backfill, and drained by a fixed pool of workers. Request
+    rate is bounded by the RTT client's per-host token bucket, so raising the
+    worker count never exceeds the API quota.
+    """
+
+    def __init__(self, workers: Optional[int] = None, progress_interval: Optional[int] = None):
+        self.workers = workers or settings.extract_concurrency
+        self.progress_interval = progress_interval or settings.extract_progress_interval
+
+    @staticmethod
+    def _priority(date: str) -> int:
+        """Days before today; today's data has the highest priority (0)."""
+        days_ago = (datetime.today().date() - datetime.strptime(date, "%Y-%m-%d").date()).days
+        return max(days_ago, 0)
+
+    def _log_progress(self, report: ExtractionReport) -> None:
+        done = report.completed + report.failed
+        remaining = report.total_jobs - done
+        rate = report.jobs_per_second
+        eta = remaining / rate if rate > 0 else float("nan")
+        logger.info(
+            "⏳ Extraction progress: %d/%d station-days (%d failed), %.1f jobs/s, %.1f services/s, ETA %.0fs",
+            done, report.total_jobs, report.failed, rate, report.services_per_second, eta
+        )
+
+    async def _worker(
+        self,
+        queue: "asyncio.PriorityQueue[ExtractionJob]",
+        results: Dict[int, Tuple[str, str, Optional[Dict[str, Any]], Optional[str]]],
+        report: ExtractionReport
+    ) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                raw_data, error = await _fetch_station_day(job.station, job.date)
+
+                if raw_data:
+                    report.completed += 1
+                    report.services += len(raw_data["services"])
+                else:
+                    report.failed += 1
+                    logger.error("❌ No valid train data found for %s on %s: %s",
+                                 job.station, job.date, error)
+                results[job.sequence] = (job.station, job.date, raw_data, error)
+
+                if (report.completed + report.failed) % self.progress_interval == 0:
+                    self._log_progress(report)
+            finally:
+                queue.task_done()
+
+    async def run(self, stations: Sequence[str], dates: Sequence[str]) -> Dict[str, Any]:
+        """
+        Extracts every station for every date.
+
+        Args:
+            stations (Sequence[str]): Station CRS codes
+            dates (Sequence[str]): Dates (YYYY-MM-DD) to extract
+
+        Returns:
+            Dict[str, Any]: ``{"services": [...], "failures": [...], "report": {...}}``
+            with services merged in the order of ``dates`` then ``stations``.
+        """
+        logger.info("🚆 Extracting %d stations x %d days with %d workers",
+                    len(stations), len(dates), self.workers)
+        return await self.run_jobs([(station, date) for date in dates for station in stations])
+
+    async def run_plan(self, plan: Dict[str, List[str]]) -> Dict[str, Any]:
+        """
+        Extracts a per-station list of dates, e.g. from plan_incremental_extraction().
+
+        Args:
+            plan (Dict[str, List[str]]): Dates (YYYY-MM-DD) to extract, keyed by station
+
+        Returns:
+            Dict[str, Any]: Same shape as run(), merged newest date first
+        """
+        jobs = [(station, date) for station, dates in plan.items() for date in dates]
+        station_order = {station: i for i, station in enumerate(plan)}
+        jobs.sort(key=lambda job: (-datetime.strptime(job[1], "%Y-%m-%d").toordinal(), station_order[job[0]]))
+        logger.info("🚆 Extracting %d station-days for %d stations with %d workers",
+                    len(jobs), len(plan), self.workers)
+        return await self.run_jobs(jobs)
+
+    async def run_jobs(self, jobs: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Extracts the given (station, date) pairs.
+
+        Args:
+            jobs (Sequence[Tuple[str, str]]): Station-days to extract
+
+        Returns:
+            Dict[str, Any]: ``{"services": [...], "failures": [...], "report": {...}}``
+            with services merged in the order of ``jobs``.
+        """
+        queue: "asyncio.PriorityQueue[ExtractionJob]" = asyncio.PriorityQueue()
+        sequence = 0
+        for station, date in jobs:
+            queue.put_nowait(ExtractionJob(self._priority(date), sequence, station, date))
+            sequence += 1
+
+        report = ExtractionReport(total_jobs=sequence)
+        results: Dict[int, Tuple[str, str, Optional[Dict[str, Any]], Optional[str]]] = {}
+
+        workers = [
+            asyncio.create_task(self._worker(queue, results, report))
+            for _ in range(min(self.workers, max(sequence, 1)))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        arrivals_data: Dict[str, Any] = {"services": [], "failures": []}
+        for seq in range(sequence):
+            station, date, raw_data, error = results[seq]
+            if raw_data:
+                arrivals_data["services"].extend(raw_data["services"])
+            else:
+                arrivals_data["failures"].append({"station": station, "date": date, "error": error})
+
+        arrivals_data["report"] = report.as_dict()
+        logger.info("✅ Extraction finished: %s", arrivals_data["report"])
+        return arrivals_data
+
+
+async def extract_network_arrivals(
+    stations: Sequence[str],
+    days: int = 7,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Extract arrivals for a list of stations over the past ``days`` days.
+
+    Args:
+        stations (Sequence[str]): Station CRS codes (e.g. a network region)
+        days (int): Number of past days to extract (default: 7)
+        workers (Optional[int]): Number of concurrent workers
+
+    Returns:
+        Dict[str, Any]: Merged services, per station-day failures and a throughput report
+    """
+    extractor = MultiStationExtractor(workers=workers)
+    return await extractor.run(stations, past_dates(days))
+
+
+async def extract_incremental_arrivals(
+    stations: Sequence[str],
+    days: int,
+    watermarks: Dict[str, date_type],
+    workers: Optional[int] = None
+) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """
+    Extract only the station-days not yet ingested, plus the re-fetch window.
+
+    Args:
+        stations (Sequence[str]): Station CRS codes
+        days (int): Maximum number of past days to consider
+        watermarks (Dict[str, date]): Last fully ingested date per station
+        workers (Optional[int]): Number of concurrent workers
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, List[str]]]: Extracted data and the plan it followed
+    """
+    plan = plan_incremental_extraction(stations, days, watermarks)
+    skipped = len(stations) * days - sum(len(dates) for dates in plan.values())
+    logger.info("💧 Incremental extraction: %d station-days already ingested, skipping", skipped)
+
+    extractor = MultiStationExtractor(workers=workers)
+    return await extractor.run_plan(plan), plan
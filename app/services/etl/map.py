@@ -1,74 +1,159 @@
 # app/services/etl/map.py
+import glob
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
 import folium
 from folium import Element
-from sqlalchemy import text
+from folium.plugins import MarkerCluster
 from sqlalchemy.ext.asyncio import AsyncSession
 # Project Modules
 from app.core.logging_config import configure_logging
+from app.core.config import settings
+from app.core.executor import cpu_executor
+from app.crud.delay_crud import ArrivalFilters, DelayBatch, fetch_delays
 
 logger = configure_logging()
 
-TABLE_NAME = "arrivals_tracking"
+RENDER_MODES = ("stations", "trains")
+# Arrivals as DelayBatch columns, or as rows
+DelayData = Union[Dict[str, np.ndarray], List[Dict[str, Any]]]
+
+# Columns aggregate_stations needs; the trains mode selects all DELAY_COLUMNS for its popups
+STATION_COLUMNS = [
+    f"{role}{suffix}" for role in ("origin", "destination")
+    for suffix in ("", "_crs", "_latitude", "_longitude")
+] + ["delay_minutes"]
+ARCHIVE_PREFIX = "train_delays_map_"
+
+def _format_minutes(value: Any, precision: int) -> str:
+    """Formats a delay in minutes, or "n/a" when none of the trains reported one."""
+    return "n/a" if pd.isna(value) else f"{value:.{precision}f} min"
+
+def aggregate_stations(delay_data: DelayData) -> pd.DataFrame:
+    """
+    Collapses train rows into one row per station they start or end at.
+
+    Args:
+        delay_data (DelayData): Arrivals as returned by fetch_delay_data
+
+    Returns:
+        pd.DataFrame: One row per station CRS with its name, coordinates, the number of
+            trains from and to it, and the average and maximum delay of those trains
+    """
+    df = pd.DataFrame(delay_data)
+    if df.empty:
+        return pd.DataFrame()
+
+    roles = []
+    for role in ("origin", "destination"):
+        part = df[[f"{role}_crs", role, f"{role}_latitude", f"{role}_longitude", "delay_minutes"]]
+        part.columns = ["crs", "name", "latitude", "longitude", "delay_minutes"]
+        roles.append(part.assign(is_origin=role == "origin"))
+    stations = pd.concat(roles, ignore_index=True).dropna(subset=["crs", "latitude", "longitude"])
+    stations = stations.assign(is_delayed=stations["delay_minutes"] > 10)
+
+    return stations.groupby("crs", sort=True).agg(
+        name=("name", "first"),
+        latitude=("latitude", "first"),
+        longitude=("longitude", "first"),
+        trains_from=("is_origin", "sum"),
+        trains_to=("is_origin", lambda is_origin: int((~is_origin).sum())),
+        avg_delay=("delay_minutes", "mean"),
+        max_delay=("delay_minutes", "max"),
+        delayed_count=("is_delayed", "sum"),
+    ).reset_index()
+
+def prune_map_archive(directory: Optional[str] = None, max_files: Optional[int] = None,
+                      max_bytes: Optional[int] = None) -> List[str]:
+    """
+    Deletes the oldest archived maps until the archive fits its limits.
+
+    Only timestamped map files directly in ``directory`` are considered, so
+    caches kept in subdirectories are left alone. The newest map is always
+    kept, even if it exceeds ``max_bytes`` on its own.
+
+    Args:
+        directory (Optional[str]): Archive directory (default: settings.map_archive_dir)
+        max_files (Optional[int]): Maps to keep (default: settings.map_archive_max_files)
+        max_bytes (Optional[int]): Total size to keep (default: settings.map_archive_max_bytes)
+
+    Returns:
+        List[str]: Paths of the deleted maps
+    """
+    directory = directory or settings.map_archive_dir
+    max_files = settings.map_archive_max_files if max_files is None else max_files
+    max_bytes = settings.map_archive_max_bytes if max_bytes is None else max_bytes
+
+    archived = []
+    for path in glob.glob(os.path.join(directory, f"{ARCHIVE_PREFIX}*.html")):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        archived.append((stat.st_mtime_ns, path, stat.st_size))
+    # Newest first; the file name breaks ties between maps written in the same tick
+    archived.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+
+    removed = []
+    total = 0
+    for kept, (_, path, size) in enumerate(archived):
+        total += size
+        if kept == 0 or (kept < max_files and total <= max_bytes):
+            continue
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError as e:
+            logger.warning("⚠️ Could not delete archived map %s: %s", path, e)
+    if removed:
+        logger.info("🧹 Deleted %d archived maps", len(removed))
+    return removed
 
 class TrainDelayMap:
     """Handles the generation of train delay maps using Folium."""
     
-    def __init__(self):
+    def __init__(self, render_mode: Optional[str] = None):
+        self.render_mode = (render_mode or settings.map_render_mode).lower()
+        if self.render_mode not in RENDER_MODES:
+            raise ValueError(f"Unsupported map render mode: {self.render_mode}")
+
         # Define constants
         self.FPK_LATITUDE = 51.5643002449157
         self.FPK_LONGITUDE = -0.106284978884699
         
-        # Ensure the maps directory exists
-        self.output_dir = os.path.join('data', 'maps')
-        os.makedirs(self.output_dir, exist_ok=True)
-        
-        # Define the default map output path
-        self.map_output_path = os.path.join(
-            self.output_dir,
-            f"train_delays_map_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+    @staticmethod
+    def archive_path() -> str:
+        """Returns a new timestamped file in the map archive, creating the directory if needed."""
+        os.makedirs(settings.map_archive_dir, exist_ok=True)
+        return os.path.join(
+            settings.map_archive_dir,
+            f"{ARCHIVE_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
         )
 
-    async def fetch_delay_data(self, db: AsyncSession, hours: int = 1) -> List[Dict[str, Any]]:
+    async def fetch_delay_data(self, db: AsyncSession, hours: int = 1,
+                               station: Optional[str] = None) -> DelayBatch:
         """
-        Fetches recent train delay data from PostGIS.
+        Fetches the latest passenger arrivals of the last ``hours`` from PostGIS.
+        
+        At most settings.map_max_trains arrivals are drawn, newest first; the
+        station mode only selects the columns it aggregates.
         
         Args:
             db: Database session
             hours: Number of hours of historical data to fetch
+            station: Only services starting or ending at this CRS code
             
         Returns:
-            List of dictionaries containing train delay data
+            The arrivals, column by column
         """
         try:
-            query = text(f"""
-                SELECT 
-                    run_date,
-                    service_id,
-                    operator,
-                    origin,
-                    origin_crs,
-                    ST_X(origin_geom::geometry) as origin_longitude,
-                    ST_Y(origin_geom::geometry) as origin_latitude,
-                    destination,
-                    destination_crs,
-                    ST_X(destination_geom::geometry) as destination_longitude,
-                    ST_Y(destination_geom::geometry) as destination_latitude,
-                    scheduled_arrival,
-                    actual_arrival,
-                    delay_minutes,
-                    is_passenger_train
-                FROM {TABLE_NAME}
-                WHERE is_passenger_train = TRUE
-                ORDER BY delay_minutes DESC  -- Order by delay_minutes in descending order
-                LIMIT 100  -- Fetch only the top 100 records
-                """)
-            
-            result = await db.execute(query)
-            delay_data = [row._asdict() for row in result.fetchall()] # Convert to dict
-            
+            filters = ArrivalFilters.window(hours=hours, station=station)
+            columns = STATION_COLUMNS if self.render_mode == "stations" else None
+            delay_data = await fetch_delays(db, filters, columns=columns,
+                                            limit=settings.map_max_trains, descending=True)
             logger.info("✅ Retrieved %d records from database", len(delay_data))
             return delay_data
             
@@ -96,11 +181,11 @@ class TrainDelayMap:
         )
         
         delay = row['delay_minutes']
-        if delay is not None:
+        if pd.notna(delay):
             if delay < 0:
-                popup_info += f"<b>Early:</b> {abs(delay)} min"
+                popup_info += f"<b>Early:</b> {abs(delay):.0f} min"
             else:
-                popup_info += f"<b>Delay:</b> {delay} min"
+                popup_info += f"<b>Delay:</b> {delay:.0f} min"
                 
         return popup_info
 
@@ -121,77 +206,188 @@ class TrainDelayMap:
         """
         map_obj.get_root().html.add_child(Element(legend_html))
 
-    async def generate_map(self, db: AsyncSession, hours: int = 1) -> Optional[str]:
+    def _create_station_popup(self, station: Dict[str, Any]) -> str:
+        """Creates HTML content for a station marker popup."""
+        return (
+            f"<b>{station['name']}</b> ({station['crs']})<br>"
+            f"<b>Trains from / to:</b> {station['trains_from']} / {station['trains_to']}<br>"
+            f"<b>Average delay:</b> {_format_minutes(station['avg_delay'], 1)}<br>"
+            f"<b>Max delay:</b> {_format_minutes(station['max_delay'], 0)} ({station['delayed_count']} over 10 min)"
+        )
+
+    def _add_station_legend(self, map_obj: folium.Map) -> None:
+        """Adds the legend of the station rendering mode."""
+        legend_html = """
+            <div style="position: fixed; 
+                        bottom: 50px; left: 50px; width: 250px; 
+                        border:2px solid grey; z-index:9999; font-size:14px; 
+                        background-color:white; padding: 10px;">
+                <b>Legend:</b> average delay of trains from/to each station<br>
+                <i class="fa fa-circle" style="color:green"></i> Early<br>
+                <i class="fa fa-circle" style="color:orange"></i> On Time/Minor Delay<br>
+                <i class="fa fa-circle" style="color:red"></i> Significant Delay<br>
+                Circle size grows with the number of trains.
+                <br><b>Note:</b> Delays refer to arrivals at Finsbury Park.
+            </div>
         """
-        Generates an HTML map showing train delays.
+        map_obj.get_root().html.add_child(Element(legend_html))
+
+    def _add_train_markers(self, map_obj: folium.Map, delay_data: DelayData) -> None:
+        """Adds an origin and a destination marker per train service."""
+        for row in pd.DataFrame(delay_data).to_dict(orient="records"):
+            # Create origin marker
+            if pd.notna(row['origin_latitude']) and pd.notna(row['origin_longitude']):
+                
+                folium.Marker(
+                    location=[row['origin_latitude'], row['origin_longitude']],
+                    popup=folium.Popup(
+                        self._create_popup_content(row),
+                        max_width=300
+                    ),
+                    icon=folium.Icon(
+                        color=self._get_marker_color(row['delay_minutes']),
+                        icon="info-sign"
+                    )
+                ).add_to(map_obj)
+            
+            if pd.notna(row['destination_latitude']) and pd.notna(row['destination_longitude']):
+                
+                # Create destination marker with default station in popup 
+                
+                folium.Marker(
+                location=[row['destination_latitude'], row['destination_longitude']],
+                popup=folium.Popup(self._create_popup_content(row, default_station="Finsbury Park"), max_width=300),  # Use _create_popup_content
+                icon=folium.Icon(color="blue", icon="flag"),
+                tooltip=f"Destination: {row['destination']}"
+            ).add_to(map_obj)
+
+        self._add_legend(map_obj)
+
+    def _add_station_markers(self, map_obj: folium.Map, delay_data: DelayData) -> None:
+        """Adds one marker per distinct station, clustered where stations are dense."""
+        stations = aggregate_stations(delay_data)
+        layer = MarkerCluster(name="Stations").add_to(map_obj) if settings.map_cluster else map_obj
+
+        for station in stations.to_dict(orient="records"):
+            trains = station["trains_from"] + station["trains_to"]
+            folium.CircleMarker(
+                location=[station["latitude"], station["longitude"]],
+                radius=min(6 + 2 * trains ** 0.5, 20),
+                color=self._get_marker_color(station["avg_delay"]),
+                fill=True,
+                fill_opacity=0.8,
+                popup=folium.Popup(self._create_station_popup(station), max_width=300),
+                tooltip=station["name"]
+            ).add_to(layer)
+
+        self._add_station_legend(map_obj)
+        logger.info("📍 Rendered %d stations for %d train services", len(stations), len(pd.DataFrame(delay_data)))
+
+    def build_map(self, delay_data: DelayData) -> folium.Map:
+        """
+        Renders delay rows onto a folium map in the configured mode.
+
+        Args:
+            delay_data: Arrival columns (or rows) as returned by fetch_delay_data
+
+        Returns:
+            The folium map
+        """
+        # Create base map
+        m = folium.Map(
+            location=[self.FPK_LATITUDE, self.FPK_LONGITUDE],
+            zoom_start=10,
+            tiles="CartoDB positron"
+        )
+
+        # "stations" grows with the number of stations, "trains" with the number of services
+        if self.render_mode == "stations":
+            self._add_station_markers(m, delay_data)
+        else:
+            self._add_train_markers(m, delay_data)
+        
+        # Add Finsbury Park marker
+        folium.Marker(
+            location=[self.FPK_LATITUDE, self.FPK_LONGITUDE],
+            popup="<b>Finsbury Park</b><br>Reference station for delays",
+            icon=folium.Icon(color="purple", icon="info-sign")
+        ).add_to(m)
+        return m
+
+    async def render_html(self, db: AsyncSession, hours: int = 1,
+                          station: Optional[str] = None) -> Optional[str]:
+        """
+        Renders the delay map to an HTML string, without touching the disk.
+        
+        Args:
+            db: Database session
+            hours: Number of hours of historical data to display
+            station: Only services starting or ending at this CRS code
+            
+        Returns:
+            The HTML page, or None if there is no data to show
+        """
+        delay_data = await self.fetch_delay_data(db, hours, station)
+        if not len(delay_data):
+            logger.warning("⚠️ No delay data available for map generation")
+            return None
+        # Building and serialising thousands of folium objects would block the event loop
+        return await cpu_executor.run(render_map, delay_data.columns, self.render_mode)
+
+    async def generate_map(self, db: AsyncSession, hours: int = 1,
+                           station: Optional[str] = None) -> Optional[str]:
+        """
+        Generates an HTML map showing train delays and archives it.
+        
+        Used by the pipeline; the archive is pruned to its configured
+        limits after every write.
         
         Args:
             db: Database session
             hours: Number of hours of historical data to display
+            station: Only services starting or ending at this CRS code
             
         Returns:
             Path to the generated HTML map file
         """
         try:
-            # Fetch data from PostGIS
-            delay_data = await self.fetch_delay_data(db, hours)
-            
-            if not delay_data:
-                logger.warning("⚠️ No delay data available for map generation")
+            html = await self.render_html(db, hours, station)
+            if html is None:
                 return None
             
-            # Create base map
-            m = folium.Map(
-                location=[self.FPK_LATITUDE, self.FPK_LONGITUDE],
-                zoom_start=10,
-                tiles="CartoDB positron"
-            )
-            
-            # Add markers for each train service
-            for row in delay_data:
-                # Create origin marker
-                if row['origin_latitude'] is not None and row['origin_longitude'] is not None:
-                    
-                    folium.Marker(
-                        location=[row['origin_latitude'], row['origin_longitude']],
-                        popup=folium.Popup(
-                            self._create_popup_content(row),
-                            max_width=300
-                        ),
-                        icon=folium.Icon(
-                            color=self._get_marker_color(row['delay_minutes']),
-                            icon="info-sign"
-                        )
-                    ).add_to(m)
-                
-                if row['destination_latitude'] is not None and row['destination_longitude'] is not None:
-                    
-                    # Create destination marker with default station in popup 
-                    
-                    folium.Marker(
-                    location=[row['destination_latitude'], row['destination_longitude']],
-                    popup=folium.Popup(self._create_popup_content(row, default_station="Finsbury Park"), max_width=300),  # Use _create_popup_content
-                    icon=folium.Icon(color="blue", icon="flag"),
-                    tooltip=f"Destination: {row['destination']}"
-                ).add_to(m)
-            
-            # Add Finsbury Park marker
-            folium.Marker(
-                location=[self.FPK_LATITUDE, self.FPK_LONGITUDE],
-                popup="<b>Finsbury Park</b><br>Reference station for delays",
-                icon=folium.Icon(color="purple", icon="info-sign")
-            ).add_to(m)
-            
-            # Add legend
-            self._add_legend(m)
-            
-            # Save map
-            m.save(self.map_output_path)
-            logger.info("✅ Map generated successfully at: %s", 
-                       self.map_output_path)
-            
-            return self.map_output_path
+            map_output_path = await cpu_executor.run(archive_map, html)
+            logger.info("✅ Map generated successfully at: %s", map_output_path)
+            return map_output_path
             
         except Exception as e:
             logger.error("❌ Error generating map: %s", str(e))
-            return None 
+            return None
+
+def render_map(delay_data: DelayData, render_mode: Optional[str] = None) -> str:
+    """
+    Renders delay rows to an HTML page; blocking, meant to run in cpu_executor.
+
+    Args:
+        delay_data (DelayData): Arrival columns as returned by fetch_delay_data
+        render_mode (Optional[str]): One of RENDER_MODES (default: settings.map_render_mode)
+
+    Returns:
+        str: The HTML page
+    """
+    return TrainDelayMap(render_mode).build_map(delay_data).get_root().render()
+
+def archive_map(html: str) -> str:
+    """
+    Writes a rendered page to a new archive file and prunes the archive.
+
+    Args:
+        html (str): The HTML page
+
+    Returns:
+        str: Path of the archived map
+    """
+    map_output_path = TrainDelayMap.archive_path()
+    with open(map_output_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    prune_map_archive()
+    return map_output_path
@@ -7,8 +7,11 @@ from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging_config import configure_logging
+from app.core.executor import cpu_executor
+from app.crud.delay_crud import DelayBatch
 from app.services.etl.mapping.data_fetcher import fetch_delay_data
 from app.services.etl.mapping.map_config import MapConfig
+from app.services.etl.map import prune_map_archive
 from app.db.db_main import db_manager
 
 logger = configure_logging()
@@ -50,80 +53,100 @@ def _add_legend(map_obj: folium.Map) -> None:
     map_obj.get_root().html.add_child(Element(legend_html))
 
 
-async def generate_map_async(db, output_path: str): # Async inner function 
-    try:
-        trains = await fetch_delay_data(db) 
+async def render_map_html(db, hours: int = 24) -> Optional[str]:
+    """Renders the delay map of the last ``hours`` to an HTML string, or None if there is no data."""
+    trains = await fetch_delay_data(db, hours)
 
-        if not trains:
-            print("No trains data to generate map")
-            return
-        
-        # Use MapConfig instead of hardcorded values 
-        FPK_LATITUDE = MapConfig.FPK_LATITUDE
-        FPK_LONGITUDE = MapConfig.FPK_LONGITUDE
+    if not len(trains):
+        logger.info("No trains data to generate map")
+        return None
+    return await cpu_executor.run(build_map_html, trains)
 
-        
-        # Create base map
-        m = folium.Map(
-            location=[FPK_LATITUDE, FPK_LONGITUDE],
-            zoom_start=10
-        )
-        
-        # Add markers for each train service
-        for record in trains:
-            try:
-                # Skip if missing coordinates
-                if not all([
-                    record.get('origin_latitude'), 
-                    record.get('origin_longitude'),
-                    record.get('destination_latitude'), 
-                    record.get('destination_longitude')
-                ]):
-                    logger.warning(f"Skipping record {record.get('service_id')} due to missing coordinates")
-                    continue
-
-                # Add origin marker
-                folium.Marker(
-                    location=[
-                        float(record['origin_latitude']), 
-                        float(record['origin_longitude'])
-                    ],
-                    popup=folium.Popup(
-                        _create_popup_content(record),
-                        max_width=300
-                    ),
-                    icon=folium.Icon(
-                        color=_get_marker_color(record.get('delay_minutes', 0)),
-                        icon="info-sign"
-                    )
-                ).add_to(m)
-
-                # Add destination marker
-                folium.Marker(
-                    location=[
-                        float(record['destination_latitude']), 
-                        float(record['destination_longitude'])
-                    ],
-                    popup=f"Destination: {record['destination']}",
-                    icon=folium.Icon(color="blue", icon="flag")
-                ).add_to(m)
-            except Exception as e:
-                logger.error(f"Error adding marker for record {record.get('service_id')}: {str(e)}")
+
+def build_map_html(trains: DelayBatch) -> str:
+    """Builds the delay map page; blocking, meant to run in cpu_executor."""
+    # Use MapConfig instead of hardcorded values 
+    FPK_LATITUDE = MapConfig.FPK_LATITUDE
+    FPK_LONGITUDE = MapConfig.FPK_LONGITUDE
+
+    
+    # Create base map
+    m = folium.Map(
+        location=[FPK_LATITUDE, FPK_LONGITUDE],
+        zoom_start=10
+    )
+    
+    # Add markers for each train service
+    for record in trains.to_records():
+        try:
+            # Skip if missing coordinates
+            if not all([
+                record.get('origin_latitude'), 
+                record.get('origin_longitude'),
+                record.get('destination_latitude'), 
+                record.get('destination_longitude')
+            ]):
+                logger.warning(f"Skipping record {record.get('service_id')} due to missing coordinates")
                 continue
 
-        # Add Finsbury Park marker
-        folium.Marker(
-            location=[FPK_LATITUDE, FPK_LONGITUDE],
-            popup="<b>Finsbury Park</b><br>Reference station for delays",
-            icon=folium.Icon(color="purple", icon="info-sign")
-        ).add_to(m)
+            # Add origin marker
+            folium.Marker(
+                location=[
+                    float(record['origin_latitude']), 
+                    float(record['origin_longitude'])
+                ],
+                popup=folium.Popup(
+                    _create_popup_content(record),
+                    max_width=300
+                ),
+                icon=folium.Icon(
+                    color=_get_marker_color(record.get('delay_minutes', 0)),
+                    icon="info-sign"
+                )
+            ).add_to(m)
 
-        # Add legend
-        _add_legend(m)
+            # Add destination marker
+            folium.Marker(
+                location=[
+                    float(record['destination_latitude']), 
+                    float(record['destination_longitude'])
+                ],
+                popup=f"Destination: {record['destination']}",
+                icon=folium.Icon(color="blue", icon="flag")
+            ).add_to(m)
+        except Exception as e:
+            logger.error(f"Error adding marker for record {record.get('service_id')}: {str(e)}")
+            continue
+
+    # Add Finsbury Park marker
+    folium.Marker(
+        location=[FPK_LATITUDE, FPK_LONGITUDE],
+        popup="<b>Finsbury Park</b><br>Reference station for delays",
+        icon=folium.Icon(color="purple", icon="info-sign")
+    ).add_to(m)
+
+    # Add legend
+    _add_legend(m)
+
+    return m.get_root().render()
+
+
+def _archive_html(map_path: str, html: str) -> None:
+    with open(map_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    prune_map_archive(MapConfig.OUTPUT_DIR)
+
+
+async def generate_map_async(db, output_path: Optional[str] = None, hours: int = 24): # Async inner function 
+    """Renders the delay map into the archive and prunes the archive to its limits."""
+    try:
+        html = await render_map_html(db, hours)
+        if html is None:
+            return None
 
         # Get math path from MapConfig
-        map_path = MapConfig.map_output_path()
-        m.save(map_path)
+        map_path = output_path or MapConfig.map_output_path()
+        await cpu_executor.run(_archive_html, map_path, html)
         
         logger.info(f"✅ Map saved to: {map_path}")
         return map_path
@@ -131,3 +154,6 @@ async def generate_map_async(db, output_path: str): # Async inner function
     except Exception as e:
         logger.error(f"❌ Error generating map: {str(e)}")
         return None
+
+# Public name the package and its callers import
+generate_map = generate_map_async
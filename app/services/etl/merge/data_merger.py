@@ -1,14 +1,17 @@
 # app/services/etl/merge/data_merger.py
-import os
 import pandas as pd
-from typing import Tuple
+from typing import Optional, Tuple
 from app.core.logging_config import configure_logging
+from app.services.etl.storage import IntermediateStore
 
 logger = configure_logging()
 
 class DataMerger:
     """Handles merging of train data with geospatial coordinates."""
 
+    def __init__(self, store: Optional[IntermediateStore] = None):
+        self.store = store or IntermediateStore()
+
     def load_dataframes(self, cleaned_delays: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Load coordinates data and return with cleaned delays."""
         try:
@@ -80,11 +83,10 @@ class DataMerger:
         # Save dropped records
         missing_records = df[df['origin_crs'].isna() | df['destination_crs'].isna()]
         if not missing_records.empty:
-            missing_records.to_csv(
-                'data/outputs/dropped_records.csv',
-                mode='a',
-                header=not os.path.exists('data/outputs/dropped_records.csv'),
-                index=False
+            self.store.write(
+                "dropped_records", missing_records,
+                csv_path='data/outputs/dropped_records.csv',
+                append_csv=True
             )
             logger.info("📝 Saved %d dropped records", len(missing_records))
         
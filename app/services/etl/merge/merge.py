@@ -1,18 +1,22 @@
 # app/services/etl/merge/merge.py
 
+from typing import Optional
 import pandas as pd
 from app.core.logging_config import configure_logging
+from app.services.etl.storage import IntermediateStore
 from .station_matcher import StationMatcher
 from .data_merger import DataMerger
 
 logger = configure_logging()
 
-def merge_geospatial_data(cleaned_delays: pd.DataFrame) -> pd.DataFrame:
+def merge_geospatial_data(cleaned_delays: pd.DataFrame,
+                          store: Optional[IntermediateStore] = None) -> pd.DataFrame:
     """
     Merge cleaned train arrival data with geospatial station data.
     
     Args:
         cleaned_delays: DataFrame containing cleaned train delay data
+        store: Where the merged and dropped records are stored (default: from settings)
         
     Returns:
         DataFrame with merged geospatial coordinates
@@ -21,7 +25,8 @@ def merge_geospatial_data(cleaned_delays: pd.DataFrame) -> pd.DataFrame:
         logger.info("🚀 Starting geospatial data merge process...")
         
         # Initialise merger and load data
-        merger = DataMerger()
+        store = store or IntermediateStore()
+        merger = DataMerger(store)
         df_delays, df_coords = merger.load_dataframes(cleaned_delays)
         
         # Initialise station matcher
@@ -43,7 +48,8 @@ def merge_geospatial_data(cleaned_delays: pd.DataFrame) -> pd.DataFrame:
         df_merged = merger.handle_missing_data(df_merged)
         
         # Save final merged data
-        df_merged.to_csv('data/outputs/merged_train_station_data.csv', index=False)
+        store.write("merged_train_station", df_merged,
+                    csv_path='data/outputs/merged_train_station_data.csv')
         logger.info("✅ Successfully merged %d records", len(df_merged))
         
         return df_merged
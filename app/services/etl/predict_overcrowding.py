@@ -1,51 +1,138 @@
-# app.... predict_overcrowding.py 
+# app.... predict_overcrowding.py
 
 import pandas as pd
-import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.services.etl.map import TrainDelayMap
+from app.core.config import settings
 from app.core.logging_config import configure_logging
 
 logger = configure_logging()
 
 TABLE_NAME = "arrivals_tracking"
 
-async def predict_crowding(db_session: AsyncSession):
+CROWDING_COLUMNS = [
+    "station_crs", "station", "arrival_count", "arrivals_per_hour",
+    "avg_delay", "delayed_count", "delayed_ratio", "max_delay",
+]
+
+# One row per station; the run_date bounds let PostgreSQL skip partitions outside the window
+CROWDING_QUERY = f"""
+    SELECT
+        destination_crs AS station_crs,
+        MIN(destination) AS station,
+        COUNT(*) AS arrival_count,
+        AVG(delay_minutes)::DOUBLE PRECISION AS avg_delay,
+        COUNT(*) FILTER (WHERE delay_minutes > 10) AS delayed_count,
+        MAX(delay_minutes) AS max_delay
+    FROM {TABLE_NAME}
+    WHERE run_date BETWEEN :first_run_date AND :last_run_date
+      AND scheduled_arrival >= :start AND scheduled_arrival < :end
+      AND is_passenger_train = TRUE
+      AND (CAST(:stations AS TEXT[]) IS NULL OR destination_crs = ANY(CAST(:stations AS TEXT[])))
+    GROUP BY destination_crs
+    ORDER BY arrival_count DESC, destination_crs
+"""
+
+def crowding_window(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    hours: Optional[int] = None) -> Tuple[datetime, datetime]:
+    """
+    Resolves the [start, end) window crowding is computed over.
+
+    Args:
+        start (Optional[datetime]): Window start (default: ``hours`` before ``end``)
+        end (Optional[datetime]): Window end (default: ``hours`` after ``start``, or now)
+        hours (Optional[int]): Window length (default: settings.crowding_window_hours)
+
+    Returns:
+        Tuple[datetime, datetime]: Window start and end
+    """
+    length = timedelta(hours=hours or settings.crowding_window_hours)
+    if end is None:
+        end = start + length if start is not None else datetime.now()
+    if start is None:
+        start = end - length
+    if start >= end:
+        raise ValueError(f"Crowding window start {start} is not before its end {end}")
+    return start, end
+
+def crowding_params(start: datetime, end: datetime,
+                    stations: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Builds the CROWDING_QUERY bind parameters for the [start, end) window."""
+    return {
+        # A service arriving after midnight still belongs to the previous run date
+        "first_run_date": (start - timedelta(days=1)).date(),
+        "last_run_date": end.date(),
+        "start": start,
+        "end": end,
+        "stations": [crs.upper() for crs in stations] if stations else None,
+    }
+
+def crowding_frame(rows: List[Dict[str, Any]], window_hours: float) -> pd.DataFrame:
+    """
+    Derives per-station crowding rates from the aggregated CROWDING_QUERY rows.
+
+    Args:
+        rows (List[Dict[str, Any]]): One row per station from CROWDING_QUERY
+        window_hours (float): Length of the window the rows cover
+
+    Returns:
+        pd.DataFrame: The rows with arrivals_per_hour and delayed_ratio, in CROWDING_COLUMNS order
+    """
+    df_crowding = pd.DataFrame(rows)
+    df_crowding["arrivals_per_hour"] = df_crowding["arrival_count"] / window_hours
+    df_crowding["delayed_ratio"] = df_crowding["delayed_count"] / df_crowding["arrival_count"]
+    return df_crowding[CROWDING_COLUMNS]
+
+def crowding_records(df_crowding: pd.DataFrame) -> List[Dict[str, Any]]:
     """
-    Predicts station crowding based on real-time arrivals and historical delay patterns.
+    Returns the crowding rows as JSON-ready dicts.
+
+    Stations whose trains all lack a delay have NaN averages and maxima,
+    which JSON cannot encode, so missing values become None.
+    """
+    return df_crowding.astype(object).where(df_crowding.notna(), None).to_dict(orient="records")
+
+async def predict_crowding(
+    db_session: AsyncSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    stations: Optional[Sequence[str]] = None,
+    hours: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Predicts station crowding from the passenger arrivals scheduled in a time window.
+
+    The aggregation runs in PostgreSQL, so only one row per station is
+    transferred regardless of how many trains the window holds.
 
     Args:
         db_session (AsyncSession): Async database session to fetch records.
+        start (Optional[datetime]): Window start.
+        end (Optional[datetime]): Window end.
+        stations (Optional[Sequence[str]]): Station CRS codes to include (default: all).
+        hours (Optional[int]): Window length when start or end is omitted.
 
     Returns:
-        pd.DataFrame: DataFrame containing predicted busy stations.
-    """
-    try: 
-        # Instantiate the TrainDelayMap class 
-        data_fetcher = TrainDelayMap()
-
-        # Fetch delay data by calling the instance method
-        delay_data = await data_fetcher.fetch_delay_data(db=db_session)
-
-        if not delay_data:
-            print("error")
-            return pd.DataFrame()
-        
-        # Convert the delay data to df
-        df = pd.DataFrame(delay_data)
-        
-        # Aggregate data to get arrival counts and average delay by station origin
-        df_crowding = df.groupby('origin').agg(
-            arrival_count=('service_id', 'count'),
-            avg_delay=('delay_minutes', 'mean')
-        ).reset_index()
-
-        # Log the predicted overcrowding information
-        logger.info(f"📊 Predicted crowding at busiest stations: {df_crowding.to_dict(orient='records')}")
+        pd.DataFrame: One row per station with arrival counts and delays, busiest first.
+    """
+    start, end = crowding_window(start, end, hours)
+
+    try:
+        result = await db_session.execute(text(CROWDING_QUERY), crowding_params(start, end, stations))
+        rows = [row._asdict() for row in result]
+        if not rows:
+            logger.warning("⚠️ No passenger arrivals between %s and %s.", start, end)
+            return pd.DataFrame(columns=CROWDING_COLUMNS)
+
+        window_hours = (end - start).total_seconds() / 3600
+        df_crowding = crowding_frame(rows, window_hours)
+
+        logger.info("📊 Predicted crowding at %d stations between %s and %s", len(df_crowding), start, end)
         return df_crowding
 
     except Exception as e:
         logger.error(f"❌ Error predicting station crowding: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(columns=CROWDING_COLUMNS)
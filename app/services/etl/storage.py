@@ -0,0 +1,192 @@
+# app/services/etl/storage.py
+import os
+from typing import Any, Dict, List, Optional, Sequence
+import pandas as pd
+# Project modules
+from app.core.logging_config import configure_logging
+from app.core.config import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow installed
+    pa = None
+
+logger = configure_logging()
+
+PARTITION_COLUMNS = ["run_date", "station"]
+
+# Arrow types of the columns shared by every pipeline stage; any other column is inferred
+if pa is not None:
+    ARRIVAL_SCHEMA = pa.schema([
+        ("run_date", pa.date32()),
+        ("station", pa.string()),
+        ("service_id", pa.string()),
+        ("operator", pa.string()),
+        ("is_passenger_train", pa.bool_()),
+        ("scheduled_arrival", pa.timestamp("us")),
+        ("actual_arrival", pa.timestamp("us")),
+        ("is_actual", pa.bool_()),
+        ("origin", pa.string()),
+        ("destination", pa.string()),
+        ("was_scheduled_to_stop", pa.bool_()),
+        ("stop_status", pa.string()),
+        ("delay_minutes", pa.int64()),
+    ])
+    PARTITIONING = ds.partitioning(
+        pa.schema([("run_date", pa.date32()), ("station", pa.string())]), flavor="hive"
+    )
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed so Parquet storage can be used."""
+    return pa is not None
+
+def with_arrival_timestamps(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turns HH:MM arrival strings into timestamps on the run date.
+
+    The actual arrival is derived from the scheduled one plus ``delay_minutes``
+    so services that arrive after midnight land on the following day.
+
+    Args:
+        df (pd.DataFrame): Cleaned arrivals with HH:MM ``scheduled_arrival`` and ``actual_arrival``
+
+    Returns:
+        pd.DataFrame: Copy with datetime64 ``scheduled_arrival`` and ``actual_arrival``
+    """
+    if df.empty or pd.api.types.is_datetime64_any_dtype(df["scheduled_arrival"]):
+        return df
+
+    df = df.copy()
+    run_dates = pd.to_datetime(df["run_date"].astype(str), format="%Y-%m-%d")
+    df["scheduled_arrival"] = run_dates + pd.to_timedelta(df["scheduled_arrival"].astype(str) + ":00")
+    df["actual_arrival"] = df["scheduled_arrival"] + pd.to_timedelta(df["delay_minutes"], unit="min")
+    return df
+
+class IntermediateStore:
+    """
+    Typed storage for the data handed between pipeline stages.
+
+    Each stage (``cleaned_delays``, ``merged_train_station``, ...) is stored
+    as a Parquet dataset under ``base_dir/<stage>``, partitioned by
+    ``run_date`` and ``station``. Re-running a day replaces only that day's
+    partitions. A CSV copy can be exported next to it, and CSV is used
+    instead of Parquet when pyarrow is not installed.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, fmt: Optional[str] = None,
+                 export_csv: Optional[bool] = None):
+        self.base_dir = base_dir or settings.intermediate_dir
+        self.fmt = (fmt or settings.intermediate_format).lower()
+        self.export_csv = settings.intermediate_export_csv if export_csv is None else export_csv
+
+        if self.fmt not in ("parquet", "csv"):
+            raise ValueError(f"Unsupported intermediate format: {self.fmt}")
+        if self.fmt == "parquet" and not parquet_available():
+            logger.warning("⚠️ pyarrow is not installed; storing intermediate data as CSV")
+            self.fmt = "csv"
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def stage_path(self, stage: str) -> str:
+        """Returns the dataset directory (Parquet) or file (CSV) of ``stage``."""
+        if self.fmt == "csv":
+            return os.path.join(self.base_dir, f"{stage}.csv")
+        return os.path.join(self.base_dir, stage)
+
+    def _to_table(self, df: pd.DataFrame) -> "pa.Table":
+        fields = [ARRIVAL_SCHEMA.field(name) if name in ARRIVAL_SCHEMA.names else None for name in df.columns]
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, field in enumerate(fields):
+            if field is not None and table.schema.field(i).type != field.type:
+                table = table.set_column(i, field, table.column(i).cast(field.type))
+        return table
+
+    def write(self, stage: str, df: pd.DataFrame, csv_path: Optional[str] = None,
+              append_csv: bool = False) -> Optional[str]:
+        """
+        Stores the output of a pipeline stage.
+
+        Args:
+            stage (str): Stage name, used as the dataset directory
+            df (pd.DataFrame): Stage output; must contain the partition columns for Parquet
+            csv_path (Optional[str]): Where to export a CSV copy, when exporting is enabled
+            append_csv (bool): Append to the exported CSV instead of replacing it
+
+        Returns:
+            Optional[str]: Path of the stored data, or None if there was nothing to store
+        """
+        if df.empty:
+            return None
+
+        if self.fmt == "parquet":
+            path = self.stage_path(stage)
+            missing = [column for column in PARTITION_COLUMNS if column not in df]
+            if missing:
+                raise ValueError(f"Cannot partition stage '{stage}', missing columns: {missing}")
+            pq.write_to_dataset(
+                self._to_table(df),
+                root_path=path,
+                partitioning=PARTITIONING,
+                existing_data_behavior="delete_matching",
+            )
+            logger.info("💾 Stored %d %s records as Parquet in %s", len(df), stage, path)
+        else:
+            path = self.stage_path(stage)
+            df.to_csv(path, index=False)
+            logger.info("💾 Stored %d %s records as CSV in %s", len(df), stage, path)
+
+        if self.export_csv and csv_path and csv_path != path:
+            os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+            append = append_csv and os.path.exists(csv_path)
+            df.to_csv(csv_path, mode="a" if append else "w", header=not append, index=False)
+            logger.info("📝 Exported %d %s records to %s", len(df), stage, csv_path)
+        return path
+
+    def read(self, stage: str, run_dates: Optional[Sequence[Any]] = None,
+             stations: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Loads a stage, optionally only some of its partitions.
+
+        Args:
+            stage (str): Stage name
+            run_dates (Optional[Sequence[Any]]): Run dates (date or YYYY-MM-DD) to load
+            stations (Optional[Sequence[str]]): Station CRS codes to load
+
+        Returns:
+            pd.DataFrame: Stored records with their original dtypes, empty if the stage does not exist
+        """
+        path = self.stage_path(stage)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        if self.fmt == "csv":
+            df = pd.read_csv(path, parse_dates=["scheduled_arrival", "actual_arrival"])
+            df["run_date"] = pd.to_datetime(df["run_date"]).dt.date
+            if run_dates is not None:
+                df = df[df["run_date"].astype(str).isin([str(d) for d in run_dates])]
+            if stations is not None:
+                df = df[df["station"].isin(stations)]
+            return df.reset_index(drop=True)
+
+        dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+        conditions: List[Any] = []
+        if run_dates is not None:
+            dates = pa.array([pd.Timestamp(str(d)).date() for d in run_dates], type=pa.date32())
+            conditions.append(ds.field("run_date").isin(dates))
+        if stations is not None:
+            conditions.append(ds.field("station").isin(list(stations)))
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        table = dataset.to_table(filter=expression)
+        df = table.to_pandas(timestamp_as_object=False)
+        for column in ("scheduled_arrival", "actual_arrival"):
+            if column in df:
+                df[column] = df[column].astype("datetime64[ns]")
+        return df
+
+    def describe(self) -> Dict[str, Any]:
+        """Returns the storage format and location, for logging."""
+        return {"format": self.fmt, "base_dir": self.base_dir, "export_csv": self.export_csv}
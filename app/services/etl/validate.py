@@ -0,0 +1,168 @@
+# app/services/etl/validate.py
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Type, Union, get_args, get_origin
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+# Project modules
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+# String values pydantic accepts for a bool field in lax mode
+TRUE_STRINGS = frozenset({"1", "on", "t", "true", "y", "yes"})
+FALSE_STRINGS = frozenset({"0", "off", "f", "false", "n", "no"})
+
+@dataclass
+class FieldSpec:
+    """
+    Validation rules for one model field.
+
+    Attributes:
+        name (str): Field name
+        kind (type): Expected value type (str or bool)
+        nullable (bool): Whether None is accepted
+        required (bool): Whether the key must be present
+        default (Any): Value used when the key is missing
+    """
+    name: str
+    kind: type
+    nullable: bool
+    required: bool
+    default: Any = None
+
+@dataclass
+class ValidationResult:
+    """
+    Outcome of validating a batch of records.
+
+    Attributes:
+        frame (pd.DataFrame): One column per model field, defaults applied and bools coerced
+        valid (np.ndarray): Boolean mask of rows that passed validation
+        rejections (pd.DataFrame): Failed rows (indexed by row position) with the
+            first offending ``field`` and the pydantic style error ``reason``
+    """
+    frame: pd.DataFrame
+    valid: np.ndarray
+    rejections: pd.DataFrame
+
+def _field_specs(model: Type[BaseModel]) -> List[FieldSpec]:
+    """Derives field rules from a pydantic model so both validators stay in sync."""
+    specs = []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        nullable = False
+        if get_origin(annotation) is Union:
+            args = [arg for arg in get_args(annotation) if arg is not type(None)]
+            nullable = len(args) < len(get_args(annotation))
+            annotation = args[0]
+        if annotation not in (str, bool):
+            raise TypeError(f"Batch validation does not support field '{name}' of type {annotation}")
+        specs.append(FieldSpec(
+            name=name,
+            kind=annotation,
+            nullable=nullable,
+            required=field.is_required(),
+            default=None if field.is_required() else field.default
+        ))
+    return specs
+
+def _coerce_bool(value: Any) -> Optional[bool]:
+    """Lax bool coercion as done by pydantic; None when the value is not a boolean."""
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in TRUE_STRINGS:
+            return True
+        if lowered in FALSE_STRINGS:
+            return False
+    return None
+
+class BatchValidator:
+    """
+    Column-wise equivalent of constructing a pydantic model per record.
+
+    Each field is checked once over its whole column. Columns that are already
+    homogeneous (all strings, all bools, no nulls) are accepted from their
+    dtype alone, so element-wise checks are only paid for irregular columns.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.fields = _field_specs(model)
+
+    def validate(self, records: Union[List[Dict[str, Any]], pd.DataFrame]) -> ValidationResult:
+        """
+        Validates a batch of records.
+
+        Args:
+            records (Union[List[Dict[str, Any]], pd.DataFrame]): Raw records; a DataFrame
+                must have object columns so None and missing (NaN) stay distinguishable
+
+        Returns:
+            ValidationResult: Coerced frame, valid mask and rejection table
+        """
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records, dtype=object)
+        n_rows = len(df)
+        reasons = np.full(n_rows, None, dtype=object)
+        fields = np.full(n_rows, None, dtype=object)
+        frame = {}
+
+        for spec in self.fields:
+            if spec.name in df:
+                column = df[spec.name]
+            else:
+                column = pd.Series(np.nan, index=df.index, dtype=object)
+
+            # Separate missing keys (NaN) from explicit None
+            null = column.isna().to_numpy()
+            missing = np.zeros(n_rows, dtype=bool)
+            if null.any():
+                missing[null] = column[null].map(lambda value: value is not None).to_numpy(dtype=bool)
+            is_none = null & ~missing
+
+            errors = np.full(n_rows, None, dtype=object)
+            if spec.required:
+                errors[missing] = "missing"
+            if not spec.nullable:
+                errors[is_none] = "string_type" if spec.kind is str else "bool_type"
+
+            present = ~null
+            if spec.kind is str:
+                values = column
+                if pd.api.types.infer_dtype(column[present], skipna=False) not in ("string", "empty"):
+                    wrong_type = present & ~column.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+                    errors[wrong_type] = "string_type"
+            else:
+                if pd.api.types.infer_dtype(column[present], skipna=False) in ("boolean", "empty"):
+                    values = column
+                else:
+                    values = column.map(_coerce_bool)
+                    errors[present & values.isna().to_numpy()] = "bool_parsing"
+
+            if not spec.required:
+                values = values.where(~missing, spec.default)
+            frame[spec.name] = values.where(errors == None, None)  # noqa: E711
+
+            # Keep the first error of each row, in field order like pydantic
+            first = (errors != None) & (reasons == None)  # noqa: E711
+            reasons[first] = errors[first]
+            fields[first] = spec.name
+
+        valid = reasons == None  # noqa: E711
+        rejected = np.flatnonzero(~valid)
+        rejections = pd.DataFrame({"field": fields[rejected], "reason": reasons[rejected]}, index=rejected)
+
+        if len(rejections):
+            counts = rejections["reason"].value_counts()
+            logger.warning("⚠️ %d of %d records failed validation: %s",
+                           len(rejections), n_rows, ", ".join(f"{r}={c}" for r, c in counts.items()))
+
+        return ValidationResult(
+            frame=pd.DataFrame(frame, index=df.index),
+            valid=np.asarray(valid, dtype=bool),
+            rejections=rejections
+        )
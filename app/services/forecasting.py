@@ -0,0 +1,410 @@
+# app/services/forecasting.py
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Optional, Sequence
+import numpy as np
+import pandas as pd
+# Project modules
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.crud.rollup_crud import (
+    HISTOGRAM_COLUMNS, get_revised_stations, get_rollup_frame, get_rollup_version, histogram_labels, Executor
+)
+
+logger = configure_logging()
+
+HOURS_PER_WEEK = 168
+N_BINS = len(HISTOGRAM_COLUMNS)
+_EPOCH_SLOT = 72  # 1970-01-01 was a Thursday; slot 0 is Monday 00:00
+
+def hour_index(values: Any) -> np.ndarray:
+    """Converts timestamps to whole hours since the epoch."""
+    return np.asarray(values, dtype="datetime64[h]").astype(np.int64)
+
+def week_slot(hours: np.ndarray) -> np.ndarray:
+    """Returns the hour-of-week slot (0 = Monday 00:00) of hour indices."""
+    return (np.asarray(hours) + _EPOCH_SLOT) % HOURS_PER_WEEK
+
+def slot_occurrences(first: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """
+    Counts how often each hour-of-week slot occurs between two hours.
+
+    Args:
+        first (np.ndarray): First observed hour per station
+        last (np.ndarray): Last observed hour per station (inclusive)
+
+    Returns:
+        np.ndarray: (stations, 168) occurrence counts
+    """
+    span = np.maximum(last - first + 1, 0)
+    offset = (np.arange(HOURS_PER_WEEK)[None, :] - week_slot(first)[:, None]) % HOURS_PER_WEEK
+    return span[:, None] // HOURS_PER_WEEK + (offset < (span % HOURS_PER_WEEK)[:, None])
+
+def busyness_level(score: float) -> str:
+    """Buckets a busyness score into High, Medium or Low."""
+    return "High" if score > 7 else "Medium" if score > 4 else "Low"
+
+def _window_sum(cumulative: np.ndarray, rows: np.ndarray, start_slot: np.ndarray, hours: int) -> np.ndarray:
+    """Sums slot means over ``hours`` from ``start_slot`` using a cumulative sum over two weeks."""
+    full_weeks, rest = divmod(int(hours), HOURS_PER_WEEK)
+    total = cumulative[rows, start_slot + rest] - cumulative[rows, start_slot]
+    if full_weeks:
+        total = total + full_weeks * cumulative[rows, HOURS_PER_WEEK]
+    return total
+
+def _cumulative(per_slot: np.ndarray) -> np.ndarray:
+    """Prefix sums of per-slot values over two consecutive weeks, so windows can wrap."""
+    doubled = np.concatenate([per_slot, per_slot], axis=1)
+    zeros = np.zeros((per_slot.shape[0], 1) + per_slot.shape[2:], dtype=doubled.dtype)
+    return np.concatenate([zeros, np.cumsum(doubled, axis=1)], axis=1)
+
+class BusynessForecaster:
+    """
+    Hour-of-week seasonal profiles of arrivals and delays per station.
+
+    Profiles are the totals of the hourly rollup (station_hourly_stats) per
+    station and hour-of-week slot, divided by how often the slot was observed.
+    Totals are additive, so new hours are folded in without refitting, and
+    only buckets older than the re-fetch window are used so late actuals are
+    never counted twice. A prediction is a difference of two prefix sums.
+    """
+
+    def __init__(self):
+        self.stations = np.array([], dtype="U6")
+        self.first_hour = np.array([], dtype=np.int64)
+        self.last_hour = np.array([], dtype=np.int64)
+        self.arrivals = np.zeros((0, HOURS_PER_WEEK), dtype=np.int64)
+        self.delay_sum = np.zeros((0, HOURS_PER_WEEK), dtype=np.int64)
+        self.delayed = np.zeros((0, HOURS_PER_WEEK), dtype=np.int64)
+        self.histogram = np.zeros((0, HOURS_PER_WEEK, N_BINS), dtype=np.int64)
+        self.fitted_through: Optional[int] = None  # Exclusive hour index
+        self.rollup_version: Optional[datetime] = None  # Latest rollup write folded in
+        self._build_lookup()
+
+    @property
+    def fitted(self) -> bool:
+        return self.fitted_through is not None
+
+    def _build_lookup(self) -> None:
+        """Precomputes per-slot means and their prefix sums for O(1) predictions."""
+        self._row = {station: i for i, station in enumerate(self.stations.tolist())}
+        occurrences = np.maximum(slot_occurrences(self.first_hour, self.last_hour), 1)
+        self._cum_arrivals = _cumulative(self.arrivals / occurrences)
+        self._cum_delay = _cumulative(self.delay_sum / occurrences)
+        self._cum_delayed = _cumulative(self.delayed / occurrences)
+        self._cum_histogram = _cumulative((self.histogram / occurrences[:, :, None]).astype(np.float32))
+
+    def _accumulate(self, frame: pd.DataFrame) -> None:
+        """Adds rollup buckets to the slot totals, extending the station list as needed."""
+        station_codes, stations = pd.factorize(frame["station_crs"])
+        stations = np.asarray(stations, dtype="U6")
+        hours = hour_index(frame["hour_bucket"].to_numpy())
+
+        merged = np.union1d(self.stations, stations).astype("U6")
+        if len(merged) != len(self.stations):
+            existing = np.searchsorted(merged, self.stations)
+            first = np.full(len(merged), np.iinfo(np.int64).max)
+            last = np.full(len(merged), np.iinfo(np.int64).min)
+            first[existing], last[existing] = self.first_hour, self.last_hour
+            totals = []
+            for current in (self.arrivals, self.delay_sum, self.delayed, self.histogram):
+                grown = np.zeros((len(merged),) + current.shape[1:], dtype=current.dtype)
+                grown[existing] = current
+                totals.append(grown)
+            self.stations, self.first_hour, self.last_hour = merged, first, last
+            self.arrivals, self.delay_sum, self.delayed, self.histogram = totals
+
+        rows = np.searchsorted(self.stations, stations)[station_codes]
+        flat = rows * HOURS_PER_WEEK + week_slot(hours)
+        size = len(self.stations) * HOURS_PER_WEEK
+
+        def bucket_sum(column: str) -> np.ndarray:
+            weights = frame[column].to_numpy(dtype=np.float64)
+            return np.rint(np.bincount(flat, weights=weights, minlength=size)).astype(np.int64).reshape(-1, HOURS_PER_WEEK)
+
+        self.arrivals += bucket_sum("train_count")
+        self.delay_sum += bucket_sum("delay_sum")
+        self.delayed += bucket_sum("delayed_count")
+        for i, column in enumerate(HISTOGRAM_COLUMNS):
+            self.histogram[:, :, i] += bucket_sum(column)
+
+        np.minimum.at(self.first_hour, rows, hours)
+        np.maximum.at(self.last_hour, rows, hours)
+
+    def drop_stations(self, stations: Iterable[str]) -> "BusynessForecaster":
+        """
+        Forgets the profiles of some stations, so their history can be folded in again.
+
+        Args:
+            stations (Iterable[str]): Station CRS codes
+
+        Returns:
+            BusynessForecaster: self
+        """
+        keep = ~np.isin(self.stations, np.asarray(list(stations), dtype="U6"))
+        self.stations, self.first_hour, self.last_hour = self.stations[keep], self.first_hour[keep], self.last_hour[keep]
+        self.arrivals, self.delay_sum = self.arrivals[keep], self.delay_sum[keep]
+        self.delayed, self.histogram = self.delayed[keep], self.histogram[keep]
+        self._build_lookup()
+        return self
+
+    def fit(self, frame: pd.DataFrame, through: datetime) -> "BusynessForecaster":
+        """
+        Fits the profiles from scratch.
+
+        Args:
+            frame (pd.DataFrame): Rollup buckets as returned by get_rollup_frame
+            through (datetime): Buckets before this hour are final and included
+
+        Returns:
+            BusynessForecaster: self
+        """
+        self.__init__()
+        return self.update(frame, through)
+
+    def update(self, frame: pd.DataFrame, through: datetime) -> "BusynessForecaster":
+        """
+        Folds newly final rollup buckets into the profiles.
+
+        Args:
+            frame (pd.DataFrame): Buckets in [fitted_through, through)
+            through (datetime): New exclusive end of the fitted history
+
+        Returns:
+            BusynessForecaster: self
+        """
+        if not frame.empty:
+            self._accumulate(frame)
+        self.fitted_through = int(hour_index(through))
+        self._build_lookup()
+        return self
+
+    def predict_many(self, stations: Iterable[str], start: datetime, hours: int = 1) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Forecasts busyness of many stations for the same window.
+
+        Args:
+            stations (Iterable[str]): Station CRS codes
+            start (datetime): Window start; only its hour-of-week matters
+            hours (int): Window length in hours
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: Forecast per station, None for stations without history
+        """
+        stations = [station.upper() for station in stations]
+        known = [station for station in stations if station in self._row]
+        forecasts: Dict[str, Optional[Dict[str, Any]]] = {station: None for station in stations}
+        if not known or hours < 1:
+            return forecasts
+
+        rows = np.array([self._row[station] for station in known])
+        start_slot = np.full(len(rows), week_slot(hour_index(start)))
+        expected = _window_sum(self._cum_arrivals, rows, start_slot, hours)
+        delay_total = _window_sum(self._cum_delay, rows, start_slot, hours)
+        delayed = _window_sum(self._cum_delayed, rows, start_slot, hours)
+        histogram = _window_sum(self._cum_histogram, rows, start_slot, hours)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average_delay = np.where(expected > 0, delay_total / expected, 0.0)
+            delayed_ratio = np.where(expected > 0, delayed / expected, 0.0)
+            distribution = histogram / np.maximum(histogram.sum(axis=1, keepdims=True), 1e-9)
+        per_hour = expected / hours
+        scores = per_hour * (1 + delayed_ratio) * (1 + average_delay / 60)
+
+        labels = histogram_labels()
+        for i, station in enumerate(known):
+            forecasts[station] = {
+                "station": station,
+                "window_start": start.isoformat(),
+                "prediction_window": f"Next {hours} hour(s)",
+                "expected_trains": round(float(expected[i]), 2),
+                "trains_per_hour": round(float(per_hour[i]), 2),
+                "average_delay": round(float(average_delay[i]), 2),
+                "delayed_ratio": round(float(delayed_ratio[i]), 3),
+                "delay_distribution": {label: round(float(p), 3) for label, p in zip(labels, distribution[i])},
+                "busyness_score": round(float(scores[i]), 2),
+                "busyness_level": busyness_level(float(scores[i])),
+            }
+        return forecasts
+
+    def predict(self, station: str, start: datetime, hours: int = 1) -> Optional[Dict[str, Any]]:
+        """Forecasts busyness of one station; None if it has no history."""
+        return self.predict_many([station], start, hours)[station.upper()]
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Writes the slot totals to a compressed .npz file, atomically.
+
+        Args:
+            path (Optional[str]): Destination (default: settings.forecast_model_path)
+
+        Returns:
+            str: Path written
+        """
+        path = path or settings.forecast_model_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            stations=self.stations,
+            first_hour=self.first_hour,
+            last_hour=self.last_hour,
+            arrivals=self.arrivals.astype(np.int32),
+            delay_sum=self.delay_sum,
+            delayed=self.delayed.astype(np.int32),
+            histogram=self.histogram.astype(np.int32),
+            fitted_through=np.int64(-1 if self.fitted_through is None else self.fitted_through),
+            rollup_version=np.datetime64(self.rollup_version or "NaT", "us"),
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "BusynessForecaster":
+        """
+        Loads profiles saved with ``save``; an unfitted forecaster if the file does not exist.
+
+        Args:
+            path (Optional[str]): Model file (default: settings.forecast_model_path)
+        """
+        forecaster = cls()
+        path = path or settings.forecast_model_path
+        if not os.path.exists(path):
+            return forecaster
+
+        with np.load(path) as arrays:
+            forecaster.stations = arrays["stations"].astype("U6")
+            forecaster.first_hour = arrays["first_hour"]
+            forecaster.last_hour = arrays["last_hour"]
+            forecaster.arrivals = arrays["arrivals"].astype(np.int64)
+            forecaster.delay_sum = arrays["delay_sum"]
+            forecaster.delayed = arrays["delayed"].astype(np.int64)
+            forecaster.histogram = arrays["histogram"].astype(np.int64)
+            fitted_through = int(arrays["fitted_through"])
+            # Files written before versions were tracked load without one, which forces a refit
+            version = arrays["rollup_version"][()] if "rollup_version" in arrays.files else np.datetime64("NaT")
+        forecaster.rollup_version = None if np.isnat(version) else pd.Timestamp(version).to_pydatetime()
+        forecaster.fitted_through = None if fitted_through < 0 else fitted_through
+        forecaster._build_lookup()
+        return forecaster
+
+def final_history_end(today: Optional[date] = None) -> datetime:
+    """
+    Returns the start of the re-fetch window; rollup buckets before it no longer change.
+
+    Args:
+        today (Optional[date]): Reference date (default: today)
+    """
+    cutoff = (today or date.today()) - timedelta(days=max(settings.extract_refetch_days - 1, 0))
+    return datetime.combine(cutoff, time())
+
+async def refresh_forecast_model(executor: Executor, path: Optional[str] = None,
+                                 full: bool = False, today: Optional[date] = None) -> BusynessForecaster:
+    """
+    Brings the saved profiles up to date with the rollup.
+
+    Only buckets that became final since the last run are read, unless there
+    is no saved model yet or ``full`` is set. Stations whose older buckets
+    were rewritten since the last run (backfills, newly added stations) are
+    refitted from their whole history, as those buckets lie behind the
+    watermark.
+
+    Args:
+        executor (Executor): Connection or session to use
+        path (Optional[str]): Model file (default: settings.forecast_model_path)
+        full (bool): Refit from the whole history
+        today (Optional[date]): Reference date (default: today)
+
+    Returns:
+        BusynessForecaster: The updated forecaster
+    """
+    path = path or settings.forecast_model_path
+    through = final_history_end(today)
+    version = await get_rollup_version(executor)
+    forecaster = BusynessForecaster() if full else BusynessForecaster.load(path)
+
+    if forecaster.fitted and forecaster.rollup_version is not None:
+        start = pd.Timestamp(np.datetime64(forecaster.fitted_through, "h")).to_pydatetime()
+        revised = await get_revised_stations(executor, min(start, through), forecaster.rollup_version)
+        if start >= through and not revised:
+            logger.info("📈 Forecast profiles already fitted through %s", through)
+            return forecaster
+
+        frames = []
+        if revised:
+            forecaster.drop_stations(revised)
+            frames.append(await get_rollup_frame(executor, None, min(start, through), revised))
+        if start < through:
+            frames.append(await get_rollup_frame(executor, start, through))
+        frames = [part for part in frames if not part.empty]
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        forecaster.update(frame, max(start, through))
+        action = f"Updated ({len(revised)} stations refitted)"
+    else:
+        frame = await get_rollup_frame(executor, None, through)
+        forecaster.fit(frame, through)
+        action = "Fitted"
+
+    forecaster.rollup_version = version
+    forecaster.save(path)
+    logger.info("📈 %s forecast profiles for %d stations with %d hourly buckets (history through %s)",
+                action, len(forecaster.stations), len(frame), through)
+    return forecaster
+
+_cached: Dict[str, Any] = {"path": None, "mtime": None, "forecaster": None}
+
+def get_forecaster(path: Optional[str] = None) -> BusynessForecaster:
+    """
+    Returns the saved forecaster, reloading it only when the pipeline rewrote the file.
+
+    Args:
+        path (Optional[str]): Model file (default: settings.forecast_model_path)
+    """
+    path = path or settings.forecast_model_path
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    if _cached["forecaster"] is None or _cached["path"] != path or _cached["mtime"] != mtime:
+        _cached.update(path=path, mtime=mtime, forecaster=BusynessForecaster.load(path))
+    return _cached["forecaster"]
+
+def forecast_stations(stations: Sequence[str], start: Optional[datetime] = None,
+                      hours: int = 1) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Forecasts busyness of stations with the saved profiles, from now by default."""
+    return get_forecaster().predict_many(stations, start or datetime.now(), hours)
+
+COMPACT_FIELDS = ("expected_trains", "average_delay", "delayed_ratio", "busyness_score", "busyness_level")
+
+def forecast_batch(stations: Sequence[str], windows: Sequence[int],
+                   start: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Forecasts many stations for several look-ahead windows in one pass.
+
+    Each window is one vectorised lookup over all stations, so the cost does
+    not grow with extra round trips.
+
+    Args:
+        stations (Sequence[str]): Station CRS codes
+        windows (Sequence[int]): Look-ahead windows in hours
+        start (Optional[datetime]): Window start (default: now)
+
+    Returns:
+        Dict[str, Any]: ``window_start``, ``stations`` keyed by CRS then window
+            (compact forecast fields only) and the ``unknown`` stations without history
+    """
+    start = start or datetime.now()
+    codes = list(dict.fromkeys(station.upper() for station in stations))
+    forecaster = get_forecaster()
+    keyed: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    unknown = set()
+
+    for hours in dict.fromkeys(windows):
+        for station, forecast in forecaster.predict_many(codes, start, hours).items():
+            if forecast is None:
+                unknown.add(station)
+                continue
+            keyed.setdefault(station, {})[str(hours)] = {field: forecast[field] for field in COMPACT_FIELDS}
+
+    return {
+        "window_start": start.isoformat(),
+        "stations": keyed,
+        "unknown": [station for station in codes if station in unknown],
+    }
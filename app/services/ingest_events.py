@@ -0,0 +1,47 @@
+# app/services/ingest_events.py
+from datetime import date
+from typing import Callable, Iterable, List
+# Project modules
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+IngestHandler = Callable[[List[date]], None]
+
+_handlers: List[IngestHandler] = []
+
+def on_ingest(handler: IngestHandler) -> IngestHandler:
+    """
+    Registers a handler called with the run dates of every committed upload.
+
+    Used by caches of derived output (tiles, maps) to drop what the new
+    arrivals made stale. Registering the same handler twice has no effect.
+
+    Args:
+        handler (IngestHandler): Callable taking the sorted run dates that changed
+
+    Returns:
+        IngestHandler: The handler, so this can be used as a decorator
+    """
+    if handler not in _handlers:
+        _handlers.append(handler)
+    return handler
+
+def notify_ingest(run_dates: Iterable[date]) -> None:
+    """
+    Tells every registered handler which run dates were just written.
+
+    A failing handler is logged and does not stop the others; the data is
+    already committed at this point.
+
+    Args:
+        run_dates (Iterable[date]): Run dates of the uploaded arrivals
+    """
+    dates = sorted(set(run_dates))
+    if not dates:
+        return
+    for handler in list(_handlers):
+        try:
+            handler(dates)
+        except Exception as e:
+            logger.error("❌ Ingest handler %s failed: %s", getattr(handler, "__name__", handler), e)
@@ -0,0 +1,164 @@
+# app/services/map_cache.py
+import glob
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Optional
+# Project modules
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+STAMP_FILE = "generation"
+
+@dataclass(frozen=True)
+class CachedMap:
+    """
+    A rendered map page.
+
+    Attributes:
+        html (str): Page content
+        etag (str): Quoted strong ETag of the content
+    """
+    html: str
+    etag: str
+
+    @classmethod
+    def of(cls, html: str) -> "CachedMap":
+        return cls(html=html, etag=f'"{hashlib.sha1(html.encode("utf-8")).hexdigest()}"')
+
+class MapCache:
+    """
+    LRU cache of rendered map HTML, optionally backed by disk.
+
+    Uploads run in the pipeline process, so invalidation is signalled through
+    a stamp file: ``invalidate`` touches it, and every process drops its
+    in-memory entries once it sees the stamp change. Disk entries carry the
+    stamp in their name, so a page rendered from pre-ingest data is never
+    picked up afterwards.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, cache_dir: Optional[str] = None,
+                 disk: Optional[bool] = None):
+        self.max_entries = settings.map_cache_entries if max_entries is None else max_entries
+        self.cache_dir = cache_dir or settings.map_cache_dir
+        self.disk = settings.map_cache_disk if disk is None else disk
+        self._entries: "OrderedDict[str, CachedMap]" = OrderedDict()
+        self._generation: Optional[int] = None
+
+    @staticmethod
+    def key(hours: int, station: Optional[str], render_mode: str) -> str:
+        """Builds the cache key of a map request."""
+        return f"h{hours}_{(station or 'all').upper()}_{render_mode}"
+
+    def _stamp_path(self) -> str:
+        return os.path.join(self.cache_dir, STAMP_FILE)
+
+    def _current_generation(self) -> int:
+        try:
+            return os.stat(self._stamp_path()).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _disk_path(self, key: str, generation: int) -> str:
+        return os.path.join(self.cache_dir, f"{key}-{generation}.html")
+
+    def _sync_generation(self) -> int:
+        """Drops in-memory entries if another process invalidated the cache."""
+        generation = self._current_generation()
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+        return generation
+
+    def generation(self) -> int:
+        """Returns the current cache generation; pass it to ``put`` for pages rendered afterwards."""
+        return self._sync_generation()
+
+    def get(self, key: str) -> Optional[CachedMap]:
+        """
+        Returns a cached page, or None on a miss.
+
+        Args:
+            key (str): Cache key from ``key``
+        """
+        if self.max_entries <= 0:
+            return None
+        generation = self._sync_generation()
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            return cached
+
+        if self.disk:
+            try:
+                with open(self._disk_path(key, generation), "r", encoding="utf-8") as f:
+                    return self._remember(key, CachedMap.of(f.read()))
+            except FileNotFoundError:
+                pass
+        return None
+
+    def put(self, key: str, html: str, generation: Optional[int] = None) -> CachedMap:
+        """
+        Stores a rendered page.
+
+        Args:
+            key (str): Cache key from ``key``
+            html (str): Page content
+            generation (Optional[int]): Generation read before the data was fetched; the page
+                is not stored if an ingest happened since, as it may predate it
+
+        Returns:
+            CachedMap: The page with its ETag
+        """
+        cached = CachedMap.of(html)
+        if self.max_entries <= 0:
+            return cached
+        current = self._sync_generation()
+        if generation is not None and generation != current:
+            return cached
+        generation = current
+        if self.disk:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key, generation)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        return self._remember(key, cached)
+
+    def _remember(self, key: str, cached: CachedMap) -> CachedMap:
+        self._entries[key] = cached
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self, run_dates: Optional[Iterable[date]] = None) -> None:
+        """
+        Drops every cached page, in this and all other processes.
+
+        Maps span run dates, so any ingest invalidates all of them; the
+        argument makes this usable as an ingest handler.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        previous = self._current_generation()
+        with open(self._stamp_path(), "a"):
+            pass
+        # Always move the stamp forward, even when two ingests share a clock tick
+        generation = max(time.time_ns(), previous + 1)
+        os.utime(self._stamp_path(), ns=(generation, generation))
+        for path in glob.glob(os.path.join(self.cache_dir, "*.html")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._entries.clear()
+        self._generation = generation
+        logger.info("🧹 Invalidated cached maps")
+
+map_cache = MapCache()
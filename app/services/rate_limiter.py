@@ -0,0 +1,68 @@
+# app/services/rate_limiter.py
+import asyncio
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+class TokenBucket:
+    """
+    Asynchronous token bucket.
+
+    Tokens are refilled continuously at ``rate`` per second up to ``capacity``.
+    ``acquire()`` waits until a token is available, so callers are smoothed to
+    the configured rate while still allowing short bursts.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Waits until ``tokens`` tokens are available and consumes them.
+
+        Args:
+            tokens: Number of tokens to consume
+        """
+        # The lock keeps waiters in FIFO order so no caller is starved
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per remote host."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """Returns the bucket for the host of ``url``, creating it if needed."""
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.capacity)
+        return self._buckets[host]
+
+    async def acquire(self, url: str) -> None:
+        """
+        Waits for a request slot on the host of ``url``.
+
+        Args:
+            url: Request URL
+        """
+        await self.bucket_for(url).acquire()
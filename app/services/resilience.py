@@ -0,0 +1,151 @@
+# app/services/resilience.py
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+# HTTP statuses worth retrying: throttling and transient upstream failures
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    Attributes:
+        max_attempts (int): Total attempts, including the first request
+        base_delay (float): Backoff ceiling for the first retry, in seconds
+        max_delay (float): Upper bound for any single wait, including Retry-After
+    """
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {self.max_attempts}")
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns the wait before retry number ``attempt`` (0-based).
+
+        Args:
+            attempt: Number of the failed attempt
+
+        Returns:
+            Seconds to wait, drawn uniformly from [0, base_delay * 2**attempt]
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def delay_for(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Honours a server supplied Retry-After, otherwise backs off."""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        return self.backoff(attempt)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header given as seconds or as an HTTP date.
+
+    Args:
+        value: Raw header value
+
+    Returns:
+        Seconds to wait, or None if the header is absent or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests are refused for ``reset_timeout`` seconds. A single trial request
+    is then let through (half-open); success closes the circuit, failure opens
+    it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def before_request(self) -> None:
+        """
+        Checks whether a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial already in flight
+        """
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+            logger.info("🔌 Circuit '%s' half-open, sending a trial request", self.name)
+
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                raise CircuitOpenError(self.name, 0.0)
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        """Records a successful call and closes the circuit."""
+        if self.state != self.CLOSED:
+            logger.info("✅ Circuit '%s' closed, upstream has recovered", self.name)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Records a failed call and opens the circuit once the threshold is reached."""
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.error(
+                    "🚨 Circuit '%s' opened after %d consecutive failures; pausing requests for %.0fs",
+                    self.name, self.consecutive_failures, self.reset_timeout
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
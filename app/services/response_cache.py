@@ -0,0 +1,151 @@
+# app/services/response_cache.py
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of RTT API responses.
+
+    Entries are stored as ``<sha256(url)>.json`` (sharded by the first two hex
+    characters) together with the service date and fetch time. An entry
+    fetched once its service date had left the ``refetch_days`` window can no
+    longer change and never expires; anything fetched earlier, while late
+    actual arrivals may still be added, is only served for ``today_ttl``
+    seconds. When the cache grows beyond ``max_bytes`` the least recently used
+    entries are removed.
+    """
+
+    def __init__(self, cache_dir: str, today_ttl: int = 300, max_bytes: int = 500 * 1024 ** 2,
+                 refetch_days: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.today_ttl = today_ttl
+        self.max_bytes = max_bytes
+        self.refetch_days = settings.extract_refetch_days if refetch_days is None else refetch_days
+        self._size_bytes: Optional[int] = None  # Computed lazily on first write
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Returns the content address for ``url``."""
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, url: str) -> str:
+        key = self.key(url)
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        final_after = fetched_at.date() - timedelta(days=self.refetch_days)
+        if date.fromisoformat(entry["date"]) < final_after:
+            return True  # Fetched after the day left the re-fetch window: immutable
+        return (datetime.now() - fetched_at).total_seconds() <= self.today_ttl
+
+    def get(self, url: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached response for ``url``.
+
+        Args:
+            url: Request URL (as built by RTTClient._build_url)
+            allow_stale: Serve expired entries too (offline replay)
+
+        Returns:
+            Cached JSON response, or None on a miss or expired entry
+        """
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Ignoring unreadable cache entry %s: %s", path, str(e))
+            return None
+
+        if not allow_stale and not self._is_fresh(entry):
+            return None
+
+        # Touch the entry so eviction removes the least recently used first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["payload"]
+
+    def put(self, url: str, date: str, payload: Dict[str, Any]) -> None:
+        """
+        Stores a response for ``url``.
+
+        Args:
+            url: Request URL
+            date: Service date (YYYY-MM-DD) the response describes
+            payload: Decoded JSON response
+        """
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "url": url,
+            "date": date,
+            "fetched_at": datetime.now().isoformat(),
+            "payload": payload,
+        }
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        if self._size_bytes is None:
+            self._size_bytes = self._scan_size()
+        else:
+            self._size_bytes += os.path.getsize(path) - previous_size
+
+        if self._size_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """
+        Removes least recently used entries until the cache fits in ``max_bytes``.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._size_bytes = total
+        if removed:
+            logger.info("🧹 Evicted %d cached responses (%.1f MB kept)", removed, total / 1024 ** 2)
+        return removed
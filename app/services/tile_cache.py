@@ -0,0 +1,175 @@
+# app/services/tile_cache.py
+import os
+import shutil
+import time
+from datetime import date
+from typing import Iterable, Optional
+# Project modules
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+
+logger = configure_logging()
+
+class TileCache:
+    """
+    On-disk cache of rendered vector tiles.
+
+    Tiles are stored as ``<base_dir>/<run_date>/<z>/<x>/<y>.mvt``, so an
+    ingest only has to remove the directories of the run dates it touched.
+    Empty tiles are not stored: they are cheap to render and would let any
+    client fill the disk with tiles of empty areas. When the cache grows
+    beyond ``max_bytes`` the least recently used tiles are removed.
+
+    Each run date also has a stamp file, ``<base_dir>/<run_date>.generation``,
+    moved forward by every invalidation. A tile rendered before an ingest and
+    stored after it would otherwise stay stale until the next ingest, so
+    ``put`` skips tiles whose generation changed while they were rendered.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.base_dir = base_dir or settings.tile_cache_dir
+        self.max_bytes = settings.tile_cache_max_bytes if max_bytes is None else max_bytes
+        self._size_bytes: Optional[int] = None  # Computed lazily on first write
+
+    def path(self, run_date: date, z: int, x: int, y: int) -> str:
+        """Returns the cache file of a tile."""
+        return os.path.join(self.base_dir, run_date.isoformat(), str(z), str(x), f"{y}.mvt")
+
+    def _stamp_path(self, run_date: date) -> str:
+        return os.path.join(self.base_dir, f"{run_date.isoformat()}.generation")
+
+    def generation(self, run_date: date) -> int:
+        """Returns the current generation of a run date; read it before rendering a tile."""
+        try:
+            return os.stat(self._stamp_path(run_date)).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def get(self, run_date: date, z: int, x: int, y: int) -> Optional[bytes]:
+        """Returns a cached tile, or None if it has not been rendered since the last ingest."""
+        path = self.path(run_date, z, x, y)
+        try:
+            with open(path, "rb") as f:
+                tile = f.read()
+        except FileNotFoundError:
+            return None
+
+        # Touch the tile so eviction removes the least recently used first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return tile
+
+    def put(self, run_date: date, z: int, x: int, y: int, tile: bytes,
+            generation: Optional[int] = None) -> bool:
+        """
+        Stores a rendered tile; written to a temporary file first so readers never see half a tile.
+
+        Args:
+            run_date (date): Run date of the tile
+            z (int): Zoom level
+            x (int): Tile column
+            y (int): Tile row
+            tile (bytes): Encoded tile
+            generation (Optional[int]): Generation read before the tile was rendered; the tile
+                is not stored if the run date was invalidated since
+
+        Returns:
+            bool: Whether the tile was stored
+        """
+        if not tile:
+            return False
+        if generation is not None and generation != self.generation(run_date):
+            return False
+        path = self.path(run_date, z, x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(tile)
+        os.replace(tmp_path, path)
+
+        if self._size_bytes is None:
+            self._size_bytes = self._scan_size()
+        else:
+            self._size_bytes += len(tile) - previous_size
+        if self._size_bytes > self.max_bytes:
+            self.evict()
+        return True
+
+    def _entries(self):
+        for root, _, files in os.walk(self.base_dir):
+            for name in files:
+                if name.endswith(".mvt"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """
+        Removes least recently used tiles until the cache fits in ``max_bytes``.
+
+        Returns:
+            int: Number of tiles removed
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._size_bytes = total
+        if removed:
+            logger.info("🧹 Evicted %d cached tiles (%.1f MB kept)", removed, total / 1024 ** 2)
+        return removed
+
+    def invalidate_run_dates(self, run_dates: Iterable[date]) -> None:
+        """Drops every cached tile of the given run dates."""
+        for run_date in run_dates:
+            self._bump_generation(run_date)
+            directory = os.path.join(self.base_dir, run_date.isoformat())
+            if os.path.isdir(directory):
+                shutil.rmtree(directory, ignore_errors=True)
+                self._size_bytes = None  # Rescanned on the next write
+                logger.info("🧹 Dropped cached tiles of %s", run_date)
+
+    def _bump_generation(self, run_date: date) -> None:
+        os.makedirs(self.base_dir, exist_ok=True)
+        stamp = self._stamp_path(run_date)
+        previous = self.generation(run_date)
+        with open(stamp, "a"):
+            pass
+        # Always move the stamp forward, even when two ingests share a clock tick
+        generation = max(time.time_ns(), previous + 1)
+        os.utime(stamp, ns=(generation, generation))
+
+def cache_max_age(run_date: date, today: Optional[date] = None) -> int:
+    """
+    Returns how long clients may cache a tile of ``run_date``.
+
+    Run dates inside the re-fetch window still receive late actuals, so
+    their tiles are only cached briefly.
+
+    Args:
+        run_date (date): Run date of the tile
+        today (Optional[date]): Reference date (default: today)
+    """
+    age_days = ((today or date.today()) - run_date).days
+    if age_days < settings.extract_refetch_days:
+        return settings.tile_recent_max_age
+    return settings.tile_max_age
+
+tile_cache = TileCache()
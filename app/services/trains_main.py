@@ -1,29 +1,187 @@
 # app/services/trains_main.py
+import asyncio
 import aiohttp
 from datetime import datetime
 from typing import Dict, Any, Optional
 from aiohttp import ClientSession, BasicAuth
 from app.core.config import settings
 from app.core.logging_config import configure_logging
+from app.services.rate_limiter import HostRateLimiter
+from app.services.response_cache import ResponseCache
+from app.services.resilience import (
+    RETRYABLE_STATUSES,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    parse_retry_after,
+)
 print("") 
 
 logger = configure_logging()
 
+# Returned when the station had no arrivals that day: an answer, not a fetch failure
+NO_ARRIVALS_ERROR = "No valid arrivals found"
+
 class RTTClient:
-    """Client for Real Time Trains API."""
+    """
+    Client for Real Time Trains API.
+
+    The client owns a single long-lived ``ClientSession`` so that connections
+    (and their TLS handshakes) are reused across station/day requests. Call
+    ``open()``/``close()`` around its lifetime or use it as an async context
+    manager; the session is also created lazily on first use.
+
+    Transient failures (timeouts, connection errors and retryable statuses)
+    are retried with jittered exponential backoff, honouring ``Retry-After``.
+    A circuit breaker stops requests while the API is down.
 
-    def __init__(self):
-        self.base_url = settings.base_url 
+    Responses are cached on disk keyed by request URL (see ResponseCache);
+    with ``offline`` set the client only replays cached responses.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        response_cache: Optional[ResponseCache] = None,
+        offline: Optional[bool] = None
+    ):
+        self.base_url = base_url or settings.base_url 
         self.auth = BasicAuth(settings.RTT_USERNAME, settings.RTT_PASSWORD)
-        self.timeout=30
+        self.timeout = aiohttp.ClientTimeout(total=settings.rtt_request_timeout)
+        self._session: Optional[ClientSession] = None
+        # Shared by every caller so the API quota holds across concurrent extractions
+        self.rate_limiter = HostRateLimiter(settings.rtt_rate_limit, settings.rtt_rate_burst)
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=settings.rtt_retry_attempts,
+            base_delay=settings.rtt_retry_base_delay,
+            max_delay=settings.rtt_retry_max_delay,
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            "rtt_api",
+            failure_threshold=settings.rtt_circuit_failure_threshold,
+            reset_timeout=settings.rtt_circuit_reset_timeout,
+        )
+        if response_cache is None and settings.rtt_cache_enabled:
+            response_cache = ResponseCache(
+                settings.rtt_cache_dir,
+                today_ttl=settings.rtt_cache_today_ttl,
+                max_bytes=settings.rtt_cache_max_bytes,
+                refetch_days=settings.extract_refetch_days,
+            )
+        self.response_cache = response_cache
+        self.offline = settings.rtt_offline_replay if offline is None else offline
+
+    async def __aenter__(self) -> "RTTClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _create_connector(self) -> aiohttp.TCPConnector:
+        """Creates a bounded, keep-alive connector with DNS caching."""
+        return aiohttp.TCPConnector(
+            limit=settings.rtt_connection_limit,
+            limit_per_host=settings.rtt_connection_limit_per_host,
+            keepalive_timeout=settings.rtt_keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=settings.rtt_dns_cache_ttl,
+        )
+
+    async def open(self) -> ClientSession:
+        """
+        Opens the shared HTTP session if it is not already open.
+
+        Returns:
+            The shared ClientSession
+        """
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=self._create_connector(),
+                auth=self.auth,
+                timeout=self.timeout,
+            )
+            logger.info("✅ RTT client session opened")
+        return self._session
+
+    async def close(self) -> None:
+        """Closes the shared HTTP session and releases pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("✅ RTT client session closed")
+        self._session = None
+
+    async def _request_json(self, url: str) -> Dict[str, Any]:
+        """
+        GETs ``url`` and decodes the JSON body, retrying transient failures.
+
+        Args:
+            url: Request URL
+
+        Returns:
+            Decoded JSON response
+
+        Raises:
+            CircuitOpenError: If the circuit breaker refuses the request
+            aiohttp.ClientError: If the request fails permanently or retries are exhausted
+            asyncio.TimeoutError: If the final attempt times out
+        """
+        session = await self.open()
+        policy = self.retry_policy
+
+        for attempt in range(policy.max_attempts):
+            self.circuit_breaker.before_request()
+            await self.rate_limiter.acquire(url)
+            retry_after = None
+            try:
+                async with session.get(url) as response:
+                    if response.status not in RETRYABLE_STATUSES:
+                        response.raise_for_status()
+                        data = await response.json()
+                        self.circuit_breaker.record_success()
+                        return data
+
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    error: Exception = aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=response.reason or "",
+                        headers=response.headers,
+                    )
+                # Throttling means the API is up; only server errors count against the circuit
+                if response.status == 429:
+                    self.circuit_breaker.record_success()
+                else:
+                    self.circuit_breaker.record_failure()
+
+            except aiohttp.ClientResponseError:
+                # Non-retryable status (e.g. 404): the API answered, so the circuit stays closed
+                self.circuit_breaker.record_success()
+                raise
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                self.circuit_breaker.record_failure()
+                error = e
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+
+            if attempt == policy.max_attempts - 1:
+                raise error
+            delay = policy.delay_for(attempt, retry_after)
+            logger.warning("🔁 RTT request failed (%s), retry %d/%d in %.1fs: %s",
+                           error, attempt + 1, policy.max_attempts - 1, delay, url)
+            await asyncio.sleep(delay)
 
     async def _fetch_data(self, url: str) -> Dict[str, Any]:
-        # Fetch data asynchronously using aiohttp.
+        # Fetch data asynchronously using the shared session.
         try:
-            async with ClientSession() as session:
-                async with session.get(url=url, auth=self.auth, timeout=self.timeout) as response:
-                    response.raise_for_status()  # Raise an exception for bad responses
-                    return await response.json()
+            return await self._request_json(url)
+        except CircuitOpenError as e:
+            logger.error("🚨 RTT API unavailable: %s", str(e))
+            return {"error": f"RTT API unavailable: {str(e)}"}
         except aiohttp.ClientError as e:
             logger.error("❌ API Request Failed: %s", str(e))
             return {"error": f"Failed to fetch train data: {str(e)}"}
@@ -87,6 +245,7 @@ class RTTClient:
         
         return {
             "run_date": service.get("runDate"),
+            "station": station,
             "service_id": service.get("serviceUid"),
             "operator": service.get("atocName"),
             "is_passenger_train": service.get("isPassenger", False),
@@ -118,32 +277,44 @@ class RTTClient:
         
         url = self._build_url(station, date)         
         try:
-            async with ClientSession() as session:
-                async with session.get(url, auth=self.auth, timeout=self.timeout) as response:
-                    response.raise_for_status()
-                    response_json = await response.json()
-
-                    # Validate response structure
-                    services = response_json.get("services", [])
-                    if not isinstance(services, list):
-                        logger.error("❌ Invalid 'services' format in API response")
-                        return {"error": "Invalid response format from RTT API"}
-                    
-                    # Parse services
-                    arrivals = []
-                    for service in services:
-                        parsed_service = self._parse_service(service, station)
-                        if parsed_service:
-                            arrivals.append(parsed_service)
-                    
-                    if arrivals:
-                        logger.info("✅ Retrieved %d arrivals for %s on %s", 
-                                len(arrivals), station, date)
-                        return {"services": arrivals}
-                    else:
-                        logger.warning("⚠️ No valid arrivals found for %s on %s", 
-                                    station, date)
-                        return {"error": "No valid arrivals found"}
+            response_json = None
+            if self.response_cache:
+                response_json = self.response_cache.get(url, allow_stale=self.offline)
+
+            if response_json is None:
+                if self.offline:
+                    logger.warning("⚠️ Offline replay: no cached response for %s on %s", station, date)
+                    return {"error": "No cached response available (offline replay)"}
+
+                response_json = await self._request_json(url)
+                if self.response_cache:
+                    self.response_cache.put(url, date, response_json)
+
+            # Validate response structure
+            services = response_json.get("services", [])
+            if not isinstance(services, list):
+                logger.error("❌ Invalid 'services' format in API response")
+                return {"error": "Invalid response format from RTT API"}
+            
+            # Parse services
+            arrivals = []
+            for service in services:
+                parsed_service = self._parse_service(service, station)
+                if parsed_service:
+                    arrivals.append(parsed_service)
+            
+            if arrivals:
+                logger.info("✅ Retrieved %d arrivals for %s on %s", 
+                        len(arrivals), station, date)
+                return {"services": arrivals}
+            else:
+                logger.warning("⚠️ No valid arrivals found for %s on %s", 
+                            station, date)
+                return {"error": NO_ARRIVALS_ERROR}
+
+        except CircuitOpenError as e:
+            logger.error("🚨 RTT API unavailable, skipping %s on %s: %s", station, date, str(e))
+            return {"error": f"RTT API unavailable: {str(e)}"}
                     
         except aiohttp.ClientError as e:
             logger.error("❌ API Request Failed: %s", str(e))
@@ -151,7 +322,7 @@ class RTTClient:
         
         except Exception as e:
             logger.error("❌ Error fetching data: %s", str(e))
-            return {"error": "st(e)"}
+            return {"error": str(e)}
         
         
 
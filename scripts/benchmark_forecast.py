@@ -0,0 +1,103 @@
+# scripts/benchmark_forecast.py
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# Project modules
+from app.core.logging_config import configure_logging
+from app.crud.rollup_crud import HISTOGRAM_COLUMNS
+from app.services.forecasting import HOURS_PER_WEEK, BusynessForecaster
+
+logger = configure_logging()
+
+
+def synthetic_rollup(stations: int, weeks: int, start: datetime, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds rollup buckets for every station and hour with a daily rush-hour shape.
+
+    Args:
+        stations (int): Number of stations.
+        weeks (int): Weeks of hourly history per station.
+        start (datetime): First hour bucket.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Frame shaped like get_rollup_frame output.
+    """
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range(start, periods=weeks * HOURS_PER_WEEK, freq="h")
+    codes = np.array([f"S{i:04d}" for i in range(stations)])
+    hour_of_day = np.tile(hours.hour.to_numpy(), stations)
+    rate = 2 + 8 * np.isin(hour_of_day, (7, 8, 17, 18))
+    trains = rng.poisson(rate)
+    frame = pd.DataFrame({
+        "station_crs": np.repeat(codes, len(hours)),
+        "hour_bucket": np.tile(hours.to_numpy(), stations),
+        "train_count": trains,
+        "delay_sum": rng.poisson(trains * 3),
+        "delayed_count": rng.binomial(trains, 0.1),
+    })
+    bins = rng.multinomial(1, [1 / len(HISTOGRAM_COLUMNS)] * len(HISTOGRAM_COLUMNS), size=len(frame))
+    for i, column in enumerate(HISTOGRAM_COLUMNS):
+        frame[column] = bins[:, i] * trains
+    return frame
+
+
+def timed(label: str, func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    logger.info("⏱️ %-28s %8.3fs", label, time.perf_counter() - started)
+    return result
+
+
+def run_benchmark(stations: int, weeks: int, lookups: int) -> None:
+    """
+    Times fitting, an incremental day, persistence and lookups of the busyness forecaster.
+
+    Args:
+        stations (int): Number of stations.
+        weeks (int): Weeks of history to fit.
+        lookups (int): Number of single-station predictions to time.
+    """
+    start = datetime(2025, 1, 6)
+    through = start + timedelta(weeks=weeks)
+    history = timed("build synthetic rollup", synthetic_rollup, stations, weeks, start)
+    logger.info("📊 %d stations x %d weeks = %d hourly buckets", stations, weeks, len(history))
+
+    forecaster = timed("fit", BusynessForecaster().fit, history, through)
+
+    day = synthetic_rollup(stations, 1, through, seed=1)
+    day = day[day["hour_bucket"] < through + timedelta(days=1)]
+    timed("incremental update (1 day)", forecaster.update, day, through + timedelta(days=1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = timed("save", forecaster.save, os.path.join(tmp, "profiles.npz"))
+        logger.info("💾 Model file: %.1f MB", os.path.getsize(path) / 1024 ** 2)
+        forecaster = timed("load", BusynessForecaster.load, path)
+
+    codes = forecaster.stations
+    when = through + timedelta(hours=8)
+    started = time.perf_counter()
+    for i in range(lookups):
+        forecaster.predict(codes[i % len(codes)], when, hours=3)
+    elapsed = time.perf_counter() - started
+    logger.info("⏱️ %-28s %8.1fµs per prediction", f"{lookups} single lookups", elapsed / lookups * 1e6)
+
+    timed(f"batch lookup ({len(codes)} stations)", forecaster.predict_many, codes, when, 3)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the station busyness forecaster.")
+    parser.add_argument("--stations", type=int, default=2500, help="Number of stations (default: 2500)")
+    parser.add_argument("--weeks", type=int, default=8, help="Weeks of hourly history (default: 8)")
+    parser.add_argument("--lookups", type=int, default=10000, help="Single predictions to time (default: 10000)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_benchmark(args.stations, args.weeks, args.lookups)
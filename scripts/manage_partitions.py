@@ -0,0 +1,63 @@
+# scripts/manage_partitions.py
+import argparse
+import asyncio
+
+# Project modules
+from app.core.logging_config import configure_logging
+from app.core.config import settings
+from app.db.db_main import db_manager, close_database_connections
+from app.db.partitions import apply_retention, list_partitions, precreate_partitions
+
+logger = configure_logging()
+
+
+async def manage_partitions(ahead: int, retention_days: int, action: str) -> None:
+    """
+    Pre-creates upcoming arrivals_tracking partitions and applies retention.
+
+    Meant to run on a schedule (e.g. daily cron) next to the pipeline.
+
+    Args:
+        ahead (int): Future partitions to create.
+        retention_days (int): Days of run dates to keep (0 = keep everything).
+        action (str): "detach" or "drop" for expired partitions.
+    """
+    async with db_manager.engine.begin() as conn:
+        created = await precreate_partitions(conn, ahead=ahead)
+        removed = await apply_retention(conn, retention_days=retention_days, action=action)
+        partitions = await list_partitions(conn)
+
+    logger.info("🧱 %d partitions created, %d %s, %d attached",
+                len(created), len(removed), "dropped" if action == "drop" else "detached", len(partitions))
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Maintain arrivals_tracking partitions.")
+    parser.add_argument(
+        "--ahead",
+        type=int,
+        default=settings.partition_precreate,
+        help="Future partitions to create (default: settings.partition_precreate)"
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=settings.partition_retention_days,
+        help="Days of run dates to keep, 0 keeps everything (default: settings.partition_retention_days)"
+    )
+    parser.add_argument(
+        "--action",
+        choices=["detach", "drop"],
+        default=settings.partition_retention_action,
+        help="What to do with expired partitions (default: settings.partition_retention_action)"
+    )
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    try:
+        await manage_partitions(args.ahead, args.retention_days, args.action)
+    finally:
+        await close_database_connections()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,54 +1,91 @@
 # app/services/etl/run_pipeline.py
+import argparse
 import asyncio
 from datetime import datetime 
+from typing import List, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Project modules
 from app.core.logging_config import configure_logging
-from app.services.etl.extract import extract_and_save_arrivals_data
+from app.core.config import settings
+from app.core.executor import cpu_executor
+from app.services.etl.extract import (
+    extract_network_arrivals,
+    extract_incremental_arrivals,
+    advance_watermarks,
+)
 from app.services.etl.clean import process_data
 from app.services.etl.merge import merge_geospatial_data
 from app.crud.train_crud import upload_to_db
+from app.crud.watermark_crud import get_watermarks, save_watermarks
 from app.services.etl.map import TrainDelayMap
 from app.db.db_main import get_db, close_database_connections
-from app.services.etl.predict_overcrowding import predict_crowding
+from app.db.views import refresh_materialized_views
+from app.services.forecasting import refresh_forecast_model
+from app.services.trains_main import rtt_client
+from app.services.ingest_events import on_ingest
+from app.services.tile_cache import tile_cache
+from app.services.map_cache import map_cache
 
 logger = configure_logging()
 
+# Uploads drop the cached tiles of the run dates they changed, and every cached map page
+on_ingest(tile_cache.invalidate_run_dates)
+on_ingest(map_cache.invalidate)
 
-async def run_data_pipeline(station: str, days: int):
+
+async def run_data_pipeline(stations: Union[str, List[str]], days: int, incremental: Optional[bool] = None):
     """
-    Runs the complete ETL pipeline: Extract, Clean, Merge, Upload, Map Generation. and Crowding Prediction.
+    Runs the complete ETL pipeline: Extract, Clean, Merge, Upload, Map Generation, Leaderboard Refresh and Forecast Update.
     
     Args:
-        station (str): Station code to extract data for.
+        stations (Union[str, List[str]]): Station code, or list of station codes, to extract data for.
         days (int): Number of past days to extract data.
+        incremental (Optional[bool]): Only fetch station-days after each station's watermark
+            (default: settings.extract_incremental).
     """
     today_date = datetime.today().strftime('%Y-%m-%d')  # Ensures it's a string, not a datetime object
+    if isinstance(stations, str):
+        stations = [stations]
+    if incremental is None:
+        incremental = settings.extract_incremental
         
-    logger.info("🛢️ Running data pipeline for station '%s' over the past %d days.", station, days)
+    logger.info("🛢️ Running data pipeline for stations %s over the past %d days.", stations, days)
     
     # USE CONTEXT MANAGER TO MANAGE DB SESSION 
     async with get_db() as db_session:
         raw_data = None
         df_clean = None
         df_merged = None 
+        plan = None
         
         try: 
             # STEP 1: EXTRACT LIVE ARRIVALS DATA 
             logger.info("🔍 Extracting live data...")
         
             # Ensure that the date is properly formatted as a string in 'YYYY-MM-DD' format
-            raw_data = await extract_and_save_arrivals_data(station, days)
+            if incremental:
+                watermarks = await get_watermarks(db_session, stations)
+                await db_session.commit()  # End the read transaction before the upload begins its own
+                raw_data, plan = await extract_incremental_arrivals(stations, days, watermarks)
+            else:
+                raw_data = await extract_network_arrivals(stations, days)
             
-            if not raw_data or "services" not in raw_data:
-                logger.error("❌ No valid raw data found. Halting pipeline.", today_date)
+            if not raw_data or not raw_data.get("services"):
+                logger.error("❌ No valid raw data found on %s. Halting pipeline.", today_date)
+                if incremental and raw_data:
+                    # Nothing to upload, but days the API answered without arrivals are done
+                    await save_watermarks(db_session, advance_watermarks(plan, raw_data["failures"], watermarks))
+                    await db_session.commit()
                 return
+            if raw_data["failures"]:
+                logger.warning("⚠️ %d station-days failed to extract.", len(raw_data["failures"]))
     
 
             # STEP 2: PROCESS AND ClEAN 
             logger.info("🛠️ Processing and cleaning extracted data...")
-            df_clean = process_data(raw_data)
+            # Cleaning and its CSV/Parquet writes run in the executor, off the event loop
+            df_clean = await cpu_executor.run(process_data, raw_data)
             if  df_clean is None or df_clean.empty:
                 logger.error("❌ No valid train records after processing. Halting pipeline.")
                 return
@@ -56,7 +93,7 @@ async def run_data_pipeline(station: str, days: int):
 
             # STEP 3: MERGE WITH COORDINATES
             logger.info("🔗 Merging with geospatial data...")
-            df_merged = merge_geospatial_data(df_clean)
+            df_merged = await cpu_executor.run(merge_geospatial_data, df_clean)
             if df_merged.empty or df_merged is None:
                 logger.error("❌ No valid train records after merging geospatial data. Halting pipeline.")
                 return
@@ -64,9 +101,15 @@ async def run_data_pipeline(station: str, days: int):
 
             # STEP 4: LOAD TO DATABASE 
             logger.info("💾 Uploading cleaned data to the database...")
-            await upload_to_db(df_merged, db_session)
+            upload_error = await upload_to_db(df_merged, db_session)
             if db_session is not None:
                 await db_session.commit()
+
+            # Only move watermarks once the station-days are safely in the database
+            if incremental and upload_error is None:
+                new_watermarks = advance_watermarks(plan, raw_data["failures"], watermarks)
+                await save_watermarks(db_session, new_watermarks)
+                await db_session.commit()
             
 
             # STEP 5: GENERATE HTML MAP 
@@ -80,14 +123,16 @@ async def run_data_pipeline(station: str, days: int):
                 logger.warning("⚠️ Map generation returned no map path.")
             
             
-            # STEP 6: Predict station crowding
-            logger.info("📊 Predicting station crowding...")
-            crowding_df = await predict_crowding(db_session)
-            
-            if not crowding_df.empty:
-                logger.info("✅ Crowding prediction complete.")
-            else:
-                logger.warning("⚠️ No significant crowding detected.")
+            # STEP 6: REFRESH STATION AND OPERATOR LEADERBOARDS
+            logger.info("📊 Refreshing station crowding and operator punctuality leaderboards...")
+            await refresh_materialized_views(db_session)
+            await db_session.commit()
+            logger.info("✅ Leaderboards refreshed.")
+
+            # STEP 7: FOLD NEWLY FINAL HOURS INTO THE BUSYNESS FORECAST PROFILES
+            logger.info("📈 Updating station busyness forecast profiles...")
+            await refresh_forecast_model(db_session)
+            await db_session.commit()
 
         except Exception as e:
             logger.error(f"❌ An error occurred during the pipeline: {e}")
@@ -96,12 +141,38 @@ async def run_data_pipeline(station: str, days: int):
 
     logger.info("🏁 ETL  pipeline completed successfully.")
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the train arrivals ETL pipeline.")
+    parser.add_argument(
+        "--stations",
+        default=",".join(settings.stations),
+        help="Comma-separated station CRS codes (default: settings.stations)"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=settings.days,
+        help="Number of past days to extract (default: settings.days)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore watermarks and re-extract every day in the window"
+    )
+    return parser.parse_args()
+
 async def main ():
-    station = "FPK"
-    days = 7
+    args = parse_args()
+    stations = [crs.strip().upper() for crs in args.stations.split(",") if crs.strip()]
+    days = args.days
     
-    await run_data_pipeline(station, days)
-    await close_database_connections()
+    try:
+        # One pooled RTT session for the whole run
+        async with rtt_client:
+            await run_data_pipeline(stations, days, incremental=False if args.full else None)
+    finally:
+        await close_database_connections()
+        cpu_executor.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())  # Ensures async functions are properly executed
\ No newline at end of file
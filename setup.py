@@ -12,6 +12,7 @@ setup(
         "sqlalchemy[asyncio]>=2.0.37",
         "asyncpg>=0.30.0",
         "pandas>=2.0.1",
+        "pyarrow>=14.0.1",
         "geopandas>=0.14.4",
         "folium>=0.19.4",
         "python-dotenv>=1.0.1",
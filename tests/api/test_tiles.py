@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import tiles
+from app.db.db_main import get_session
+from app.services.tile_cache import TileCache
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """Serves the tile router without a database; records every tile render."""
+    renders = []
+    today = date.today()
+
+    async def get_tile(db_session, z, x, y, run_date):
+        renders.append(run_date)
+        return b""
+
+    async def list_partitions(db_session):
+        return {"current": (today - timedelta(days=7), today + timedelta(days=30))}
+
+    async def no_session():
+        yield None
+
+    monkeypatch.setattr(tiles, "get_tile", get_tile)
+    monkeypatch.setattr(tiles, "list_partitions", list_partitions)
+    monkeypatch.setattr(tiles, "tile_cache", TileCache(str(tmp_path)))
+    app = FastAPI()
+    app.include_router(tiles.router, prefix="/tiles")
+    app.dependency_overrides[get_session] = no_session
+    return TestClient(app), renders
+
+def test_run_dates_outside_retained_partitions_are_rejected(client):
+    http, renders = client
+    future = (date.today() + timedelta(days=3)).isoformat()
+    expired = (date.today() - timedelta(days=30)).isoformat()
+
+    assert http.get("/tiles/5/15/10.mvt", params={"run_date": future}).status_code == 404
+    assert http.get("/tiles/5/15/10.mvt", params={"run_date": expired}).status_code == 404
+    assert renders == []
+
+def test_empty_tiles_are_rendered_but_not_cached(client):
+    http, renders = client
+
+    assert http.get("/tiles/5/15/10.mvt").status_code == 200
+    assert http.get("/tiles/5/15/10.mvt").status_code == 200
+    assert renders == [date.today(), date.today()]
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import train_delays
+from app.core.executor import ExecutorBusyError
+from app.crud.delay_crud import DelayBatch, to_columns
+from app.db.db_main import get_session
+from app.services.etl.map import TrainDelayMap
+from app.services.map_cache import MapCache
+
+@pytest.fixture
+def renders(monkeypatch, tmp_path):
+    """Serves the router without a database; records every map render."""
+    calls = []
+
+    async def render_html(self, db, hours=1, station=None):
+        calls.append((hours, station))
+        return f"<html>{hours} {station}</html>"
+
+    async def no_session():
+        yield None
+
+    monkeypatch.setattr(TrainDelayMap, "render_html", render_html)
+    monkeypatch.setattr(train_delays, "map_cache", MapCache(max_entries=4, cache_dir=str(tmp_path), disk=False))
+    app = FastAPI()
+    app.include_router(train_delays.router)
+    app.dependency_overrides[get_session] = no_session
+    return TestClient(app), calls
+
+def test_map_is_cached_and_revalidated(renders):
+    client, calls = renders
+
+    first = client.get("/train_delays_map", params={"hours": 2, "station": "FPK"})
+    assert first.status_code == 200
+    assert first.text == "<html>2 FPK</html>"
+
+    again = client.get("/train_delays_map", params={"hours": 2, "station": "FPK"},
+                       headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert calls == [(2, "FPK")]
+
+    client.get("/train_delays_map", params={"hours": 3})
+    assert calls == [(2, "FPK"), (3, None)]
+
+def test_busy_renderer_answers_503(renders, monkeypatch):
+    client, _ = renders
+
+    async def busy(self, db, hours=1, station=None):
+        raise ExecutorBusyError("cpu", 16)
+
+    monkeypatch.setattr(TrainDelayMap, "render_html", busy)
+    response = client.get("/train_delays_map")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+
+def test_station_status_lists_one_object_per_arrival(renders, monkeypatch):
+    client, _ = renders
+    batch = DelayBatch(to_columns(
+        [(1, "MOG", 4.0), (2, "FPK", None)], ["id", "destination_crs", "delay_minutes"]
+    ))
+
+    async def fetch(db, filters, **kwargs):
+        assert filters.station == "fpk"
+        return batch
+
+    monkeypatch.setattr(train_delays, "fetch_delays", fetch)
+    monkeypatch.setattr(train_delays, "forecast_stations", lambda stations, start, hours: {"FPK": None})
+    response = client.get("/station_status/fpk")
+
+    assert response.status_code == 200
+    assert response.json()["current_delays"] == [
+        {"id": 1, "destination_crs": "MOG", "delay_minutes": 4.0},
+        {"id": 2, "destination_crs": "FPK", "delay_minutes": None},
+    ]
+
+def test_batch_busyness_validates_windows(renders, monkeypatch):
+    client, _ = renders
+    monkeypatch.setattr(train_delays, "forecast_batch",
+                        lambda stations, windows, start: {"stations": stations, "windows": windows})
+
+    ok = client.post("/station_busyness", json={"stations": ["FPK"], "look_ahead_hours": [1, 24]})
+    assert ok.status_code == 200
+    assert ok.json() == {"stations": ["FPK"], "windows": [1, 24]}
+
+    for windows in ([0], [25], [1, 48]):
+        response = client.post("/station_busyness", json={"stations": ["FPK"], "look_ahead_hours": windows})
+        assert response.status_code == 422
@@ -6,12 +6,12 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.models.db_models import Base 
 from app.core.config import settings
-from app.core.logging_config import setup_logging
+from app.core.logging_config import configure_logging
 
 from fastapi.testclient import TestClient 
 from app.main import app
 
-logger = setup_logging()
+logger = configure_logging()
 
 # Test database URL - #TODO maybe move this to settings
 TEST_DATABASE_URL = settings.test_database_url 
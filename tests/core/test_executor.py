@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import pytest
+
+from app.core.executor import BoundedExecutor, ExecutorBusyError
+
+@pytest.mark.asyncio
+async def test_runs_work_off_the_event_loop():
+    executor = BoundedExecutor(kind="thread", max_workers=2, max_queue=2)
+    try:
+        loop_thread = threading.get_ident()
+        worker_thread = await executor.run(threading.get_ident)
+        assert worker_thread != loop_thread
+        assert await executor.run(sorted, [3, 1, 2], reverse=True) == [3, 2, 1]
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_full_queue_refuses_work_and_reports_depth():
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        stats = executor.stats()
+        assert (stats["running"], stats["queued"]) == (1, 1)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(release.wait)
+
+        release.set()
+        await asyncio.gather(running, queued)
+        stats = executor.stats()
+        assert (stats["running"], stats["queued"], stats["completed"], stats["rejected"]) == (0, 0, 2, 1)
+        assert stats["peak_queued"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_failures_are_raised_and_counted():
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=0)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            await executor.run(divmod, 1, 0)
+        assert executor.stats()["failed"] == 1
+        assert executor.stats()["queued"] == 0
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_process_pool():
+    executor = BoundedExecutor(kind="process", max_workers=1, max_queue=0)
+    try:
+        assert await executor.run(pow, 2, 10) == 1024
+    finally:
+        executor.shutdown()
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        BoundedExecutor(kind="fiber")
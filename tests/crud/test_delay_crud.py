@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from datetime import date, datetime
+
+from app.crud.delay_crud import (
+    ArrivalFilters, DelayBatch, decode_cursor, delay_query, encode_cursor, parse_bbox, to_columns
+)
+
+def test_parse_bbox():
+    assert parse_bbox("-0.2,51.4,0.1,51.6") == (-0.2, 51.4, 0.1, 51.6)
+    assert parse_bbox(None) is None
+
+@pytest.mark.parametrize("value", ["1,2,3", "0.1,51.4,-0.2,51.6", "a,b,c,d"])
+def test_parse_bbox_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_bbox(value)
+
+def test_window_defaults_to_hours_before_end():
+    filters = ArrivalFilters.window(end=datetime(2025, 2, 10, 12), hours=6)
+    assert filters.start == datetime(2025, 2, 10, 6)
+
+def test_where_clause_includes_only_given_filters():
+    filters = ArrivalFilters.window(datetime(2025, 2, 10), datetime(2025, 2, 11), station="eus")
+    where, params = filters.where_clause()
+
+    assert "(origin_crs = :station OR destination_crs = :station)" in where
+    assert "operator" not in where
+    assert "ST_MakeEnvelope" not in where
+    assert params["station"] == "EUS"
+    assert str(params["first_run_date"]) == "2025-02-09"
+
+def _filters():
+    return ArrivalFilters.window(datetime(2025, 2, 10), datetime(2025, 2, 11))
+
+def test_delay_query_selects_requested_columns_plus_keys():
+    sql, params, names = delay_query(_filters(), columns=["delay_minutes", "origin_latitude"], limit=50)
+
+    assert names == ["delay_minutes", "origin_latitude", "scheduled_arrival", "id"]
+    assert "ST_Y(origin_geom::geometry) AS origin_latitude" in sql
+    assert "ORDER BY scheduled_arrival ASC, id ASC" in sql
+    assert "(scheduled_arrival, id)" not in sql
+    assert params["limit"] == 50
+
+def test_delay_query_continues_after_cursor():
+    cursor = encode_cursor(np.datetime64("2025-02-10T08:15:00"), 42)
+    sql, params, _ = delay_query(_filters(), limit=50, cursor=cursor, descending=True)
+
+    assert "(scheduled_arrival, id) < (:after_arrival, :after_id)" in sql
+    assert "ORDER BY scheduled_arrival DESC, id DESC" in sql
+    assert (params["after_arrival"], params["after_id"]) == (datetime(2025, 2, 10, 8, 15), 42)
+
+def test_delay_query_rejects_unknown_columns():
+    with pytest.raises(ValueError):
+        delay_query(_filters(), columns=["platform"])
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_to_columns_types_and_missing_values():
+    rows = [
+        (1, date(2025, 2, 10), datetime(2025, 2, 10, 8, 0), 3, 51.5),
+        (2, date(2025, 2, 10), None, None, None),
+    ]
+    columns = to_columns(rows, ["id", "run_date", "actual_arrival", "delay_minutes", "origin_latitude"])
+
+    assert columns["id"].dtype == np.int64
+    assert columns["run_date"].dtype == np.dtype("datetime64[D]")
+    assert np.isnat(columns["actual_arrival"][1])
+    assert np.isnan(columns["delay_minutes"][1])
+
+    batch = DelayBatch(columns)
+    assert len(batch) == 2
+    assert batch.to_records()[1] == {
+        "id": 2, "run_date": date(2025, 2, 10), "actual_arrival": None,
+        "delay_minutes": None, "origin_latitude": None,
+    }
+    assert batch.to_frame()["delay_minutes"].iloc[0] == 3
+
+def test_empty_result_keeps_every_column():
+    batch = DelayBatch(to_columns([], ["id", "delay_minutes"]))
+    assert len(batch) == 0
+    assert batch.column_lists() == {"id": [], "delay_minutes": []}
@@ -0,0 +1,18 @@
+import pytest
+from datetime import datetime
+
+from app.crud.delay_crud import ArrivalFilters
+from app.crud.geo_crud import feature_query
+
+def test_feature_query_uses_requested_geometry():
+    filters = ArrivalFilters.window(datetime(2025, 2, 10), datetime(2025, 2, 11), bbox=(-1, 51, 1, 52))
+    sql, params = feature_query(filters, "route", limit=10)
+
+    assert "ST_AsGeoJSON(ST_MakeLine(origin_geom, destination_geom), 6)" in sql
+    assert sql.rstrip().endswith("LIMIT :limit")
+    assert params["limit"] == 10 and params["min_lon"] == -1
+
+def test_feature_query_rejects_unknown_geometry():
+    filters = ArrivalFilters.window(datetime(2025, 2, 10), datetime(2025, 2, 11))
+    with pytest.raises(ValueError):
+        feature_query(filters, "midpoint")
@@ -0,0 +1,69 @@
+import pandas as pd
+from datetime import datetime
+
+from app.crud.rollup_crud import (
+    DELAY_HISTOGRAM_EDGES, affected_buckets, histogram_labels, known_delay_count_sql, summarise_hourly_stats
+)
+from app.db.views import OPERATOR_PUNCTUALITY, STATION_CROWDING
+
+def test_histogram_labels_cover_every_bin():
+    labels = histogram_labels()
+    assert len(labels) == len(DELAY_HISTOGRAM_EDGES) + 1
+    assert labels[0] == "<0"
+    assert labels[1] == "0-4"
+    assert labels[-1] == "60+"
+
+def test_affected_buckets_deduplicates_hours():
+    df = pd.DataFrame({
+        "destination_crs": ["EUS", "EUS", "EUS", "MAN"],
+        "operator": ["VT", "VT", "LM", "VT"],
+        "scheduled_arrival": pd.to_datetime([
+            "2025-02-10 08:05", "2025-02-10 08:55", "2025-02-10 08:10", "2025-02-10 09:00",
+        ]),
+    })
+
+    stations, operators, hours = affected_buckets(df)
+
+    assert sorted(zip(stations, operators, hours)) == [
+        ("EUS", "LM", datetime(2025, 2, 10, 8)),
+        ("EUS", "VT", datetime(2025, 2, 10, 8)),
+        ("MAN", "VT", datetime(2025, 2, 10, 9)),
+    ]
+
+def test_summarise_hourly_stats_combines_rows():
+    rows = [
+        {"train_count": 3, "delay_sum": 30, "delayed_count": 1, "delay_histogram": [0, 1, 1, 0, 1, 0, 0]},
+        {"train_count": 1, "delay_sum": 0, "delayed_count": 0, "delay_histogram": [0, 1, 0, 0, 0, 0, 0]},
+    ]
+
+    summary = summarise_hourly_stats(rows)
+
+    assert summary["train_count"] == 4
+    assert summary["average_delay"] == 7.5
+    assert summary["delayed_ratio"] == 0.25
+    assert summary["delay_histogram"]["0-4"] == 2
+
+def test_summarise_hourly_stats_empty():
+    summary = summarise_hourly_stats([])
+    assert summary["train_count"] == 0
+    assert summary["average_delay"] is None
+
+class _OneBased(list):
+    """Indexes like a PostgreSQL array."""
+
+    def __getitem__(self, i):
+        return list.__getitem__(self, i - 1)
+
+def test_summary_and_leaderboards_average_over_known_delays():
+    # The first hour has two arrivals without a delay
+    rows = [
+        {"train_count": 5, "delay_sum": 30, "delayed_count": 1, "delay_histogram": [0, 1, 1, 0, 1, 0, 0]},
+        {"train_count": 1, "delay_sum": 0, "delayed_count": 0, "delay_histogram": [0, 1, 0, 0, 0, 0, 0]},
+    ]
+    known = sum(eval(known_delay_count_sql(), {"delay_histogram": _OneBased(row["delay_histogram"])})
+                for row in rows)
+    leaderboard_average = sum(row["delay_sum"] for row in rows) / known
+
+    assert summarise_hourly_stats(rows)["average_delay"] == leaderboard_average == 7.5
+    for view in (STATION_CROWDING, OPERATOR_PUNCTUALITY):
+        assert f"NULLIF(SUM({known_delay_count_sql()}), 0) AS avg_delay" in view.query
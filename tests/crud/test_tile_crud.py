@@ -0,0 +1,31 @@
+from datetime import date
+
+from app.core.config import settings
+from app.crud.tile_crud import cluster_cell_size, delay_band_sql, tile_query, valid_tile
+
+def test_valid_tile():
+    assert valid_tile(0, 0, 0)
+    assert valid_tile(10, 1023, 511)
+    assert not valid_tile(10, 1024, 0)
+    assert not valid_tile(-1, 0, 0)
+
+def test_delay_band_sql_is_ordered():
+    sql = delay_band_sql()
+    assert sql.index("'on_time'") < sql.index("'minor'") < sql.index("'moderate'") < sql.index("'severe'")
+
+def test_low_zoom_clusters_points_without_routes():
+    sql, params = tile_query(4, 7, 5, date(2025, 2, 10))
+    assert "ST_SnapToGrid" in sql
+    assert params["cell"] == cluster_cell_size(4)
+    assert "'routes'" not in sql
+
+def test_high_zoom_has_station_points_and_routes():
+    z = max(settings.tile_cluster_max_zoom, settings.tile_route_min_zoom)
+    sql, params = tile_query(z, 0, 0, date(2025, 2, 10))
+    assert "ST_SnapToGrid" not in sql and "cell" not in params
+    assert "'delays'" in sql and "'routes'" in sql
+
+def test_routes_are_prefiltered_on_indexed_endpoints():
+    sql, _ = tile_query(settings.tile_route_min_zoom, 0, 0, date(2025, 2, 10))
+    assert "a.origin_geom && b.query_box OR a.destination_geom && b.query_box" in sql
+    assert "ST_MakeLine(a.origin_geom, a.destination_geom) && b.query_box" not in sql
@@ -0,0 +1,49 @@
+# tests/crud/test_train_crud.py
+
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from app.crud.train_crud import COLUMN_NAMES, arrival_records, insert_statement
+
+def test_arrival_records_are_plain_python_values():
+    df = pd.DataFrame({
+        "run_date": [date(2025, 2, 10)],
+        "station": ["FPK"],
+        "service_id": ["X73315"],
+        "operator": ["Great Northern"],
+        "origin": ["Welwyn Garden City"],
+        "origin_crs": ["WGC"],
+        "origin_latitude": [51.8],
+        "origin_longitude": [-0.2],
+        "destination": ["Moorgate"],
+        "destination_crs": ["MOG"],
+        "destination_latitude": [51.5],
+        "destination_longitude": [np.nan],
+        "scheduled_arrival": pd.to_datetime(["2025-02-10 23:55"]),
+        "actual_arrival": pd.to_datetime(["2025-02-11 00:04"]),
+        "is_actual": [True],
+        "delay_minutes": [9],
+        "is_passenger_train": [True],
+        "was_scheduled_to_stop": [False],
+        "stop_status": ["CALL"],
+    })
+
+    (record,) = arrival_records(df)
+    values = dict(zip(COLUMN_NAMES, record))
+
+    assert len(record) == len(COLUMN_NAMES)
+    assert type(values["delay_minutes"]) is int
+    assert type(values["is_actual"]) is bool
+    assert type(values["actual_arrival"]) is datetime
+    assert values["actual_arrival"] == datetime(2025, 2, 11, 0, 4)
+    assert values["destination_longitude"] is None
+
+def test_insert_statement_binds_one_tuple_per_row():
+    sql = insert_statement(2)
+
+    assert ":run_date_0" in sql and ":stop_status_1" in sql
+    assert ":run_date_2" not in sql
+    assert "ST_MakePoint(:destination_longitude_1, :destination_latitude_1)" in sql
+    assert sql.rstrip().endswith("RETURNING 1")
@@ -0,0 +1,52 @@
+# tests/db/test_partitions.py
+
+from datetime import date
+
+from app.db.partitions import (
+    expired_partitions,
+    is_retained,
+    missing_ranges,
+    partition_name,
+    partition_range,
+    parse_partition_bound,
+)
+
+def test_monthly_and_weekly_ranges():
+    assert partition_range(date(2024, 12, 17), "month") == (date(2024, 12, 1), date(2025, 1, 1))
+    assert partition_range(date(2025, 2, 13), "week") == (date(2025, 2, 10), date(2025, 2, 17))
+    assert partition_name(date(2025, 2, 1), "month") == "arrivals_tracking_2025_02"
+    assert partition_name(date(2024, 12, 30), "week") == "arrivals_tracking_2025_w01"
+
+def test_parse_partition_bound():
+    bound = "FOR VALUES FROM ('2025-02-01') TO ('2025-03-01')"
+    assert parse_partition_bound(bound) == (date(2025, 2, 1), date(2025, 3, 1))
+    assert parse_partition_bound("DEFAULT") is None
+
+def test_missing_ranges_skip_days_already_covered():
+    existing = {"arrivals_tracking_2025_02": (date(2025, 2, 1), date(2025, 3, 1))}
+    days = [date(2025, 2, 10), date(2025, 3, 3), date(2025, 3, 31), date(2025, 1, 31)]
+
+    assert missing_ranges(days, existing, "month") == [
+        (date(2025, 1, 1), date(2025, 2, 1)),
+        (date(2025, 3, 1), date(2025, 4, 1)),
+    ]
+
+def test_expired_partitions_only_hold_old_dates():
+    existing = {
+        "arrivals_tracking_2025_02": (date(2025, 2, 1), date(2025, 3, 1)),
+        "arrivals_tracking_2025_01": (date(2025, 1, 1), date(2025, 2, 1)),
+        "arrivals_tracking_2025_03": (date(2025, 3, 1), date(2025, 4, 1)),
+    }
+    assert expired_partitions(existing, date(2025, 3, 15)) == [
+        "arrivals_tracking_2025_01", "arrivals_tracking_2025_02"
+    ]
+
+def test_only_stored_run_dates_are_retained():
+    today = date(2025, 3, 10)
+    existing = {"arrivals_tracking_2025_03": (date(2025, 3, 1), date(2025, 4, 1))}
+
+    assert is_retained(date(2025, 3, 9), existing, today, retention_days=0)
+    assert not is_retained(date(2025, 3, 11), existing, today, retention_days=0)
+    assert not is_retained(date(2025, 2, 27), existing, today, retention_days=0)
+    assert not is_retained(date(2025, 3, 2), existing, today, retention_days=7)
+    assert is_retained(date(2025, 2, 27), {}, today, retention_days=0)
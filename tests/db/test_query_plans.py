@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from app.api.endpoints.delays import DEFAULT_PAGE_SIZE
+from app.crud.rollup_crud import HOURLY_STATS_QUERY
+from app.db.query_plans import endpoint_query_checks, plan_indexes
+from app.models.db_models import query_indices
+from app.services.etl.predict_overcrowding import CROWDING_QUERY
+
+NOW = datetime(2025, 3, 10, 12, 0)
+
+def test_checks_use_the_queries_the_endpoints_run():
+    checks = {check.name: check for check in endpoint_query_checks(NOW)}
+    assert checks["predict_crowding"].sql == CROWDING_QUERY
+    assert checks["predict_crowding"].params["stations"] is None
+    assert checks["predict_crowding_stations"].params["stations"] == ["KGX"]
+    assert checks["get_hourly_stats"].sql == HOURLY_STATS_QUERY
+    assert "ORDER BY scheduled_arrival ASC, id ASC" in checks["fetch_delays"].sql
+    assert checks["fetch_delays"].params["end"] == NOW
+    assert checks["fetch_delays"].params["limit"] == DEFAULT_PAGE_SIZE
+    assert "ORDER BY scheduled_arrival DESC, id DESC" in checks["fetch_delay_data"].sql
+
+def test_every_check_expects_an_index_that_is_created():
+    created = {name for name, _, _ in query_indices} | {"station_hourly_stats_pkey"}
+    for check in endpoint_query_checks(NOW):
+        assert check.index in created, check.name
+
+def test_plan_indexes_walks_the_tree_and_ignores_scans_without_an_index():
+    plan = {
+        "Node Type": "Append",
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "arrivals_tracking_2025_03"},
+            {"Node Type": "Bitmap Heap Scan", "Plans": [
+                {"Node Type": "Bitmap Index Scan", "Index Name": "arrivals_tracking_2025_02_scheduled_arrival_idx"},
+            ]},
+        ],
+    }
+    assert plan_indexes(plan) == {"arrivals_tracking_2025_02_scheduled_arrival_idx"}
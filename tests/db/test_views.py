@@ -0,0 +1,19 @@
+from app.db.views import MATERIALIZED_VIEWS, OPERATOR_PUNCTUALITY, STATION_CROWDING
+
+def test_views_are_registered_by_name():
+    assert set(MATERIALIZED_VIEWS) == {"station_crowding_mv", "operator_punctuality_mv"}
+
+def test_create_sql_fills_in_window():
+    sql = STATION_CROWDING.create_sql(14)
+    assert sql.startswith("CREATE MATERIALIZED VIEW IF NOT EXISTS station_crowding_mv AS")
+    assert "INTERVAL '14 days'" in sql
+    assert "{window_days}" not in sql
+
+def test_every_view_has_a_unique_index_for_concurrent_refresh():
+    for view in MATERIALIZED_VIEWS.values():
+        assert view.unique_key
+        assert view.index_sql().startswith(f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{view.name}")
+
+def test_views_expose_a_rank_column():
+    assert "AS rank" in STATION_CROWDING.query
+    assert "AS rank" in OPERATOR_PUNCTUALITY.query
@@ -4,9 +4,9 @@ import pytest
 from datetime import datetime, timedelta
 from sqlalchemy import text, func
 from app.services.etl.mapping.data_fetcher import fetch_delay_data
-from app.core.logging_config import setup_logging
+from app.core.logging_config import configure_logging
 
-logger = setup_logging()
+logger = configure_logging()
 
 @pytest.mark.asyncio
 async def test_fetch_delay_data(db, table_name: str = "test_trains"):
@@ -68,11 +68,11 @@ async def test_fetch_delay_data(db, table_name: str = "test_trains"):
     print("transaction committed to the test_trains table")
 
     # Fetch data using the cutoff_time
-    delay_data = await fetch_delay_data(db, cutoff_time=cutoff_time)
+    delay_data = await fetch_delay_data(db, cutoff_time=cutoff_time, table_name=table_name)
     
     # Verify results
     assert len(delay_data) > 0, "Should have at least one record"
-    record = delay_data[0]
+    record = delay_data.to_records()[0]
     assert record['service_id'] == 'TEST001', "Should match test service ID"
     assert record['origin'] == 'Kings Cross', "Should match test origin"
     assert record['destination'] == 'Finsbury Park', "Should match test destination"
@@ -9,9 +9,9 @@ from app.main import app
 from app.services.etl.mapping.map_generator import generate_map
 from app.services.etl.mapping.map_config import MapConfig
 from app.services.etl.mapping.data_fetcher import fetch_delay_data
-from app.core.logging_config import setup_logging
+from app.core.logging_config import configure_logging
 
-logger = setup_logging()
+logger = configure_logging()
 
 @pytest.fixture 
 def test_client():
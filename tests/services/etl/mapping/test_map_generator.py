@@ -2,7 +2,9 @@
 import os
 from datetime import datetime
 import pytest
-from app.services.etl.mapping.map_generator import generate_map
+from app.crud.delay_crud import DELAY_COLUMNS, DelayBatch, to_columns
+from app.services.etl.mapping import map_generator
+from app.services.etl.mapping.map_generator import generate_map, render_map_html
 
 @pytest.fixture
 def sample_delay_data():
@@ -44,4 +46,34 @@ async def test_map_generator(sample_delay_data, db):
         # Clean up the test map file
         if os.path.exists(map_path):
             os.remove(map_path)
-    
\ No newline at end of file
+
+def _batch(records):
+    names = [name for name in DELAY_COLUMNS if name != "id"]
+    return DelayBatch(columns=to_columns([tuple(row[name] for name in names) for row in records], names))
+
+@pytest.mark.asyncio
+async def test_generate_map_archives_rendered_page(sample_delay_data, monkeypatch, tmp_path):
+    """The map is rendered from the fetched batch and written to the given path."""
+    requested = []
+
+    async def fetch_delay_data(db, hours=24):
+        requested.append(hours)
+        return _batch(sample_delay_data)
+
+    monkeypatch.setattr(map_generator, "fetch_delay_data", fetch_delay_data)
+    output_path = str(tmp_path / "train_delays_map_test.html")
+
+    map_path = await generate_map(None, output_path, hours=6)
+
+    assert map_path == output_path
+    with open(map_path, encoding="utf-8") as f:
+        assert "Kings Cross" in f.read()
+    assert requested == [6]
+
+@pytest.mark.asyncio
+async def test_render_map_html_without_trains(monkeypatch):
+    async def fetch_delay_data(db, hours=24):
+        return _batch([])
+
+    monkeypatch.setattr(map_generator, "fetch_delay_data", fetch_delay_data)
+    assert await render_map_html(None) is None
@@ -0,0 +1,86 @@
+# tests/services/etl/test_clean.py
+
+import pandas as pd
+import pytest
+
+from app.services.etl import clean
+from app.services.etl.clean import clean_services_rowwise, clean_services_vectorised, process_data
+from app.services.etl.storage import IntermediateStore
+
+def make_service(**overrides):
+    """Builds a well-formed extracted service, overriding selected fields."""
+    service = {
+        "run_date": "2025-02-10",
+        "station": "FPK",
+        "service_id": "X73315",
+        "operator": "Great Northern",
+        "is_passenger_train": True,
+        "scheduled_arrival": "0802",
+        "actual_arrival": "0805",
+        "is_actual": True,
+        "origin": "Welwyn Garden City",
+        "destination": "Moorgate",
+        "was_scheduled_to_stop": True,
+        "stop_status": "CALL",
+    }
+    service.update(overrides)
+    return service
+
+SERVICES = [
+    make_service(),
+    make_service(service_id="A1", scheduled_arrival="2355", actual_arrival="0004"),  # Midnight crossing
+    make_service(service_id="A2", scheduled_arrival="1200", actual_arrival="1158"),  # Early
+    make_service(service_id="A3", actual_arrival=None),                              # Missing arrival
+    make_service(service_id="A4", actual_arrival=""),
+    make_service(service_id="A5", actual_arrival="2460"),                            # Invalid time
+    make_service(service_id="A6", run_date="2025-02-30"),                            # Invalid date
+    make_service(service_id="A7", scheduled_arrival="800"),                          # Irregular format
+    make_service(service_id="A8", operator=123),                                     # Wrong type
+    make_service(service_id="A9", origin=None),
+    make_service(service_id="C1", run_date="2024-2-29", is_actual="yes"),            # Lax parsing
+    make_service(service_id="C2", is_passenger_train=2),
+    {k: v for k, v in make_service(service_id="C3").items() if k != "operator"},     # Missing required
+    {k: v for k, v in make_service(service_id="B1").items() if k != "stop_status"},  # Default applied
+]
+
+def test_vectorised_matches_rowwise():
+    expected, expected_missing = clean_services_rowwise(SERVICES)
+    actual, actual_missing = clean_services_vectorised(SERVICES)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    report_columns = ["run_date", "service_id", "operator", "scheduled_arrival", "origin", "destination"]
+    pd.testing.assert_frame_equal(actual_missing[report_columns], expected_missing[report_columns])
+
+def test_vectorised_handles_midnight_and_defaults():
+    df, missing = clean_services_vectorised(SERVICES)
+
+    delays = dict(zip(df["service_id"], df["delay_minutes"]))
+    assert delays["X73315"] == 3
+    assert delays["A1"] == 9
+    assert delays["A2"] == -2
+    assert df.loc[df["service_id"] == "B1", "stop_status"].item() == "UNKNOWN"
+    reasons = dict(zip(missing["service_id"], missing["reason"]))
+    assert reasons["A3"] == "missing_actual_arrival"
+    assert reasons["A4"] == "missing_actual_arrival"
+    assert reasons["A5"] == "invalid_time"
+    assert reasons["A6"] == "invalid_date"
+    assert reasons["A8"] == "string_type"
+    assert reasons["C2"] == "bool_parsing"
+    assert pd.isna(missing.loc[missing["service_id"] == "A9", "origin"].item())
+
+def test_vectorised_empty_input():
+    df, missing = clean_services_vectorised([])
+    assert df.empty and missing.empty
+
+@pytest.mark.parametrize("vectorised", [True, False])
+def test_process_data_writes_outputs(tmp_path, monkeypatch, vectorised):
+    monkeypatch.setattr(clean, "OUTPUT_DIR", str(tmp_path))
+    store = IntermediateStore(base_dir=str(tmp_path / "intermediate"), export_csv=True)
+
+    df = process_data({"services": SERVICES}, vectorised=vectorised, store=store)
+
+    assert list(df.columns) == clean.CLEANED_COLUMNS
+    assert pd.api.types.is_datetime64_any_dtype(df["actual_arrival"])
+    assert len(store.read("cleaned_delays")) == len(df)
+    assert (tmp_path / "cleaned_delays_data.csv").exists()
+    assert (tmp_path / "missing_actual_arrivals.csv").exists()
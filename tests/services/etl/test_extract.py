@@ -0,0 +1,14 @@
+from datetime import date
+
+from app.services.etl.extract import advance_watermarks
+from app.services.trains_main import NO_ARRIVALS_ERROR
+
+PLAN = {"FPK": ["2025-01-01", "2025-01-02", "2025-01-03"]}
+
+def test_watermark_stops_before_a_failed_fetch():
+    failures = [{"station": "FPK", "date": "2025-01-02", "error": "Failed to fetch train data: timeout"}]
+    assert advance_watermarks(PLAN, failures, {}, refetch_days=0) == {"FPK": date(2025, 1, 1)}
+
+def test_days_without_arrivals_do_not_hold_the_watermark():
+    failures = [{"station": "FPK", "date": "2025-01-02", "error": NO_ARRIVALS_ERROR}]
+    assert advance_watermarks(PLAN, failures, {}, refetch_days=0) == {"FPK": date(2025, 1, 3)}
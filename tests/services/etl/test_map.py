@@ -0,0 +1,99 @@
+import os
+import pytest
+from datetime import datetime
+
+from app.crud.delay_crud import DELAY_COLUMNS, to_columns
+from app.services.etl.map import RENDER_MODES, TrainDelayMap, aggregate_stations, prune_map_archive, render_map
+
+def _trains(count):
+    """Services from two origins that all terminate at Moorgate."""
+    return [{
+        "run_date": "2025-02-10",
+        "service_id": f"S{i}",
+        "operator": "Great Northern",
+        "origin": "Welwyn Garden City" if i % 2 else "Hertford North",
+        "origin_crs": "WGC" if i % 2 else "HFN",
+        "origin_latitude": 51.80 if i % 2 else 51.79,
+        "origin_longitude": -0.20 if i % 2 else -0.09,
+        "destination": "Moorgate",
+        "destination_crs": "MOG",
+        "destination_latitude": 51.518,
+        "destination_longitude": -0.089,
+        "scheduled_arrival": datetime(2025, 2, 10, 8, i % 60),
+        "actual_arrival": datetime(2025, 2, 10, 8, i % 60),
+        "delay_minutes": i % 20,
+        "is_passenger_train": True,
+    } for i in range(count)]
+
+def test_aggregate_stations_one_row_per_station():
+    stations = aggregate_stations(_trains(10)).set_index("crs")
+
+    assert sorted(stations.index) == ["HFN", "MOG", "WGC"]
+    assert stations.loc["MOG", "trains_to"] == 10
+    assert stations.loc["MOG", "trains_from"] == 0
+    assert stations.loc["WGC", "trains_from"] == 5
+    assert stations.loc["MOG", "max_delay"] == 9
+
+def test_aggregate_stations_empty():
+    assert aggregate_stations([]).empty
+
+def test_station_mode_page_does_not_grow_with_trains():
+    renderer = TrainDelayMap(render_mode="stations")
+    small = renderer.build_map(_trains(10)).get_root().render()
+    large = renderer.build_map(_trains(200)).get_root().render()
+    per_train = TrainDelayMap(render_mode="trains").build_map(_trains(200)).get_root().render()
+
+    assert len(large) < len(small) * 1.1
+    assert len(large) * 5 < len(per_train)
+
+def test_unknown_render_mode():
+    with pytest.raises(ValueError):
+        TrainDelayMap(render_mode="heatmap")
+
+def _archive(directory, count, size=100):
+    paths = []
+    for i in range(count):
+        path = directory / f"train_delays_map_20250210_0800{i:02d}.html"
+        path.write_text("x" * size)
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+        paths.append(path)
+    return paths
+
+def test_prune_keeps_newest_maps(tmp_path):
+    paths = _archive(tmp_path, 5)
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / "h1_ALL_stations-0.html").write_text("cached")
+
+    removed = prune_map_archive(str(tmp_path), max_files=2, max_bytes=10**6)
+
+    assert sorted(removed) == sorted(str(p) for p in paths[:3])
+    assert sorted(p.name for p in tmp_path.glob("*.html")) == [paths[3].name, paths[4].name]
+    assert (tmp_path / "cache" / "h1_ALL_stations-0.html").exists()
+
+def test_prune_caps_total_size_but_keeps_latest_map(tmp_path):
+    paths = _archive(tmp_path, 3, size=100)
+
+    prune_map_archive(str(tmp_path), max_files=10, max_bytes=250)
+    assert [p.exists() for p in paths] == [False, True, True]
+
+    prune_map_archive(str(tmp_path), max_files=10, max_bytes=10)
+    assert [p.exists() for p in paths] == [False, False, True]
+
+def test_renders_from_delay_batch_columns():
+    rows = _trains(4)
+    rows[0].update(origin_latitude=None, origin_longitude=None, delay_minutes=None)
+    names = [name for name in DELAY_COLUMNS if name != "id"]
+    columns = to_columns([tuple(row[name] for name in names) for row in rows], names)
+
+    for mode in RENDER_MODES:
+        html = render_map(columns, mode)
+        assert "Moorgate" in html
+
+def test_station_popup_shows_missing_delays_as_not_available():
+    rows = [dict(row, delay_minutes=None) for row in _trains(2)]
+    station = aggregate_stations(rows).set_index("crs").loc["MOG"].to_dict()
+    popup = TrainDelayMap(render_mode="stations")._create_station_popup(dict(station, crs="MOG"))
+
+    assert "nan" not in popup
+    assert "<b>Average delay:</b> n/a" in popup
+    assert "<b>Max delay:</b> n/a" in popup
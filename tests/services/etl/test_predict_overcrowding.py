@@ -0,0 +1,45 @@
+import json
+import pytest
+from datetime import datetime
+
+from app.services.etl.predict_overcrowding import (
+    CROWDING_QUERY,
+    crowding_frame,
+    crowding_records,
+    crowding_window,
+)
+
+def test_crowding_window_from_start_and_hours():
+    start, end = crowding_window(start=datetime(2025, 2, 10, 6), hours=3)
+    assert (start, end) == (datetime(2025, 2, 10, 6), datetime(2025, 2, 10, 9))
+
+def test_crowding_window_ends_at_given_end():
+    start, end = crowding_window(end=datetime(2025, 2, 10, 12), hours=2)
+    assert start == datetime(2025, 2, 10, 10)
+
+def test_crowding_window_keeps_explicit_bounds():
+    bounds = (datetime(2025, 2, 10), datetime(2025, 2, 11))
+    assert crowding_window(*bounds, hours=1) == bounds
+
+def test_crowding_window_rejects_empty_range():
+    with pytest.raises(ValueError):
+        crowding_window(datetime(2025, 2, 10), datetime(2025, 2, 10))
+
+def test_crowding_query_aggregates_in_sql():
+    assert "GROUP BY destination_crs" in CROWDING_QUERY
+    assert "LIMIT" not in CROWDING_QUERY
+
+def test_stations_without_delays_serialise_as_null():
+    rows = [
+        {"station_crs": "FPK", "station": "Finsbury Park", "arrival_count": 4,
+         "avg_delay": 2.5, "delayed_count": 1, "max_delay": 12},
+        {"station_crs": "MOG", "station": "Moorgate", "arrival_count": 2,
+         "avg_delay": None, "delayed_count": 0, "max_delay": None},
+    ]
+    records = crowding_records(crowding_frame(rows, window_hours=2))
+
+    assert records[1]["avg_delay"] is None
+    assert records[1]["max_delay"] is None
+    assert records[0]["avg_delay"] == 2.5
+    assert records[1]["arrivals_per_hour"] == 1
+    json.dumps(records, allow_nan=False)
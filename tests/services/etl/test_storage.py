@@ -0,0 +1,66 @@
+# tests/services/etl/test_storage.py
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from app.services.etl.storage import IntermediateStore, parquet_available, with_arrival_timestamps
+
+def make_cleaned(run_date="2025-02-10", station="FPK"):
+    return pd.DataFrame({
+        "run_date": [date.fromisoformat(run_date)] * 2,
+        "station": [station] * 2,
+        "service_id": ["A1", "A2"],
+        "operator": ["Great Northern"] * 2,
+        "is_passenger_train": [True, True],
+        "scheduled_arrival": ["08:02", "23:55"],
+        "actual_arrival": ["08:05", "00:04"],
+        "is_actual": [True, False],
+        "origin": ["Welwyn Garden City"] * 2,
+        "destination": ["Moorgate"] * 2,
+        "was_scheduled_to_stop": [True, True],
+        "stop_status": ["CALL"] * 2,
+        "delay_minutes": [3, 9],
+    })
+
+def test_arrival_timestamps_roll_over_midnight():
+    df = with_arrival_timestamps(make_cleaned())
+
+    assert df["scheduled_arrival"].tolist() == [pd.Timestamp("2025-02-10 08:02"), pd.Timestamp("2025-02-10 23:55")]
+    assert df["actual_arrival"].tolist() == [pd.Timestamp("2025-02-10 08:05"), pd.Timestamp("2025-02-11 00:04")]
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow is not installed")
+def test_parquet_round_trip_keeps_dtypes(tmp_path):
+    store = IntermediateStore(base_dir=str(tmp_path), fmt="parquet", export_csv=False)
+    df = with_arrival_timestamps(make_cleaned())
+
+    store.write("cleaned_delays", df)
+    loaded = store.read("cleaned_delays")
+
+    assert (tmp_path / "cleaned_delays" / "run_date=2025-02-10" / "station=FPK").is_dir()
+    assert pd.api.types.is_datetime64_any_dtype(loaded["actual_arrival"])
+    assert pd.api.types.is_bool_dtype(loaded["is_actual"])
+    assert loaded["run_date"].tolist() == [date(2025, 2, 10)] * 2
+    assert loaded["delay_minutes"].tolist() == [3, 9]
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow is not installed")
+def test_rewriting_a_day_replaces_only_its_partitions(tmp_path):
+    store = IntermediateStore(base_dir=str(tmp_path), fmt="parquet", export_csv=False)
+    store.write("cleaned_delays", with_arrival_timestamps(make_cleaned("2025-02-10")))
+    store.write("cleaned_delays", with_arrival_timestamps(make_cleaned("2025-02-11")))
+    store.write("cleaned_delays", with_arrival_timestamps(make_cleaned("2025-02-10")))
+
+    assert len(store.read("cleaned_delays")) == 4
+    assert len(store.read("cleaned_delays", run_dates=["2025-02-11"], stations=["FPK"])) == 2
+
+def test_csv_format_and_export(tmp_path):
+    export = tmp_path / "export.csv"
+    store = IntermediateStore(base_dir=str(tmp_path / "store"), fmt="csv", export_csv=True)
+
+    store.write("cleaned_delays", with_arrival_timestamps(make_cleaned()), csv_path=str(export))
+    loaded = store.read("cleaned_delays", stations=["FPK"])
+
+    assert export.exists()
+    assert pd.api.types.is_datetime64_any_dtype(loaded["actual_arrival"])
+    assert loaded["run_date"].tolist() == [date(2025, 2, 10)] * 2
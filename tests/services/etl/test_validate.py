@@ -0,0 +1,55 @@
+# tests/services/etl/test_validate.py
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.services.etl.validate import BatchValidator
+
+class Record(BaseModel):
+    name: str
+    note: Optional[str]
+    flag: bool = False
+    label: str = "UNKNOWN"
+
+def test_valid_records_get_defaults_and_coercion():
+    result = BatchValidator(Record).validate([
+        {"name": "a", "note": None},
+        {"name": "b", "note": "x", "flag": "yes", "label": "L"},
+    ])
+
+    assert result.valid.tolist() == [True, True]
+    assert result.rejections.empty
+    assert result.frame["flag"].tolist() == [False, True]
+    assert result.frame["label"].tolist() == ["UNKNOWN", "L"]
+
+def test_rejection_table_reports_first_error_per_row():
+    records = [
+        {"note": None},                            # Missing required field
+        {"name": 1, "note": None, "flag": "maybe"},
+        {"name": "c", "note": None, "label": None},
+        {"name": "d", "note": None},
+    ]
+    result = BatchValidator(Record).validate(records)
+
+    assert result.valid.tolist() == [False, False, False, True]
+    assert result.rejections.index.tolist() == [0, 1, 2]
+    assert result.rejections["field"].tolist() == ["name", "name", "label"]
+    assert result.rejections["reason"].tolist() == ["missing", "string_type", "string_type"]
+
+def test_matches_pydantic_on_each_record():
+    records = [
+        {"name": "a", "note": "n", "flag": 1},
+        {"name": "b", "note": "n", "flag": 2},
+        {"name": "c", "flag": True},
+        {"name": "d", "note": 5},
+    ]
+    result = BatchValidator(Record).validate(records)
+
+    for i, record in enumerate(records):
+        try:
+            Record(**record)
+            accepted = True
+        except Exception:
+            accepted = False
+        assert result.valid[i] == accepted
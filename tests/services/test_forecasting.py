@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+
+from app.core.config import settings
+from app.crud.rollup_crud import HISTOGRAM_COLUMNS
+from app.services.forecasting import (
+    HOURS_PER_WEEK, BusynessForecaster, forecast_batch, hour_index, slot_occurrences, week_slot
+)
+
+def _rollup(station, hours, trains=4, delay=2):
+    """Builds rollup buckets with ``trains`` arrivals of ``delay`` minutes per hour."""
+    frame = pd.DataFrame({
+        "station_crs": station,
+        "hour_bucket": pd.to_datetime(hours),
+        "train_count": trains,
+        "delay_sum": trains * delay,
+        "delayed_count": 0,
+    })
+    for column in HISTOGRAM_COLUMNS:
+        frame[column] = 0
+    frame["bin_1"] = trains  # 0-4 minutes late
+    return frame
+
+def test_week_slot_starts_on_monday():
+    assert week_slot(hour_index(np.datetime64("2025-02-10T00"))) == 0  # Monday
+    assert week_slot(hour_index(np.datetime64("2025-02-16T23"))) == HOURS_PER_WEEK - 1
+
+def test_slot_occurrences_counts_partial_weeks():
+    first = hour_index(np.array(["2025-02-10T00"], dtype="datetime64[h]"))
+    last = first + HOURS_PER_WEEK + 1  # One week and two hours
+    occurrences = slot_occurrences(first, last)
+    assert occurrences[0, 0] == 2
+    assert occurrences[0, 1] == 2
+    assert occurrences[0, 2] == 1
+
+def test_predict_uses_hour_of_week_profile():
+    hours = pd.date_range("2025-02-03", periods=2 * HOURS_PER_WEEK, freq="h")
+    frame = _rollup("EUS", hours)
+    busy = frame["hour_bucket"].dt.hour == 8
+    frame.loc[busy, ["train_count", "bin_1"]] = 10
+    frame.loc[busy, "delay_sum"] = 20
+
+    forecaster = BusynessForecaster().fit(frame, datetime(2025, 2, 17))
+
+    rush = forecaster.predict("eus", datetime(2025, 3, 3, 8, 15), hours=1)
+    assert rush["expected_trains"] == 10
+    assert rush["average_delay"] == 2
+    assert rush["delay_distribution"]["0-4"] == 1
+    assert forecaster.predict("EUS", datetime(2025, 3, 3, 9), hours=2)["expected_trains"] == 8
+    assert forecaster.predict("MAN", datetime(2025, 3, 3, 9)) is None
+
+def test_window_longer_than_a_week_wraps():
+    hours = pd.date_range("2025-02-03", periods=HOURS_PER_WEEK, freq="h")
+    forecaster = BusynessForecaster().fit(_rollup("EUS", hours, trains=1), datetime(2025, 2, 10))
+    forecast = forecaster.predict("EUS", datetime(2025, 2, 12, 5), hours=HOURS_PER_WEEK + 3)
+    assert forecast["expected_trains"] == HOURS_PER_WEEK + 3
+
+def test_incremental_update_matches_full_fit():
+    first = _rollup("EUS", pd.date_range("2025-02-03", periods=100, freq="h"), trains=3)
+    second = pd.concat([
+        _rollup("EUS", pd.date_range("2025-02-07 04:00", periods=200, freq="h"), trains=5),
+        _rollup("MAN", pd.date_range("2025-02-08", periods=50, freq="h"), trains=2),
+    ])
+
+    incremental = BusynessForecaster().fit(first, datetime(2025, 2, 7, 4))
+    incremental.update(second, datetime(2025, 2, 16))
+    full = BusynessForecaster().fit(pd.concat([first, second]), datetime(2025, 2, 16))
+
+    start = datetime(2025, 2, 20, 7)
+    assert incremental.predict_many(["EUS", "MAN"], start, 6) == full.predict_many(["EUS", "MAN"], start, 6)
+
+def test_save_and_load_round_trip(tmp_path):
+    hours = pd.date_range("2025-02-03", periods=HOURS_PER_WEEK, freq="h")
+    forecaster = BusynessForecaster().fit(_rollup("EUS", hours), datetime(2025, 2, 10))
+    path = forecaster.save(str(tmp_path / "profiles.npz"))
+
+    loaded = BusynessForecaster.load(path)
+
+    assert loaded.fitted_through == forecaster.fitted_through
+    assert loaded.rollup_version is None
+    start = datetime(2025, 2, 11, 17)
+    assert loaded.predict("EUS", start, 3) == forecaster.predict("EUS", start, 3)
+
+def test_refitting_backfilled_stations_matches_full_fit(tmp_path):
+    eus = _rollup("EUS", pd.date_range("2025-02-03", periods=200, freq="h"), trains=3)
+    man = _rollup("MAN", pd.date_range("2025-02-05", periods=100, freq="h"), trains=2)
+    backfilled = _rollup("EUS", pd.date_range("2025-01-27", periods=168, freq="h"), trains=7)
+    through = datetime(2025, 2, 12)
+
+    forecaster = BusynessForecaster().fit(pd.concat([eus, man]), through)
+    forecaster.rollup_version = datetime(2025, 2, 12, 6)
+    forecaster = BusynessForecaster.load(forecaster.save(str(tmp_path / "profiles.npz")))
+    assert forecaster.rollup_version == datetime(2025, 2, 12, 6)
+
+    forecaster.drop_stations(["EUS"]).update(pd.concat([backfilled, eus]), through)
+    full = BusynessForecaster().fit(pd.concat([backfilled, eus, man]), through)
+
+    start = datetime(2025, 2, 20, 7)
+    assert forecaster.predict_many(["EUS", "MAN"], start, 6) == full.predict_many(["EUS", "MAN"], start, 6)
+
+def test_load_missing_file_is_unfitted(tmp_path):
+    forecaster = BusynessForecaster.load(str(tmp_path / "missing.npz"))
+    assert not forecaster.fitted
+    assert forecaster.predict("EUS", datetime(2025, 2, 10)) is None
+
+def test_forecast_batch_keys_by_station_and_window(tmp_path, monkeypatch):
+    hours = pd.date_range("2025-02-03", periods=HOURS_PER_WEEK, freq="h")
+    path = BusynessForecaster().fit(_rollup("EUS", hours, trains=2), datetime(2025, 2, 10)).save(
+        str(tmp_path / "profiles.npz")
+    )
+    monkeypatch.setattr(settings, "forecast_model_path", path)
+
+    batch = forecast_batch(["eus", "MAN", "EUS"], [1, 3], datetime(2025, 2, 11, 6))
+
+    assert set(batch["stations"]) == {"EUS"}
+    assert batch["stations"]["EUS"]["1"]["expected_trains"] == 2
+    assert batch["stations"]["EUS"]["3"]["expected_trains"] == 6
+    assert set(batch["stations"]["EUS"]["1"]) == {
+        "expected_trains", "average_delay", "delayed_ratio", "busyness_score", "busyness_level"
+    }
+    assert batch["unknown"] == ["MAN"]
@@ -0,0 +1,48 @@
+from app.services.map_cache import MapCache
+
+def test_hit_returns_same_page_and_etag(tmp_path):
+    cache = MapCache(max_entries=4, cache_dir=str(tmp_path), disk=False)
+    key = cache.key(1, "fpk", "stations")
+    stored = cache.put(key, "<html>map</html>")
+
+    assert key == "h1_FPK_stations"
+    assert cache.get(key) == stored
+    assert stored.etag.startswith('"') and stored.etag.endswith('"')
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = MapCache(max_entries=2, cache_dir=str(tmp_path), disk=False)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a").html == "A"
+
+def test_invalidation_reaches_other_processes(tmp_path):
+    api = MapCache(max_entries=4, cache_dir=str(tmp_path), disk=True)
+    pipeline = MapCache(max_entries=4, cache_dir=str(tmp_path), disk=True)
+    api.put("a", "old")
+
+    pipeline.invalidate()
+
+    assert api.get("a") is None
+    assert not list(tmp_path.glob("*.html"))
+
+def test_disk_entries_survive_restarts(tmp_path):
+    MapCache(max_entries=4, cache_dir=str(tmp_path), disk=True).put("a", "A")
+    assert MapCache(max_entries=4, cache_dir=str(tmp_path), disk=True).get("a").html == "A"
+
+def test_page_rendered_before_an_ingest_is_not_stored(tmp_path):
+    cache = MapCache(max_entries=4, cache_dir=str(tmp_path), disk=False)
+    generation = cache.generation()
+    cache.invalidate()
+
+    cache.put("a", "stale", generation)
+
+    assert cache.get("a") is None
+
+def test_disabled_cache_never_hits(tmp_path):
+    cache = MapCache(max_entries=0, cache_dir=str(tmp_path), disk=False)
+    cache.put("a", "A")
+    assert cache.get("a") is None
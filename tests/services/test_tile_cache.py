@@ -0,0 +1,66 @@
+import pytest
+from datetime import date
+
+from app.core.config import settings
+from app.services import ingest_events
+from app.services.ingest_events import notify_ingest, on_ingest
+from app.services.tile_cache import TileCache, cache_max_age
+
+@pytest.fixture(autouse=True)
+def no_ingest_handlers(monkeypatch):
+    monkeypatch.setattr(ingest_events, "_handlers", [])
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = TileCache(str(tmp_path))
+    cache.put(date(2025, 2, 10), 12, 2046, 1362, b"tile")
+    assert cache.get(date(2025, 2, 10), 12, 2046, 1362) == b"tile"
+    assert cache.get(date(2025, 2, 10), 12, 2046, 1363) is None
+
+def test_ingest_drops_only_affected_run_dates(tmp_path):
+    cache = TileCache(str(tmp_path))
+    cache.put(date(2025, 2, 10), 5, 15, 10, b"a")
+    cache.put(date(2025, 2, 11), 5, 15, 10, b"b")
+    on_ingest(cache.invalidate_run_dates)
+
+    notify_ingest([date(2025, 2, 10), date(2025, 2, 10)])
+
+    assert cache.get(date(2025, 2, 10), 5, 15, 10) is None
+    assert cache.get(date(2025, 2, 11), 5, 15, 10) == b"b"
+
+def test_failing_ingest_handler_does_not_stop_others():
+    seen = []
+
+    def broken(run_dates):
+        raise RuntimeError("boom")
+
+    on_ingest(broken)
+    on_ingest(seen.append)
+    notify_ingest([date(2025, 2, 12)])
+
+    assert seen == [[date(2025, 2, 12)]]
+
+def test_recent_run_dates_are_cached_briefly():
+    today = date(2025, 2, 12)
+    assert cache_max_age(today, today) == settings.tile_recent_max_age
+    assert cache_max_age(date(2025, 2, 1), today) == settings.tile_max_age
+
+def test_tile_rendered_before_an_ingest_is_not_stored(tmp_path):
+    cache = TileCache(str(tmp_path))
+    generation = cache.generation(date(2025, 2, 10))
+    cache.invalidate_run_dates([date(2025, 2, 10)])
+
+    assert not cache.put(date(2025, 2, 10), 5, 15, 10, b"stale", generation)
+    assert cache.get(date(2025, 2, 10), 5, 15, 10) is None
+    assert cache.put(date(2025, 2, 11), 5, 15, 10, b"other", cache.generation(date(2025, 2, 11)))
+
+def test_empty_tiles_are_not_stored(tmp_path):
+    cache = TileCache(str(tmp_path))
+    assert not cache.put(date(2025, 2, 10), 5, 15, 10, b"")
+    assert cache.get(date(2025, 2, 10), 5, 15, 10) is None
+
+def test_cache_evicts_least_recently_used_tiles(tmp_path):
+    cache = TileCache(str(tmp_path), max_bytes=250)
+    for y in range(5):
+        cache.put(date(2025, 2, 10), 5, 15, y, b"x" * 100)
+    assert cache.get(date(2025, 2, 10), 5, 15, 0) is None
+    assert cache.get(date(2025, 2, 10), 5, 15, 4) == b"x" * 100
@@ -0,0 +1,175 @@
+# tests/services/test_trains_main.py
+
+import pytest
+from datetime import date, timedelta
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services.trains_main import RTTClient
+from app.services.resilience import CircuitBreaker, RetryPolicy, parse_retry_after
+from app.services.response_cache import ResponseCache
+
+SAMPLE_RESPONSE = {
+    "services": [{
+        "runDate": "2025-02-10",
+        "serviceUid": "X73315",
+        "atocName": "Great Northern",
+        "isPassenger": True,
+        "locationDetail": {
+            "crs": "FPK",
+            "gbttBookedArrival": "0002",
+            "realtimeArrival": "0003",
+            "realtimeArrivalActual": True,
+            "origin": [{"description": "Welwyn Garden City"}],
+            "destination": [{"description": "Moorgate"}],
+            "isCall": True,
+            "displayAs": "CALL"
+        }
+    }]
+}
+
+async def start_stub(statuses, headers=None):
+    """Starts a stub RTT server answering with ``statuses`` in turn, then 200."""
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        if len(calls) <= len(statuses):
+            return web.Response(status=statuses[len(calls) - 1], headers=headers or {})
+        return web.json_response(SAMPLE_RESPONSE)
+
+    app = web.Application()
+    app.router.add_get("/json/search/{tail:.*}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server, calls
+
+def make_client(server, cache_dir, attempts=4, threshold=5, offline=False, today_ttl=300):
+    return RTTClient(
+        base_url=str(server.make_url("/json/search")),
+        retry_policy=RetryPolicy(max_attempts=attempts, base_delay=0.01, max_delay=0.05),
+        circuit_breaker=CircuitBreaker("test", failure_threshold=threshold, reset_timeout=60),
+        response_cache=ResponseCache(str(cache_dir), today_ttl=today_ttl, refetch_days=2),
+        offline=offline,
+    )
+
+@pytest.mark.asyncio
+async def test_retries_transient_status(tmp_path):
+    """A transient 502 is retried instead of losing the day."""
+    server, calls = await start_stub([502, 503])
+    try:
+        async with make_client(server, tmp_path) as client:
+            result = await client.get_train_arrivals("FPK", "2025-02-10")
+    finally:
+        await server.close()
+
+    assert len(calls) == 3
+    assert result["services"][0]["service_id"] == "X73315"
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_error(tmp_path):
+    """A 404 is permanent and returned as an error straight away."""
+    server, calls = await start_stub([404])
+    try:
+        async with make_client(server, tmp_path) as client:
+            result = await client.get_train_arrivals("FPK", "2025-02-10")
+    finally:
+        await server.close()
+
+    assert len(calls) == 1
+    assert "error" in result
+
+class RecordingPolicy(RetryPolicy):
+    """Retry policy that remembers every wait it hands out."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = []
+
+    def delay_for(self, attempt, retry_after=None):
+        delay = super().delay_for(attempt, retry_after)
+        self.delays.append(delay)
+        return delay
+
+@pytest.mark.asyncio
+async def test_honours_retry_after(tmp_path):
+    """Retry-After decides the wait, capped by the policy's max delay."""
+    server, calls = await start_stub([429], headers={"Retry-After": "120"})
+    policy = RecordingPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05)
+    try:
+        client = RTTClient(
+            base_url=str(server.make_url("/json/search")),
+            retry_policy=policy,
+            response_cache=ResponseCache(str(tmp_path)),
+        )
+        async with client:
+            result = await client.get_train_arrivals("FPK", "2025-02-10")
+    finally:
+        await server.close()
+
+    assert policy.delays == [0.05]
+    assert "services" in result
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_stops_requests(tmp_path):
+    """Once the breaker opens, requests are refused without reaching the API."""
+    server, calls = await start_stub([500] * 10)
+    try:
+        async with make_client(server, tmp_path, attempts=2, threshold=2) as client:
+            first = await client.get_train_arrivals("FPK", "2025-02-10")
+            second = await client.get_train_arrivals("FPK", "2025-02-11")
+    finally:
+        await server.close()
+
+    assert len(calls) == 2
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
+    assert "error" in first
+    assert "unavailable" in second["error"]
+
+@pytest.mark.asyncio
+async def test_past_dates_are_served_from_cache(tmp_path):
+    """A past day is fetched once, then replayed from the cache."""
+    server, calls = await start_stub([])
+    try:
+        async with make_client(server, tmp_path) as client:
+            first = await client.get_train_arrivals("FPK", "2025-02-10")
+            second = await client.get_train_arrivals("FPK", "2025-02-10")
+        async with make_client(server, tmp_path, offline=True) as offline_client:
+            replayed = await offline_client.get_train_arrivals("FPK", "2025-02-10")
+            missing = await offline_client.get_train_arrivals("FPK", "2025-02-11")
+    finally:
+        await server.close()
+
+    assert len(calls) == 1
+    assert first == second == replayed
+    assert "error" in missing
+
+@pytest.mark.asyncio
+async def test_days_inside_refetch_window_are_fetched_again(tmp_path):
+    """Yesterday may still gain late actuals, so its cached copy expires."""
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    server, calls = await start_stub([])
+    try:
+        async with make_client(server, tmp_path, today_ttl=0) as client:
+            await client.get_train_arrivals("FPK", yesterday)
+            await client.get_train_arrivals("FPK", yesterday)
+    finally:
+        await server.close()
+
+    assert len(calls) == 2
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=400)
+    for i in range(5):
+        cache.put(f"https://example/{i}", "2025-02-10", {"services": ["x" * 50]})
+    assert cache.get("https://example/0") is None
+    assert cache.get("https://example/4") is not None
+
+def test_retry_policy_needs_at_least_one_attempt():
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
@@ -4,9 +4,9 @@ import asyncio
 import os
 from app.db.db_main import db_manager
 from app.services.etl.mapping import generate_html_map
-from app.core.logging_config import setup_logging
+from app.core.logging_config import configure_logging
 
-logger = setup_logging()
+logger = configure_logging()
 
 async def verify_map_generation():
     """Verify map generation works correctly."""
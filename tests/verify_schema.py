@@ -4,10 +4,10 @@ import asyncio
 import sys
 import asyncpg
 from app.core.config import settings
-from app.core.logging_config import setup_logging
+from app.core.logging_config import configure_logging
 from urllib.parse import urlparse
 
-logger = setup_logging()
+logger = configure_logging()
 
 async def verify_database(is_test: bool = False):
     """Verify database schema."""